@@ -0,0 +1,15 @@
+-- Migration: Add change_log for change-data-capture from the ETL to API caches
+-- DatabaseManager also creates this table on startup if it is missing
+
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,   -- Monotonically increasing
+    entity TEXT NOT NULL,                    -- 'players', 'games' or 'player_game_stats'
+    op TEXT NOT NULL,                        -- 'insert' or 'update'
+    entity_id INTEGER NOT NULL,              -- 0 for table-wide updates
+    player_id INTEGER,                       -- Affected player, when known
+    game_id INTEGER,                         -- Affected game, when known
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    CHECK (entity IN ('players', 'games', 'player_game_stats')),
+    CHECK (op IN ('insert', 'update'))
+);
@@ -0,0 +1,19 @@
+-- Migration: Add live_player_game_stats for in-game (provisional) totals
+-- DatabaseManager also creates this table on startup if it is missing
+
+CREATE TABLE IF NOT EXISTS live_player_game_stats (
+    player_id INTEGER NOT NULL,
+    game_id INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    opponent_team_id INTEGER NOT NULL,
+    venue_id INTEGER NOT NULL,
+    location TEXT NOT NULL,            -- 'Home' or 'Away'
+    game_time TEXT,                    -- 'Day', 'Twilight', or 'Night'
+    disposals INTEGER NOT NULL DEFAULT 0,
+    goals INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (player_id, game_id),
+    CHECK (location IN ('Home', 'Away')),
+    CHECK (game_time IS NULL OR game_time IN ('Day', 'Twilight', 'Night'))
+);
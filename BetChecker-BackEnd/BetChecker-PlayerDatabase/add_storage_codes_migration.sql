@@ -0,0 +1,67 @@
+-- Migration: Integer day ordinals and categorical codes alongside the text columns
+-- DatabaseManager also applies this on startup if game_day is missing
+-- Codes are each value's position in CATEGORY_CODES (database/storage_codes.py)
+
+ALTER TABLE games ADD COLUMN game_day INTEGER
+    GENERATED ALWAYS AS (CAST(JULIANDAY(game_date) - 2440587.5 AS INTEGER)) VIRTUAL;  -- Days since 1970-01-01
+ALTER TABLE games ADD COLUMN game_type_code INTEGER
+    GENERATED ALWAYS AS (CASE game_type WHEN 'Pre-Season' THEN 0 WHEN 'Regular Season' THEN 1 WHEN 'Finals' THEN 2 END) VIRTUAL;
+ALTER TABLE player_game_stats ADD COLUMN location_code INTEGER
+    GENERATED ALWAYS AS (CASE location WHEN 'Home' THEN 0 WHEN 'Away' THEN 1 END) VIRTUAL;
+ALTER TABLE player_game_stats ADD COLUMN game_time_code INTEGER
+    GENERATED ALWAYS AS (CASE game_time WHEN 'Day' THEN 0 WHEN 'Twilight' THEN 1 WHEN 'Night' THEN 2 END) VIRTUAL;
+
+CREATE TABLE IF NOT EXISTS location_codes (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+INSERT OR IGNORE INTO location_codes (code, name) VALUES (0, 'Home'), (1, 'Away');
+CREATE TABLE IF NOT EXISTS game_type_codes (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+INSERT OR IGNORE INTO game_type_codes (code, name) VALUES (0, 'Pre-Season'), (1, 'Regular Season'), (2, 'Finals');
+CREATE TABLE IF NOT EXISTS game_time_codes (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+INSERT OR IGNORE INTO game_time_codes (code, name) VALUES (0, 'Day'), (1, 'Twilight'), (2, 'Night');
+
+-- Integer indexes replace the text ones
+DROP INDEX IF EXISTS idx_games_type;
+DROP INDEX IF EXISTS idx_pgs_location;
+DROP INDEX IF EXISTS idx_pgs_game_time;
+CREATE INDEX IF NOT EXISTS idx_games_day ON games(game_day);
+CREATE INDEX IF NOT EXISTS idx_games_type_code ON games(game_type_code);
+CREATE INDEX IF NOT EXISTS idx_pgs_location_code ON player_game_stats(location_code);
+CREATE INDEX IF NOT EXISTS idx_pgs_game_time_code ON player_game_stats(game_time_code);
+
+DROP VIEW IF EXISTS vw_complete_game_stats;
+CREATE VIEW vw_complete_game_stats AS
+SELECT
+    pgs.stat_id,
+    pgs.player_id,
+    p.player_name,
+    p.first_name,
+    p.last_name,
+    pgs.game_id,
+    g.game_date,
+    g.game_day,
+    g.season_year,
+    g.round_number,
+    game_type.name AS game_type,
+    g.game_type_code,
+    pgs.team_id,
+    t.team_name,
+    pgs.opponent_team_id,
+    opponent.team_name AS opponent_name,
+    pgs.venue_id,
+    v.venue_name,
+    location.name AS location,
+    pgs.location_code,
+    game_time.name AS game_time,
+    pgs.game_time_code,
+    -- Player stats
+    pgs.disposals,
+    pgs.goals,
+    pgs.days_since_last_game
+FROM player_game_stats pgs
+JOIN players p ON pgs.player_id = p.player_id
+JOIN games g ON pgs.game_id = g.game_id
+JOIN teams t ON pgs.team_id = t.team_id
+JOIN teams opponent ON pgs.opponent_team_id = opponent.team_id
+JOIN venues v ON pgs.venue_id = v.venue_id
+LEFT JOIN game_type_codes game_type ON g.game_type_code = game_type.code
+LEFT JOIN location_codes location ON pgs.location_code = location.code
+LEFT JOIN game_time_codes game_time ON pgs.game_time_code = game_time.code;
@@ -0,0 +1,43 @@
+-- Migration: Add team_game_stats, per-team per-game totals and concessions
+-- DatabaseManager also creates and fills this table on startup if it is missing
+
+CREATE TABLE IF NOT EXISTS team_game_stats (
+    game_id INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    opponent_team_id INTEGER NOT NULL,
+    venue_id INTEGER NOT NULL,
+    location TEXT NOT NULL,            -- 'Home' or 'Away'
+    game_time TEXT,                    -- 'Day', 'Twilight', or 'Night'
+    players INTEGER NOT NULL,          -- Player rows summed
+    disposals INTEGER,                 -- NULL when no player row recorded the stat
+    goals INTEGER,
+    conceded_disposals INTEGER,        -- Opponent's totals; NULL until their rows load
+    conceded_goals INTEGER,
+
+    PRIMARY KEY (game_id, team_id),
+    CHECK (location IN ('Home', 'Away'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_tgs_team ON team_game_stats(team_id);
+
+WITH totals AS (
+    SELECT
+        game_id,
+        team_id,
+        MIN(opponent_team_id) AS opponent_team_id,
+        MIN(venue_id) AS venue_id,
+        MIN(location) AS location,
+        MIN(game_time) AS game_time,
+        COUNT(*) AS players,
+        SUM(disposals) AS disposals,
+        SUM(goals) AS goals
+    FROM player_game_stats
+    GROUP BY game_id, team_id
+)
+INSERT OR REPLACE INTO team_game_stats
+    (game_id, team_id, opponent_team_id, venue_id, location, game_time,
+     players, disposals, goals, conceded_disposals, conceded_goals)
+SELECT t.game_id, t.team_id, t.opponent_team_id, t.venue_id, t.location, t.game_time,
+       t.players, t.disposals, t.goals, o.disposals, o.goals
+FROM totals t
+LEFT JOIN totals o ON o.game_id = t.game_id AND o.team_id = t.opponent_team_id;
@@ -8,13 +8,11 @@
 -- Get all games for a specific player
 SELECT 
     game_date,
-    round_name,
+    round_number,
     opponent_name,
     location,
-    result,
     disposals,
-    goals,
-    tackles
+    goals
 FROM vw_complete_game_stats
 WHERE player_name = 'Scott Pendlebury'
 ORDER BY game_date DESC;
@@ -94,7 +92,6 @@ GROUP BY player_name, location;
 -- Performance at different venues
 SELECT 
     venue_name,
-    venue_state,
     COUNT(*) as games_played,
     ROUND(AVG(disposals), 2) as avg_disposals,
     ROUND(AVG(goals), 2) as avg_goals,
@@ -102,21 +99,10 @@ SELECT
     ROUND(100.0 * SUM(CASE WHEN goals >= 2 THEN 1 ELSE 0 END) / COUNT(*), 1) as pct_2_plus_goals
 FROM vw_complete_game_stats
 WHERE player_name = 'Scott Pendlebury'
-GROUP BY venue_name, venue_state
+GROUP BY venue_name
 HAVING games_played >= 3  -- Only venues with 3+ games
 ORDER BY games_played DESC;
 
--- Interstate vs home state analysis (for Victorian players)
-SELECT 
-    CASE WHEN venue_state = 'VIC' THEN 'Victoria' ELSE 'Interstate' END as location_type,
-    COUNT(*) as games,
-    ROUND(AVG(disposals), 2) as avg_disposals,
-    ROUND(AVG(goals), 2) as avg_goals,
-    ROUND(100.0 * SUM(CASE WHEN disposals >= 30 THEN 1 ELSE 0 END) / COUNT(*), 1) as pct_30_plus_disp
-FROM vw_complete_game_stats
-WHERE player_name = 'Scott Pendlebury'
-GROUP BY location_type;
-
 -- ============================================================================
 -- GAME TYPE ANALYSIS
 -- ============================================================================
@@ -126,9 +112,7 @@ SELECT
     game_type,
     COUNT(*) as games,
     ROUND(AVG(disposals), 2) as avg_disposals,
-    ROUND(AVG(goals), 2) as avg_goals,
-    ROUND(AVG(tackles), 2) as avg_tackles,
-    ROUND(AVG(contested_possessions), 2) as avg_contested
+    ROUND(AVG(goals), 2) as avg_goals
 FROM vw_complete_game_stats
 WHERE player_name = 'Scott Pendlebury'
 GROUP BY game_type;
@@ -142,10 +126,7 @@ SELECT
     opponent_name,
     COUNT(*) as games,
     ROUND(AVG(disposals), 2) as avg_disposals,
-    ROUND(AVG(goals), 2) as avg_goals,
-    ROUND(AVG(tackles), 2) as avg_tackles,
-    SUM(CASE WHEN result = 'Win' THEN 1 ELSE 0 END) as wins,
-    SUM(CASE WHEN result = 'Loss' THEN 1 ELSE 0 END) as losses
+    ROUND(AVG(goals), 2) as avg_goals
 FROM vw_complete_game_stats
 WHERE player_name = 'Scott Pendlebury'
 GROUP BY opponent_name
@@ -156,12 +137,10 @@ ORDER BY games DESC;
 SELECT 
     opponent_name,
     game_date,
-    round_name,
+    round_number,
     location,
     disposals,
-    goals,
-    tackles,
-    result
+    goals
 FROM vw_complete_game_stats
 WHERE player_name = 'Scott Pendlebury'
 ORDER BY opponent_name, disposals DESC;
@@ -180,9 +159,7 @@ SELECT
         ELSE 'Long Break (>14 days)'
     END as rest_category,
     COUNT(*) as games,
-    ROUND(AVG(disposals), 2) as avg_disposals,
-    ROUND(AVG(contested_possessions), 2) as avg_contested,
-    ROUND(AVG(tackles), 2) as avg_tackles
+    ROUND(AVG(disposals), 2) as avg_disposals
 FROM vw_complete_game_stats
 WHERE player_name = 'Scott Pendlebury'
 GROUP BY rest_category
@@ -205,7 +182,6 @@ SELECT
     COUNT(*) as games,
     ROUND(AVG(disposals), 2) as avg_disposals,
     ROUND(AVG(goals), 2) as avg_goals,
-    ROUND(AVG(tackles), 2) as avg_tackles,
     MAX(disposals) as best_disposals,
     MAX(goals) as best_goals
 FROM vw_complete_game_stats
@@ -220,18 +196,15 @@ ORDER BY season_year;
 -- Compare two teammates in games they played together
 SELECT 
     g.game_date,
-    g.round_name,
+    g.round_number,
     vw1.opponent_name,
     vw1.location,
     vw1.player_name as player1,
     vw1.disposals as p1_disp,
     vw1.goals as p1_goals,
-    vw1.tackles as p1_tackles,
     vw2.player_name as player2,
     vw2.disposals as p2_disp,
-    vw2.goals as p2_goals,
-    vw2.tackles as p2_tackles,
-    vw1.result
+    vw2.goals as p2_goals
 FROM player_game_stats pgs1
 JOIN vw_complete_game_stats vw1 ON pgs1.stat_id = vw1.stat_id
 JOIN player_game_stats pgs2 ON pgs1.game_id = pgs2.game_id 
@@ -247,46 +220,11 @@ ORDER BY g.game_date;
 SELECT 
     player_name,
     disposals,
-    goals,
-    tackles,
-    contested_possessions,
-    clearances
+    goals
 FROM vw_complete_game_stats
 WHERE game_id = 1  -- Change to specific game ID
 ORDER BY disposals DESC;
 
--- ============================================================================
--- WIN/LOSS ANALYSIS
--- ============================================================================
-
--- Performance in wins vs losses
-SELECT 
-    result,
-    COUNT(*) as games,
-    ROUND(AVG(disposals), 2) as avg_disposals,
-    ROUND(AVG(goals), 2) as avg_goals,
-    ROUND(AVG(tackles), 2) as avg_tackles,
-    ROUND(AVG(contested_possessions), 2) as avg_contested
-FROM vw_complete_game_stats
-WHERE player_name = 'Scott Pendlebury'
-GROUP BY result;
-
--- Games where player had great stats but team lost
-SELECT 
-    game_date,
-    round_name,
-    opponent_name,
-    location,
-    disposals,
-    goals,
-    tackles,
-    contested_possessions
-FROM vw_complete_game_stats
-WHERE player_name = 'Scott Pendlebury'
-    AND result = 'Loss'
-    AND disposals >= 30  -- Had 30+ disposals but still lost
-ORDER BY disposals DESC;
-
 -- ============================================================================
 -- FORM/TREND ANALYSIS
 -- ============================================================================
@@ -294,12 +232,10 @@ ORDER BY disposals DESC;
 -- Last N games performance
 SELECT 
     game_date,
-    round_name,
+    round_number,
     opponent_name,
     disposals,
-    goals,
-    tackles,
-    result
+    goals
 FROM vw_complete_game_stats
 WHERE player_name = 'Scott Pendlebury'
 ORDER BY game_date DESC
@@ -309,23 +245,20 @@ LIMIT 10;  -- Last 10 games
 WITH numbered_games AS (
     SELECT 
         game_date,
-        round_name,
+        round_number,
         disposals,
         goals,
-        tackles,
         ROW_NUMBER() OVER (ORDER BY game_date DESC) as game_num
     FROM vw_complete_game_stats
     WHERE player_name = 'Scott Pendlebury'
 )
 SELECT 
     game_date,
-    round_name,
+    round_number,
     disposals,
     ROUND(AVG(disposals) OVER (ORDER BY game_num DESC ROWS BETWEEN CURRENT ROW AND 4 FOLLOWING), 2) as last_5_avg_disp,
     goals,
-    ROUND(AVG(goals) OVER (ORDER BY game_num DESC ROWS BETWEEN CURRENT ROW AND 4 FOLLOWING), 2) as last_5_avg_goals,
-    tackles,
-    ROUND(AVG(tackles) OVER (ORDER BY game_num DESC ROWS BETWEEN CURRENT ROW AND 4 FOLLOWING), 2) as last_5_avg_tackles
+    ROUND(AVG(goals) OVER (ORDER BY game_num DESC ROWS BETWEEN CURRENT ROW AND 4 FOLLOWING), 2) as last_5_avg_goals
 FROM numbered_games
 ORDER BY game_date DESC
 LIMIT 10;
@@ -340,8 +273,6 @@ SELECT
     COUNT(*) as games,
     ROUND(AVG(disposals), 2) as avg_disposals,
     ROUND(AVG(goals), 2) as avg_goals,
-    ROUND(AVG(tackles), 2) as avg_tackles,
-    ROUND(AVG(contested_possessions), 2) as avg_contested,
     ROUND(100.0 * SUM(CASE WHEN disposals >= 30 THEN 1 ELSE 0 END) / COUNT(*), 1) as pct_30_plus_disp
 FROM vw_complete_game_stats
 WHERE player_name IN ('Scott Pendlebury', 'Patrick Dangerfield', 'Dustin Martin')
@@ -356,13 +287,11 @@ ORDER BY avg_disposals DESC;
 SELECT 
     player_name,
     game_date,
-    round_name,
+    round_number,
     opponent_name,
     location,
     disposals,
-    goals,
-    tackles,
-    result
+    goals
 FROM vw_complete_game_stats
 WHERE player_name = 'Scott Pendlebury'
 ORDER BY disposals DESC
@@ -372,13 +301,11 @@ LIMIT 10;
 SELECT 
     player_name,
     game_date,
-    round_name,
+    round_number,
     opponent_name,
     location,
     goals,
-    disposals,
-    score_involvements,
-    result
+    disposals
 FROM vw_complete_game_stats
 WHERE player_name = 'Scott Pendlebury'
 ORDER BY goals DESC
@@ -388,14 +315,11 @@ LIMIT 10;
 SELECT 
     player_name,
     game_date,
-    round_name,
+    round_number,
     opponent_name,
     disposals,
     goals,
-    tackles,
-    contested_possessions,
-    (disposals + (goals * 6) + (tackles * 3)) as combined_score,
-    result
+    (disposals + (goals * 6)) as combined_score
 FROM vw_complete_game_stats
 WHERE player_name = 'Scott Pendlebury'
 ORDER BY combined_score DESC
@@ -55,6 +55,10 @@ CREATE TABLE games (
     away_team_id INTEGER NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    -- Integer forms of game_date and game_type (see database/storage_codes.py)
+    game_day INTEGER GENERATED ALWAYS AS (CAST(JULIANDAY(game_date) - 2440587.5 AS INTEGER)) VIRTUAL,  -- Days since 1970-01-01
+    game_type_code INTEGER GENERATED ALWAYS AS (CASE game_type WHEN 'Pre-Season' THEN 0 WHEN 'Regular Season' THEN 1 WHEN 'Finals' THEN 2 END) VIRTUAL,
     
     FOREIGN KEY (venue_id) REFERENCES venues(venue_id),
     FOREIGN KEY (home_team_id) REFERENCES teams(team_id),
@@ -69,7 +73,8 @@ CREATE INDEX idx_games_season ON games(season_year);
 CREATE INDEX idx_games_home_team ON games(home_team_id);
 CREATE INDEX idx_games_away_team ON games(away_team_id);
 CREATE INDEX idx_games_venue ON games(venue_id);
-CREATE INDEX idx_games_type ON games(game_type);
+CREATE INDEX idx_games_day ON games(game_day);
+CREATE INDEX idx_games_type_code ON games(game_type_code);
 
 -- ============================================================================
 -- PLAYER GAME STATS TABLE (Main table for analysis)
@@ -96,6 +101,10 @@ CREATE TABLE player_game_stats (
     -- Metadata
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    -- Codes for location and game_time (see database/storage_codes.py)
+    location_code INTEGER GENERATED ALWAYS AS (CASE location WHEN 'Home' THEN 0 WHEN 'Away' THEN 1 END) VIRTUAL,
+    game_time_code INTEGER GENERATED ALWAYS AS (CASE game_time WHEN 'Day' THEN 0 WHEN 'Twilight' THEN 1 WHEN 'Night' THEN 2 END) VIRTUAL,
     
     FOREIGN KEY (player_id) REFERENCES players(player_id),
     FOREIGN KEY (game_id) REFERENCES games(game_id),
@@ -115,8 +124,8 @@ CREATE INDEX idx_pgs_game ON player_game_stats(game_id);
 CREATE INDEX idx_pgs_team ON player_game_stats(team_id);
 CREATE INDEX idx_pgs_opponent ON player_game_stats(opponent_team_id);
 CREATE INDEX idx_pgs_venue ON player_game_stats(venue_id);
-CREATE INDEX idx_pgs_location ON player_game_stats(location);
-CREATE INDEX idx_pgs_game_time ON player_game_stats(game_time);
+CREATE INDEX idx_pgs_location_code ON player_game_stats(location_code);
+CREATE INDEX idx_pgs_game_time_code ON player_game_stats(game_time_code);
 CREATE INDEX idx_pgs_player_date ON player_game_stats(player_id, game_id);
 
 -- ============================================================================
@@ -141,13 +150,94 @@ CREATE INDEX idx_pth_player ON player_team_history(player_id);
 CREATE INDEX idx_pth_team ON player_team_history(team_id);
 CREATE INDEX idx_pth_current ON player_team_history(is_current);
 
+-- ============================================================================
+-- TEAM GAME STATS (Per-team totals for team markets)
+-- ============================================================================
+
+-- Team Game Stats: Each team's totals per game plus what it conceded.
+-- Rebuilt by the ETL for the games each load touches.
+-- Keep in step with database/team_stats.py and add_team_game_stats_migration.sql.
+CREATE TABLE team_game_stats (
+    game_id INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    opponent_team_id INTEGER NOT NULL,
+    venue_id INTEGER NOT NULL,
+    location TEXT NOT NULL,            -- 'Home' or 'Away'
+    game_time TEXT,                    -- 'Day', 'Twilight', or 'Night'
+    players INTEGER NOT NULL,          -- Player rows summed
+    disposals INTEGER,                 -- NULL when no player row recorded the stat
+    goals INTEGER,
+    conceded_disposals INTEGER,        -- Opponent's totals; NULL until their rows load
+    conceded_goals INTEGER,
+
+    PRIMARY KEY (game_id, team_id),
+    CHECK (location IN ('Home', 'Away'))
+);
+
+CREATE INDEX idx_tgs_team ON team_game_stats(team_id);
+
+-- ============================================================================
+-- CHANGE LOG (Change-data-capture for API caches)
+-- ============================================================================
+
+-- Change Log: One row per ETL insert/update, written in the same transaction.
+-- API caches remember the last seq they applied and refresh only what changed.
+CREATE TABLE change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,   -- Monotonically increasing
+    entity TEXT NOT NULL,                    -- 'players', 'games' or 'player_game_stats'
+    op TEXT NOT NULL,                        -- 'insert' or 'update'
+    entity_id INTEGER NOT NULL,              -- 0 for table-wide updates
+    player_id INTEGER,                       -- Affected player, when known
+    game_id INTEGER,                         -- Affected game, when known
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    CHECK (entity IN ('players', 'games', 'player_game_stats')),
+    CHECK (op IN ('insert', 'update'))
+);
+
+-- ============================================================================
+-- LIVE STATS (Provisional totals for games in progress)
+-- ============================================================================
+
+-- Live Player Game Stats: Running totals for games in progress. Promoted into
+-- player_game_stats (and deleted from here) when the game finishes.
+CREATE TABLE live_player_game_stats (
+    player_id INTEGER NOT NULL,
+    game_id INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    opponent_team_id INTEGER NOT NULL,
+    venue_id INTEGER NOT NULL,
+    location TEXT NOT NULL,            -- 'Home' or 'Away'
+    game_time TEXT,                    -- 'Day', 'Twilight', or 'Night'
+    disposals INTEGER NOT NULL DEFAULT 0,
+    goals INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (player_id, game_id),
+    CHECK (location IN ('Home', 'Away')),
+    CHECK (game_time IS NULL OR game_time IN ('Day', 'Twilight', 'Night'))
+);
+
+-- ============================================================================
+-- CODE LOOKUP TABLES
+-- ============================================================================
+
+-- Decode the *_code columns: code is the value's position in CATEGORY_CODES
+CREATE TABLE location_codes (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+INSERT INTO location_codes (code, name) VALUES (0, 'Home'), (1, 'Away');
+CREATE TABLE game_type_codes (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+INSERT INTO game_type_codes (code, name) VALUES (0, 'Pre-Season'), (1, 'Regular Season'), (2, 'Finals');
+CREATE TABLE game_time_codes (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+INSERT INTO game_time_codes (code, name) VALUES (0, 'Day'), (1, 'Twilight'), (2, 'Night');
+
 -- ============================================================================
 -- VIEWS FOR COMMON QUERIES
 -- ============================================================================
 
--- Complete game stats view: Joins all relevant information for easy querying
+-- Complete game stats view: Joins all relevant information for easy querying.
+-- Categorical columns are decoded from their codes.
 CREATE VIEW vw_complete_game_stats AS
-SELECT 
+SELECT
     pgs.stat_id,
     pgs.player_id,
     p.player_name,
@@ -155,17 +245,21 @@ SELECT
     p.last_name,
     pgs.game_id,
     g.game_date,
+    g.game_day,
     g.season_year,
     g.round_number,
-    g.game_type,
+    game_type.name AS game_type,
+    g.game_type_code,
     pgs.team_id,
     t.team_name,
     pgs.opponent_team_id,
     opponent.team_name AS opponent_name,
     pgs.venue_id,
     v.venue_name,
-    pgs.location,
-    pgs.game_time,
+    location.name AS location,
+    pgs.location_code,
+    game_time.name AS game_time,
+    pgs.game_time_code,
     -- Player stats
     pgs.disposals,
     pgs.goals,
@@ -175,7 +269,10 @@ JOIN players p ON pgs.player_id = p.player_id
 JOIN games g ON pgs.game_id = g.game_id
 JOIN teams t ON pgs.team_id = t.team_id
 JOIN teams opponent ON pgs.opponent_team_id = opponent.team_id
-JOIN venues v ON pgs.venue_id = v.venue_id;
+JOIN venues v ON pgs.venue_id = v.venue_id
+LEFT JOIN game_type_codes game_type ON g.game_type_code = game_type.code
+LEFT JOIN location_codes location ON pgs.location_code = location.code
+LEFT JOIN game_time_codes game_time ON pgs.game_time_code = game_time.code;
 
 -- ============================================================================
 -- HELPER FUNCTIONS / TRIGGERS
@@ -0,0 +1,202 @@
+"""
+Query access log for /search/* endpoints.
+
+Request handlers call AccessLog.record(), which only appends to a bounded
+in-memory ring buffer and updates the heavy-hitter counters; a background
+thread drains the buffer to an NDJSON file. If the writer falls behind, the
+oldest unwritten entries are dropped rather than slowing requests down.
+
+Heavy hitters use the space-saving algorithm: a fixed number of counters,
+where a new key evicts the smallest one and inherits its count as error.
+Any key with true frequency above total / capacity is guaranteed to be kept.
+A min-heap finds the smallest counter in O(log capacity) per add.
+"""
+
+import heapq
+import json
+import threading
+import time
+from collections import deque
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+DEFAULT_BUFFER_SIZE = 10000
+DEFAULT_HOT_KEYS_CAPACITY = 1000
+DEFAULT_CUTOFF_REFRESH = 100
+FLUSH_INTERVAL_SECONDS = 1.0
+
+
+class SpaceSaving:
+    """Approximate top-K counter over a stream using `capacity` counters"""
+
+    def __init__(self, capacity: int = DEFAULT_HOT_KEYS_CAPACITY, cutoff_refresh: int = DEFAULT_CUTOFF_REFRESH):
+        self.capacity = capacity
+        self.total = 0
+        # key -> [count, error]; count overestimates the true count by at most error
+        self._counters: Dict[Hashable, List[int]] = {}
+        # (count, seq, key) pushed on every change; entries whose count is no
+        # longer the key's are skipped when popped and dropped on compaction
+        self._heap: List[Tuple[int, int, Hashable]] = []
+        self._seq = 0
+        # guaranteed() ranks the counters at most once per cutoff_refresh adds
+        self.cutoff_refresh = cutoff_refresh
+        self._cutoff: Optional[Tuple[int, Set[Hashable], Optional[int]]] = None
+        self._adds_since_cutoff = 0
+
+    def _push(self, key: Hashable, count: int):
+        self._seq += 1
+        heapq.heappush(self._heap, (count, self._seq, key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, i, k) for i, (k, (c, _)) in enumerate(self._counters.items())]
+            heapq.heapify(self._heap)
+
+    def _pop_smallest(self) -> int:
+        """Evict the key with the smallest count; returns that count"""
+        while True:
+            count, _, key = heapq.heappop(self._heap)
+            counter = self._counters.get(key)
+            if counter is not None and counter[0] == count:
+                del self._counters[key]
+                return count
+
+    def add(self, key: Hashable, weight: int = 1):
+        self.total += weight
+        self._adds_since_cutoff += 1
+        counter = self._counters.get(key)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self._counters) < self.capacity:
+            counter = self._counters[key] = [weight, 0]
+        else:
+            floor = self._pop_smallest()
+            counter = self._counters[key] = [floor + weight, floor]
+        self._push(key, counter[0])
+
+    def top(self, k: Optional[int] = None) -> List[Tuple[Hashable, int, int]]:
+        """(key, count, error) by descending count"""
+        if k is None:
+            ranked = sorted(self._counters.items(), key=lambda item: item[1][0], reverse=True)
+        else:
+            ranked = heapq.nlargest(k, self._counters.items(), key=lambda item: item[1][0])
+        return [(key, count, error) for key, (count, error) in ranked]
+
+    def guaranteed(self, key: Hashable, k: int) -> bool:
+        """
+        True if key is certainly among the top k (its lower bound beats the
+        k+1th count). The top k and the k+1th count are refreshed every
+        cutoff_refresh adds, so a key's rank may lag by that many requests.
+        """
+        if self._cutoff is None or self._cutoff[0] != k or self._adds_since_cutoff >= self.cutoff_refresh:
+            ranked = self.top(k + 1)
+            next_count = ranked[k][1] if len(ranked) > k else None
+            self._cutoff = (k, {candidate for candidate, _, _ in ranked[:k]}, next_count)
+            self._adds_since_cutoff = 0
+        _, top_keys, next_count = self._cutoff
+        counter = self._counters.get(key)
+        if key not in top_keys or counter is None:
+            return False
+        return next_count is None or counter[0] - counter[1] >= next_count
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._counters
+
+
+class AccessLog:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        hot_keys_capacity: int = DEFAULT_HOT_KEYS_CAPACITY,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # (player_id, stat) and (player_id, stat, threshold)
+        self.players = SpaceSaving(hot_keys_capacity)
+        self.thresholds = SpaceSaving(hot_keys_capacity)
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+
+    def record(self, endpoint: str, player_id: int, stat: str, threshold: float):
+        entry = {
+            "ts": round(time.time(), 3),
+            "endpoint": endpoint,
+            "player_id": player_id,
+            "stat": stat,
+            "threshold": threshold,
+        }
+        with self._lock:
+            self.recorded += 1
+            self.players.add((player_id, stat))
+            self.thresholds.add((player_id, stat, threshold))
+            if not self.path:
+                return
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(entry)
+        if self._thread is None:
+            self._start_writer()
+
+    def is_hot(self, player_id: int, stat: str, k: int) -> bool:
+        with self._lock:
+            return self.players.guaranteed((player_id, stat), k)
+
+    def snapshot(self, k: int) -> dict:
+        with self._lock:
+            return {
+                "recorded": self.recorded,
+                "written": self.written,
+                "dropped": self.dropped,
+                "buffered": len(self._buffer),
+                "players": [
+                    {"player_id": pid, "stat": stat, "count": count, "error": error}
+                    for (pid, stat), count, error in self.players.top(k)
+                ],
+                "thresholds": [
+                    {"player_id": pid, "stat": stat, "threshold": threshold, "count": count, "error": error}
+                    for (pid, stat, threshold), count, error in self.thresholds.top(k)
+                ],
+            }
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns entries written"""
+        with self._lock:
+            entries = list(self._buffer)
+            self._buffer.clear()
+        if not entries or not self.path:
+            return 0
+        with open(self.path, "a") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        with self._lock:
+            self.written += len(entries)
+        return len(entries)
+
+    def _start_writer(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="access-log", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop the writer and flush what's left (on shutdown)"""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except OSError:
+                # Losing log lines must never take the API down
+                continue
@@ -0,0 +1,118 @@
+"""
+Leak-free backtesting of over/under betting strategies.
+
+A point is (player, game, line, odds). The strategy may only see the
+player's games before that one, so the counts it gets are what
+/search/over-under with as_of=<game date> would have returned. Store rows
+are date-ordered per player, which makes those counts exclusive prefix
+sums of the hit mask within each player's slice. Stats are integers, so
+every line maps to an integer cut-off and one cumulative sum per distinct
+cut-off covers every point at every game.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+from app.pricing import implied_probabilities, posterior_mean
+from app.stat_store import StatStore, first_over_values
+
+ESTIMATORS = ("empirical", "posterior")
+SIDES = ("both", "over", "under")
+
+
+def prior_counts(
+    store: StatStore, rows: np.ndarray, stat: str, lines: np.ndarray, strict_over: bool
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (overs before, games before, went over) for each point, where a point is
+    a store row and a line. Only rows strictly before the point's row count,
+    and rows with the stat NULL don't count as games.
+    """
+    values = store.stats[stat]
+    n = len(store)
+    player_id = store.player_id
+    first = np.flatnonzero(np.append(True, player_id[1:] != player_id[:-1])) if n else np.empty(0, dtype=np.int64)
+    player_start = np.repeat(first, np.diff(np.append(first, n)))
+
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = player_start[rows]
+    cuts = first_over_values(lines, strict_over)
+    over = np.zeros(len(rows), dtype=np.int64)
+    games = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(values >= 0, out=games[1:])
+    for cut in np.unique(cuts):
+        points = np.flatnonzero(cuts == cut)
+        # prefix[r] = overs in rows [0, r)
+        prefix = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(values >= cut, out=prefix[1:])
+        over[points] = prefix[rows[points]] - prefix[starts[points]]
+    return over, games[rows] - games[starts], values[rows] >= cuts
+
+
+def _summary(bet: np.ndarray, won: np.ndarray, odds: np.ndarray, stake: float) -> Dict[str, object]:
+    bets = int(bet.sum())
+    wins = int((bet & won).sum())
+    profit = float(np.where(won, stake * (odds - 1), -stake)[bet].sum())
+    staked = bets * stake
+    return {
+        "bets": bets,
+        "wins": wins,
+        "hit_rate": wins / bets if bets else None,
+        "staked": staked,
+        "profit": profit,
+        "roi": profit / staked if staked else None,
+    }
+
+
+def backtest(
+    store: StatStore,
+    rows: np.ndarray,
+    stat: str,
+    lines: np.ndarray,
+    over_odds: np.ndarray,
+    under_odds: np.ndarray,
+    strict_over: bool = False,
+    min_games: int = 5,
+    min_edge: float = 0.05,
+    estimator: str = "posterior",
+    sides: str = "both",
+    stake: float = 1.0,
+) -> Dict[str, object]:
+    """
+    Bet the side whose estimated probability beats the margin-free implied
+    probability by at least min_edge, once the player has min_games prior
+    games, and settle every bet against what actually happened.
+    """
+    over, games, went_over = prior_counts(store, rows, stat, lines, strict_over)
+    # A point whose own stat is NULL can't be settled
+    settled = store.recorded(rows, stat)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        estimate = posterior_mean(over, games) if estimator == "posterior" else over / games
+    fair_over = implied_probabilities(over_odds, under_odds)["fair_over"]
+    edge = estimate - fair_over
+
+    eligible = (games >= min_games) & np.isfinite(estimate) & settled
+    bet_over = eligible & (edge > 0) & (edge >= min_edge) & (sides != "under")
+    bet_under = eligible & (edge < 0) & (-edge >= min_edge) & (sides != "over")
+
+    by_side = {
+        "over": _summary(bet_over, went_over, over_odds, stake),
+        "under": _summary(bet_under, ~went_over, under_odds, stake),
+    }
+    total = _summary(
+        bet_over | bet_under,
+        np.where(bet_over, went_over, ~went_over),
+        np.where(bet_over, over_odds, under_odds),
+        stake,
+    )
+    outcomes = went_over[eligible].astype(np.float64)
+    return {
+        "points": len(rows),
+        "eligible": int(eligible.sum()),
+        **total,
+        "by_side": by_side,
+        # Calibration of the estimate itself, whether or not it was bet
+        "brier": float(np.mean((estimate[eligible] - outcomes) ** 2)) if eligible.any() else None,
+        "mean_edge": float(np.abs(edge[bet_over | bet_under]).mean()) if total["bets"] else None,
+    }
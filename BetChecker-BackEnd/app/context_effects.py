@@ -0,0 +1,121 @@
+"""
+Per-season opponent and venue effects, estimated from every player's games.
+
+For each season, context (an opponent or a venue) and stat, the effect is
+the context's mean stat divided by the season's league-wide mean, shrunk
+toward 1.0 with PRIOR_GAMES pseudo-games so thin samples don't swing it.
+An effect of 1.08 for an opponent means players average 8% more against them.
+
+Only sums and counts are stored (dense [season, context id] arrays, per
+stat so a NULL stat, stored as -1, counts toward neither), so a change to a few players' rows is applied by subtracting their old rows and
+adding the new ones instead of re-aggregating the whole table.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+CONTEXTS = ("opponent_team_id", "venue_id")
+PRIOR_GAMES = 50
+
+
+class ContextEffects:
+    def __init__(
+        self,
+        stats: Tuple[str, ...],
+        first_season: int,
+        counts: Dict[Tuple[str, str], np.ndarray],
+        sums: Dict[Tuple[str, str], np.ndarray],
+    ):
+        self.stats = stats
+        self.first_season = first_season
+        self.counts = counts
+        self.sums = sums
+
+    @classmethod
+    def empty(cls, stats: Tuple[str, ...]) -> "ContextEffects":
+        counts = {(context, stat): np.zeros((0, 0), dtype=np.int64) for context in CONTEXTS for stat in stats}
+        sums = {(context, stat): np.zeros((0, 0), dtype=np.int64) for context in CONTEXTS for stat in stats}
+        return cls(stats, 0, counts, sums)
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray], stats: Tuple[str, ...]) -> "ContextEffects":
+        return cls.empty(stats).updated(added=columns)
+
+    def _resized(self, seasons: np.ndarray, context_ids: Dict[str, np.ndarray]) -> "ContextEffects":
+        """Copy with arrays large enough to index the given seasons and context ids"""
+        n_seasons = self.counts[(CONTEXTS[0], self.stats[0])].shape[0]
+        first = self.first_season if n_seasons else int(seasons.min())
+        first = min(first, int(seasons.min()))
+        last = max(self.first_season + n_seasons - 1 if n_seasons else first, int(seasons.max()))
+        pad_front = (self.first_season - first) if n_seasons else 0
+        rows = last - first + 1
+
+        def grow(arr: np.ndarray, width: int) -> np.ndarray:
+            out = np.zeros((rows, width), dtype=np.int64)
+            out[pad_front:pad_front + arr.shape[0], :arr.shape[1]] = arr
+            return out
+
+        counts, sums = {}, {}
+        for context in CONTEXTS:
+            width = max(self.counts[(context, self.stats[0])].shape[1], int(context_ids[context].max()) + 1)
+            for stat in self.stats:
+                counts[(context, stat)] = grow(self.counts[(context, stat)], width)
+                sums[(context, stat)] = grow(self.sums[(context, stat)], width)
+        return ContextEffects(self.stats, first, counts, sums)
+
+    def updated(
+        self, removed: Optional[Dict[str, np.ndarray]] = None, added: Optional[Dict[str, np.ndarray]] = None
+    ) -> "ContextEffects":
+        """New effects with `removed` rows taken out and `added` rows put in (column dicts)"""
+        deltas = [(cols, sign) for cols, sign in ((removed, -1), (added, 1)) if cols is not None and len(cols["season_year"])]
+        if not deltas:
+            return self
+        seasons = np.concatenate([cols["season_year"] for cols, _ in deltas])
+        ids = {context: np.concatenate([cols[context] for cols, _ in deltas]) for context in CONTEXTS}
+        effects = self._resized(seasons, ids)
+        n_seasons = effects.counts[(CONTEXTS[0], self.stats[0])].shape[0]
+        for cols, sign in deltas:
+            season_idx = (cols["season_year"] - effects.first_season).astype(np.int64)
+            for context in CONTEXTS:
+                width = effects.counts[(context, self.stats[0])].shape[1]
+                flat = season_idx * width + cols[context]
+                size = n_seasons * width
+                for stat in self.stats:
+                    # Like AVG(stat): NULL stats (-1) are in neither the counts nor the sums
+                    recorded = cols[stat] >= 0
+                    counts = np.bincount(flat[recorded], minlength=size)
+                    totals = np.bincount(flat[recorded], weights=cols[stat][recorded].astype(np.float64), minlength=size)
+                    effects.counts[(context, stat)] += sign * counts.reshape(n_seasons, width)
+                    effects.sums[(context, stat)] += sign * totals.astype(np.int64).reshape(n_seasons, width)
+        return effects
+
+    def factors(self, context: str, stat: str, seasons: np.ndarray, context_ids: np.ndarray) -> np.ndarray:
+        """Effect for each (season, context id); 1.0 where there's no data"""
+        counts = self.counts[(context, stat)]
+        result = np.ones(len(seasons), dtype=np.float64)
+        if counts.size == 0:
+            return result
+        season_idx = np.asarray(seasons) - self.first_season
+        context_ids = np.asarray(context_ids)
+        known = (season_idx >= 0) & (season_idx < counts.shape[0]) & (context_ids >= 0) & (context_ids < counts.shape[1])
+        s, c = season_idx[known], context_ids[known]
+        sums = self.sums[(context, stat)]
+        season_games = counts.sum(axis=1)[s]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            league_mean = sums.sum(axis=1)[s] / season_games
+            shrunk = (sums[s, c] + PRIOR_GAMES * league_mean) / (counts[s, c] + PRIOR_GAMES)
+            factor = shrunk / league_mean
+        result[known] = np.where(np.isfinite(factor) & (factor > 0), factor, 1.0)
+        return result
+
+    def latest_factor(self, context: str, stat: str, context_id: int) -> float:
+        """Effect in the most recent season the context appears in (for an upcoming game)"""
+        counts = self.counts[(context, stat)]
+        if counts.size == 0 or not 0 <= context_id < counts.shape[1]:
+            return 1.0
+        seasons = np.flatnonzero(counts[:, context_id])
+        if not len(seasons):
+            return 1.0
+        season = self.first_season + int(seasons[-1])
+        return float(self.factors(context, stat, np.array([season]), np.array([context_id]))[0])
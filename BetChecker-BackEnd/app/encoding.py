@@ -0,0 +1,148 @@
+"""
+Content negotiation for bulk clients.
+
+JSON stays the default (and the frontend contract). Clients that send
+`Accept: application/x-msgpack` or `Accept: application/vnd.apache.arrow.stream`
+get the same data as columns (one array per field) in a binary encoding,
+and any encoded body above COMPRESS_MIN_BYTES is compressed with zstd or
+gzip per Accept-Encoding. Any Accept value we don't recognize gets JSON.
+
+msgpack, pyarrow and zstandard are optional: a format whose library isn't
+installed is simply not offered.
+"""
+
+import gzip
+import importlib.util
+import json
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+JSON = "application/json"
+MSGPACK = "application/x-msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+DEFAULT_COMPRESS_MIN_BYTES = 1024
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 6
+
+
+@lru_cache(maxsize=None)
+def _has_module(name: str) -> bool:
+    # find_spec checks without importing, so JSON requests never load pyarrow
+    return importlib.util.find_spec(name) is not None
+
+
+def available_media_types() -> List[str]:
+    types = [JSON]
+    if _has_module("msgpack"):
+        types.append(MSGPACK)
+    if _has_module("pyarrow"):
+        types.append(ARROW)
+    return types
+
+
+def available_encodings() -> List[str]:
+    return (["zstd"] if _has_module("zstandard") else []) + ["gzip"]
+
+
+def _parse_accept(header: Optional[str], refused: bool = False) -> List[Tuple[str, float]]:
+    """(value, q) pairs in preference order: by q, then header order; q=0 entries only if refused"""
+    entries = []
+    for index, part in enumerate((header or "").split(",")):
+        fields = [f.strip() for f in part.split(";")]
+        if not fields[0]:
+            continue
+        q = 1.0
+        for param in fields[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        entries.append((fields[0].lower(), q, index))
+    entries.sort(key=lambda e: (-e[1], e[2]))
+    return [(value, q) for value, q, _ in entries if q > 0 or refused]
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """Best supported media type for an Accept header; JSON when none of it is recognized"""
+    offered = available_media_types()
+    for value, _ in _parse_accept(accept):
+        if value in offered:
+            return value
+    return JSON
+
+
+def negotiate_encoding(accept_encoding: Optional[str], offered: Optional[Sequence[str]] = None) -> Optional[str]:
+    """Best of offered (default: every available encoding) for an Accept-Encoding header"""
+    offered = available_encodings() if offered is None else offered
+    entries = _parse_accept(accept_encoding, refused=True)
+    # "*" stands for any encoding the header doesn't name, so gzip;q=0 stays refused
+    named = {value for value, _ in entries}
+    for value, q in entries:
+        if q <= 0:
+            break
+        if value == "*":
+            return next((encoding for encoding in offered if encoding not in named), None)
+        if value in offered:
+            return value
+    return None
+
+
+def requested_media_type(request: Request) -> str:
+    return negotiate_media_type(request.headers.get("accept"))
+
+
+def _to_list(column: Sequence) -> list:
+    return column.tolist() if hasattr(column, "tolist") else list(column)
+
+
+def encode(media_type: str, columns: Dict[str, Sequence], metadata: Optional[dict] = None) -> bytes:
+    """Serialize columns (lists or NumPy arrays) plus scalar metadata"""
+    metadata = metadata or {}
+    if media_type == ARROW:
+        import pyarrow as pa
+
+        table = pa.table(
+            {name: pa.array(col) for name, col in columns.items()},
+            metadata={key: json.dumps(value) for key, value in metadata.items()},
+        )
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    body = {**metadata, "columns": {name: _to_list(col) for name, col in columns.items()}}
+    if media_type == MSGPACK:
+        import msgpack
+
+        return msgpack.packb(body)
+    return json.dumps(body, separators=(",", ":")).encode()
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def columnar_response(
+    request: Request,
+    media_type: str,
+    columns: Dict[str, Sequence],
+    metadata: Optional[dict] = None,
+    compress_min_bytes: int = DEFAULT_COMPRESS_MIN_BYTES,
+) -> Response:
+    body = encode(media_type, columns, metadata)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= compress_min_bytes:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        if encoding:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,132 @@
+"""
+Streaming game-log export.
+
+Rows are read in fixed-size chunks with keyset pagination on
+(game_date, game_id, stat_id): each chunk is its own short query that
+resumes after the last key of the previous one. Memory stays at one chunk
+whatever the result size, and no read transaction is held open for the
+whole stream, so the ETL's checkpoints are never blocked by a slow client.
+"""
+
+import csv
+import io
+import json
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from database.connection import DEFAULT_BUSY_TIMEOUT_MS, connect_reader
+
+EXPORT_COLUMNS = (
+    "stat_id",
+    "player_id",
+    "player_name",
+    "game_id",
+    "game_date",
+    "season_year",
+    "round_number",
+    "game_type",
+    "team_name",
+    "opponent_name",
+    "venue_name",
+    "location",
+    "game_time",
+    "disposals",
+    "goals",
+    "days_since_last_game",
+)
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+DEFAULT_CHUNK_SIZE = 1000
+# Rows per body chunk sent to the client
+LINES_PER_WRITE = 200
+
+Cursor = Tuple[str, int, int]
+
+
+def parse_cursor(after: Optional[str]) -> Optional[Cursor]:
+    """'game_date,game_id,stat_id' (the last row received) -> keyset tuple"""
+    if not after:
+        return None
+    parts = after.split(",")
+    if len(parts) != 3:
+        raise ValueError("Cursor must be game_date,game_id,stat_id")
+    return parts[0], int(parts[1]), int(parts[2])
+
+
+def export_sql(where: List[str]) -> str:
+    clauses = where + ["(game_date, game_id, stat_id) > (:after_date, :after_game_id, :after_stat_id)"]
+    return f"""
+        SELECT {', '.join(EXPORT_COLUMNS)}
+        FROM vw_complete_game_stats
+        WHERE {' AND '.join(clauses)}
+        ORDER BY game_date, game_id, stat_id
+        LIMIT :chunk
+    """
+
+
+def iter_rows(
+    db_path: str,
+    where: List[str],
+    params: Dict[str, object],
+    after: Optional[Cursor] = None,
+    limit: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+) -> Iterator[sqlite3.Row]:
+    """Yield matching rows in keyset order, at most `limit`, one chunk in memory at a time"""
+    sql = export_sql(where)
+    # Empty string sorts before every date, so no cursor means from the start
+    key: Cursor = after or ("", 0, 0)
+    remaining = limit
+    # Pinned to one file: a snapshot swap mid-stream doesn't mix databases
+    conn = connect_reader(db_path, busy_timeout_ms)
+    try:
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            chunk_params = {
+                **params,
+                "after_date": key[0],
+                "after_game_id": key[1],
+                "after_stat_id": key[2],
+                "chunk": size,
+            }
+            rows = conn.execute(sql, chunk_params).fetchall()
+            yield from rows
+            if len(rows) < size:
+                return
+            last = rows[-1]
+            key = (last["game_date"], last["game_id"], last["stat_id"])
+            if remaining is not None:
+                remaining -= len(rows)
+    finally:
+        conn.close()
+
+
+def ndjson_lines(rows: Iterator[sqlite3.Row]) -> Iterator[str]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({col: row[col] for col in EXPORT_COLUMNS}) + "\n")
+        if len(lines) == LINES_PER_WRITE:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def csv_lines(rows: Iterator[sqlite3.Row]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    pending = 0
+    for row in rows:
+        writer.writerow([row[col] for col in EXPORT_COLUMNS])
+        pending += 1
+        if pending == LINES_PER_WRITE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    # Also covers the header alone for an empty result
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -1,10 +1,27 @@
 import os
 import sqlite3
-from typing import Optional
-from fastapi import FastAPI, HTTPException, Query
+import math
+import threading
+import time
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
+from app.export import EXPORT_FORMATS, csv_lines, iter_rows, ndjson_lines, parse_cursor
+from app.encoding import DEFAULT_COMPRESS_MIN_BYTES, JSON, columnar_response, negotiate_encoding, requested_media_type
+from app.access_log import DEFAULT_BUFFER_SIZE, DEFAULT_HOT_KEYS_CAPACITY, AccessLog
+from app.rate_limit import BULK_USAGE, EXEMPT_PATHS, ClientRateLimiter, LoadShedder, is_bulk
+from app.single_flight import SingleFlight
+from app.warmup import WARMUP_MODES, WarmupState, start_warmup
+from database.connection import DEFAULT_BUSY_TIMEOUT_MS, connect_reader, file_version, is_busy_error
+from database.snapshots import SnapshotPointer
+from database.storage_codes import CATEGORY_CODES, has_storage_codes
+from database.team_stats import TEAM_TOTALS_FALLBACK_SQL, has_team_game_stats
+
 # Calculate database path relative to this file's location
 # __file__ is app/main.py, so we go up one level to BetChecker-BackEnd, then into BetChecker-PlayerDatabase
 _current_file = os.path.abspath(__file__)  # /path/to/BetChecker-BackEnd/app/main.py
@@ -18,8 +35,77 @@ DB_PATH = os.getenv("DB_PATH", DEFAULT_DB_PATH)
 # Ensure the path is absolute
 DB_PATH = os.path.abspath(DB_PATH)
 
+# Optional blue/green pointer file written by database/snapshots.py. When set,
+# each new connection goes to the currently published snapshot and DB_PATH is
+# only the fallback before the first publish.
+DB_POINTER = os.getenv("DB_POINTER")
+_db_pointer = SnapshotPointer(os.path.abspath(DB_POINTER)) if DB_POINTER else None
+
+# How long a request waits on a lock (e.g. during a checkpoint) before failing
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", DEFAULT_BUSY_TIMEOUT_MS))
+
+# Startup warm-up: background (serve immediately, /ready flips when done),
+# blocking (finish before accepting requests) or off
+WARMUP = os.getenv("WARMUP", "background").lower()
+# Pin over/under histograms for this many of the most queried (player, stat) pairs
+WARMUP_TOP_N = int(os.getenv("WARMUP_TOP_N", 200))
+# NDJSON access log of /search/* queries, written by app/access_log.py and
+# read back by warm-up to pick the top-N
+ACCESS_LOG_PATH = os.getenv("ACCESS_LOG_PATH")
+ACCESS_LOG_BUFFER = int(os.getenv("ACCESS_LOG_BUFFER", DEFAULT_BUFFER_SIZE))
+HOT_KEYS_CAPACITY = int(os.getenv("HOT_KEYS_CAPACITY", DEFAULT_HOT_KEYS_CAPACITY))
+
+# Binary (msgpack/Arrow) and batch responses larger than this are compressed
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", DEFAULT_COMPRESS_MIN_BYTES))
+
+# Precomputed prop boards written by scripts/build_prop_board.py
+BOARD_DIR = os.getenv("BOARD_DIR", os.path.join(_backend_dir, "BetChecker-PlayerDatabase", "boards"))
+
+# /simulate runs of at least SIMULATION_POOL_MIN_TRIALS fan out over this many
+# worker processes (0: always in-process)
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", 0))
+SIMULATION_POOL_MIN_TRIALS = int(os.getenv("SIMULATION_POOL_MIN_TRIALS", 1_000_000))
+
+# Per-client quotas (app/rate_limit.py), keyed by X-API-Key or else client IP:
+# a bucket of RATE_LIMIT_BURST refilling at RATE_LIMIT_RPS, and at most
+# RATE_LIMIT_PER_MINUTE over any minute. RATE_LIMIT_RPS=0 turns them off.
+RATE_LIMIT_RPS = float(os.getenv("RATE_LIMIT_RPS", 10))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", 40))
+RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", 300))
+# Key on the first X-Forwarded-For address (only behind a proxy that sets it)
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "").lower() in ("1", "true")
+# Comma-separated X-API-Key values that get their own quota; any other key is
+# ignored and the client is limited by IP, so rotating keys gains nothing.
+# /admin/* only answers these keys (and is closed while the list is empty)
+API_KEYS = frozenset(key.strip() for key in os.getenv("API_KEYS", "").split(",") if key.strip())
+# Bulk requests are shed while interactive latency averages over
+# SHED_LATENCY_TARGET_MS or more than SHED_MAX_IN_FLIGHT requests are
+# running. SHED_LATENCY_TARGET_MS=0 turns shedding off.
+SHED_LATENCY_TARGET_MS = float(os.getenv("SHED_LATENCY_TARGET_MS", 250))
+SHED_MAX_IN_FLIGHT = int(os.getenv("SHED_MAX_IN_FLIGHT", 32))
+
+rate_limiter = (
+    ClientRateLimiter(RATE_LIMIT_RPS, RATE_LIMIT_BURST, RATE_LIMIT_PER_MINUTE) if RATE_LIMIT_RPS > 0 else None
+)
+load_shedder = LoadShedder(SHED_LATENCY_TARGET_MS / 1000, SHED_MAX_IN_FLIGHT) if SHED_LATENCY_TARGET_MS > 0 else None
+
+warmup_state = WarmupState()
+access_log = AccessLog(ACCESS_LOG_PATH, ACCESS_LOG_BUFFER, HOT_KEYS_CAPACITY)
+# Identical concurrent /search/over-under requests run one query between them
+search_flights = SingleFlight()
+
 app = FastAPI(title="AFL Player Over/Under Search API")
 
+
+def current_db_path() -> str:
+    """Database file for a new connection: the published snapshot if any, else DB_PATH"""
+    if _db_pointer is not None:
+        published = _db_pointer.resolve()
+        if published:
+            return published
+    return DB_PATH
+
+
 @app.get("/")
 def root():
     """Root endpoint - redirects to API docs"""
@@ -34,14 +120,120 @@ async def startup_event():
     """Log database path on startup for debugging"""
     import logging
     logger = logging.getLogger("uvicorn")
-    logger.info(f"Database path configured: {DB_PATH}")
-    logger.info(f"Database exists: {os.path.exists(DB_PATH)}")
-    if not os.path.exists(DB_PATH):
-        logger.error(f"WARNING: Database file not found at {DB_PATH}")
+    db_path = current_db_path()
+    if _db_pointer is not None:
+        logger.info(f"Snapshot pointer: {_db_pointer.pointer_path} (version {_db_pointer.version})")
+    logger.info(f"Database path configured: {db_path}")
+    logger.info(f"Database exists: {os.path.exists(db_path)}")
+    if not os.path.exists(db_path):
+        logger.error(f"WARNING: Database file not found at {db_path}")
         logger.error(f"Current working directory: {os.getcwd()}")
         logger.error(f"__file__ location: {__file__}")
         logger.error(f"Backend directory: {_backend_dir}")
 
+    if WARMUP not in WARMUP_MODES:
+        logger.error(f"Unknown WARMUP mode {WARMUP!r}, skipping warm-up")
+    start_warmup(
+        WARMUP if WARMUP in WARMUP_MODES else "off",
+        db_path=db_path,
+        state=warmup_state,
+        statements=warmup_statements(),
+        access_log_path=ACCESS_LOG_PATH,
+        top_n=WARMUP_TOP_N,
+        log=logger.info,
+    )
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    access_log.close()
+    if _simulation_pool is not None:
+        _simulation_pool.shutdown(cancel_futures=True)
+
+
+@app.get("/ready")
+def ready():
+    """Readiness probe: 503 until startup warm-up has finished"""
+    status = warmup_state.as_dict()
+    if not warmup_state.ready:
+        return JSONResponse(status_code=503, content=status)
+    return status
+
+@app.exception_handler(sqlite3.OperationalError)
+async def sqlite_operational_error_handler(request: Request, exc: sqlite3.OperationalError):
+    """Lock contention outlasting the busy timeout is transient: ask the client to retry"""
+    if is_busy_error(exc):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Database busy, retry shortly"},
+            headers={"Retry-After": "1"},
+        )
+    return JSONResponse(status_code=500, content={"detail": f"Database error: {exc}"})
+
+def client_key(request: Request) -> str:
+    """The client's API key if it is a known one, else its IP"""
+    api_key = request.headers.get("x-api-key")
+    if api_key and api_key in API_KEYS:
+        return f"key:{api_key}"
+    if RATE_LIMIT_TRUST_PROXY and request.headers.get("x-forwarded-for"):
+        return "ip:" + request.headers["x-forwarded-for"].split(",")[0].strip()
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def require_api_key(request: Request):
+    """401 without an X-API-Key, 403 when it isn't in API_KEYS"""
+    api_key = request.headers.get("x-api-key")
+    if not api_key:
+        raise HTTPException(status_code=401, detail="X-API-Key header required", headers={"WWW-Authenticate": "X-API-Key"})
+    if api_key not in API_KEYS:
+        raise HTTPException(status_code=403, detail="API key not allowed")
+
+
+def _too_many(detail: str, retry_after: float, headers: Optional[dict] = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(math.ceil(retry_after), 1)), **(headers or {})},
+    )
+
+
+# Registered before CORS so 429s still carry the CORS headers
+@app.middleware("http")
+async def throttle(request: Request, call_next):
+    """Per-client quotas for every endpoint, then load shedding for bulk requests"""
+    path = request.url.path
+    if path in EXEMPT_PATHS or (rate_limiter is None and load_shedder is None):
+        return await call_next(request)
+
+    bulk = is_bulk(path, request.headers.get("x-priority", ""))
+    quota_headers = {}
+    if rate_limiter is not None:
+        verdict = rate_limiter.check(client_key(request))
+        quota_headers = {"X-RateLimit-Limit": str(rate_limiter.window_limit), "X-RateLimit-Remaining": str(verdict.remaining)}
+        if not verdict.allowed:
+            return _too_many(
+                f"Rate limit exceeded: {rate_limiter.burst} burst, {rate_limiter.rate:g}/s, "
+                f"{rate_limiter.window_limit}/minute per client",
+                verdict.retry_after,
+                quota_headers,
+            )
+        # Heavy users get the bulk treatment whatever they call
+        bulk = bulk or verdict.usage > BULK_USAGE
+
+    if load_shedder is None:
+        response = await call_next(request)
+    else:
+        if not load_shedder.admit(bulk):
+            return _too_many("Server busy: bulk request shed, retry shortly", 1, quota_headers)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            load_shedder.finished(time.perf_counter() - started, bulk)
+    response.headers.update(quota_headers)
+    return response
+
+
 # Enable CORS for frontend access
 app.add_middleware(
     CORSMiddleware,
@@ -57,17 +249,23 @@ class OverUnderResponse(BaseModel):
     under: int
 
 
+def _respond(request: Request, media_type: str, model: BaseModel, columns: dict, metadata: dict):
+    """The Pydantic model for JSON clients, columns in the negotiated binary format otherwise"""
+    if media_type == JSON:
+        return model
+    return columnar_response(request, media_type, columns, metadata, COMPRESS_MIN_BYTES)
+
+
 def get_connection() -> sqlite3.Connection:
     try:
         # Debug: Log the actual path being used
-        if not os.path.exists(DB_PATH):
+        db_path = current_db_path()
+        if not os.path.exists(db_path):
             raise HTTPException(
                 status_code=500, 
-                detail=f"Database file not found at: {DB_PATH}. Please check DB_PATH environment variable or ensure the database exists."
+                detail=f"Database file not found at: {db_path}. Please check DB_PATH environment variable or ensure the database exists."
             )
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return connect_reader(db_path, DB_BUSY_TIMEOUT_MS)
     except sqlite3.Error as e:
         raise HTTPException(status_code=500, detail=f"Database connection error: {e}")
 
@@ -75,55 +273,1257 @@ def get_connection() -> sqlite3.Connection:
 VALID_STATS = {"disposals", "goals"}
 
 
+def _validate_search_params(player_id: Optional[int], player_name: Optional[str], stat: str) -> None:
+    # Validate identifier parameters
+    if (player_id is None and not player_name) or (player_id is not None and player_name):
+        raise HTTPException(status_code=400, detail="Provide exactly one of player_id or player_name")
+
+    # Validate stat
+    if stat not in VALID_STATS:
+        raise HTTPException(status_code=400, detail="Invalid stat. Must be one of disposals|goals")
+
+
+VALID_LOCATIONS = {"Home", "Away"}
+VALID_GAME_TYPES = {"Pre-Season", "Regular Season", "Finals"}
+VALID_TIMES_OF_DAY = {"Day", "Twilight", "Night"}
+
+
+class GameFilters(BaseModel):
+    location: Optional[str] = None
+    venue_id: Optional[int] = None
+    venue_name: Optional[str] = None
+    opponent_team_id: Optional[int] = None
+    opponent_name: Optional[str] = None
+    game_type: Optional[str] = None
+    time_of_day: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+
+def game_filters(
+    location: Optional[str] = Query(None),
+    venue_id: Optional[int] = Query(None),
+    venue_name: Optional[str] = Query(None),
+    opponent_team_id: Optional[int] = Query(None),
+    opponent_name: Optional[str] = Query(None),
+    game_type: Optional[str] = Query(None),
+    time_of_day: Optional[str] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+) -> GameFilters:
+    """Game filters from SEARCH_API_SPEC.md, validated"""
+    if location is not None and location not in VALID_LOCATIONS:
+        raise HTTPException(status_code=400, detail="Invalid location. Must be one of Home|Away")
+    if game_type is not None and game_type not in VALID_GAME_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid game_type. Must be one of Pre-Season|Regular Season|Finals")
+    if time_of_day is not None and time_of_day not in VALID_TIMES_OF_DAY:
+        raise HTTPException(status_code=400, detail="Invalid time_of_day. Must be one of Day|Twilight|Night")
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must be on or before end_date")
+    return GameFilters(
+        location=location,
+        venue_id=venue_id,
+        venue_name=venue_name,
+        opponent_team_id=opponent_team_id,
+        opponent_name=opponent_name,
+        game_type=game_type,
+        time_of_day=time_of_day,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+# GameFilters field -> vw_complete_game_stats predicate
+_FILTER_PREDICATES = {
+    "location": "location = :location",
+    "venue_id": "venue_id = :venue_id",
+    "venue_name": "venue_name = :venue_name",
+    "opponent_team_id": "opponent_team_id = :opponent_team_id",
+    "opponent_name": "opponent_name = :opponent_name",
+    "game_type": "game_type = :game_type",
+    "time_of_day": "game_time = :time_of_day",
+    "start_date": "game_date >= :start_date",
+    "end_date": "game_date <= :end_date",
+}
+
+
+# The same predicates on the view's integer columns (see database/storage_codes.py)
+_CODED_FILTER_PREDICATES = {
+    **_FILTER_PREDICATES,
+    "location": "location_code = :location",
+    "game_type": "game_type_code = :game_type",
+    "time_of_day": "game_time_code = :time_of_day",
+    "start_date": "game_day >= :start_date",
+    "end_date": "game_day <= :end_date",
+}
+_CODED_FILTER_COLUMNS = {"location": "location", "game_type": "game_type", "time_of_day": "game_time"}
+_EPOCH = date(1970, 1, 1)
+
+
+def game_filters_sql(filters: GameFilters, coded: bool = False) -> Tuple[List[str], Dict[str, object]]:
+    """
+    (WHERE clauses, named params) for the filters that are set. coded
+    compares day ordinals and category codes instead of text.
+    """
+    predicates = _CODED_FILTER_PREDICATES if coded else _FILTER_PREDICATES
+    where, params = [], {}
+    for field, predicate in predicates.items():
+        value = getattr(filters, field)
+        if value is None:
+            continue
+        where.append(predicate)
+        if coded and isinstance(value, date):
+            value = (value - _EPOCH).days
+        elif coded and field in _CODED_FILTER_COLUMNS:
+            value = CATEGORY_CODES[_CODED_FILTER_COLUMNS[field]].index(value)
+        elif isinstance(value, date):
+            value = value.isoformat()
+        params[field] = value
+    return where, params
+
+
+# db_path -> (file version, has storage codes); checked again only when the file changes
+_coded_dbs: Dict[str, Tuple[tuple, bool]] = {}
+
+
+def storage_coded() -> bool:
+    """Whether the current database has the integer day and code columns"""
+    db_path = current_db_path()
+    try:
+        version = file_version(db_path)
+    except FileNotFoundError:
+        # get_connection() reports the missing file
+        version = None
+    cached = _coded_dbs.get(db_path)
+    if cached is None or cached[0] != version:
+        with get_connection() as conn:
+            cached = _coded_dbs[db_path] = (version, has_storage_codes(conn))
+    return cached[1]
+
+
+def _resolve_player_id(conn: sqlite3.Connection, player_id: Optional[int], player_name: Optional[str]) -> int:
+    """Resolve player_id from player_name if needed"""
+    if player_id is not None:
+        return player_id
+    cur = conn.execute(
+        "SELECT player_id FROM vw_complete_game_stats WHERE player_name = ? LIMIT 1",
+        (player_name,),
+    )
+    row = cur.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return int(row["player_id"])  # type: ignore
+
+
+def _comparators(strict_over: bool) -> Tuple[str, str]:
+    """Return the (over, under) SQL comparison operators"""
+    over_op = ">" if strict_over else ">="
+    under_op = "<=" if strict_over else "<"
+    return over_op, under_op
+
+
+def over_under_sql(stat: str, strict_over: bool, as_of: bool = False) -> str:
+    """
+    Over/under aggregate for one player; `stat` must already be validated.
+    With as_of, only games before the :as_of date count.
+    """
+    over_op, under_op = _comparators(strict_over)
+    # Inline the stat column name (validated)
+    stat_col = stat
+    as_of_filter = "AND game_date < :as_of" if as_of else ""
+
+    return f"""
+        WITH base AS (
+            SELECT player_id, game_date, {stat_col} AS stat_value
+            FROM vw_complete_game_stats
+            WHERE player_id = :player_id {as_of_filter}
+        )
+        SELECT
+            SUM(CASE WHEN stat_value {over_op} :threshold THEN 1 ELSE 0 END) AS over,
+            SUM(CASE WHEN stat_value {under_op} :threshold THEN 1 ELSE 0 END) AS under
+        FROM base
+    """
+
+
+def _over_under_counts(
+    player_id: Optional[int],
+    player_name: Optional[str],
+    stat: str,
+    threshold: float,
+    strict_over: bool,
+    as_of: Optional[date],
+) -> Tuple[int, int, int]:
+    """(player_id, over, under) from a pinned histogram or the SQL aggregate"""
+    with get_connection() as conn:
+        player_id = _resolve_player_id(conn, player_id, player_name)
+
+        # Warm-up pins histograms for the most queried players
+        from app.stat_store import cached_stat_store
+
+        store = cached_stat_store(current_db_path())
+        # Pinned histograms cover the full history only
+        pinned = store.pinned_over_under(player_id, stat, threshold, strict_over) if store and as_of is None else None
+        if pinned is not None:
+            return (player_id, *pinned)
+        sql = over_under_sql(stat, strict_over, as_of=as_of is not None)
+        params = {"player_id": player_id, "threshold": threshold}
+        if as_of is not None:
+            params["as_of"] = as_of.isoformat()
+        cur = conn.execute(sql, params)
+        row = cur.fetchone()
+        over = int(row["over"]) if row and row["over"] is not None else 0
+        under = int(row["under"]) if row and row["under"] is not None else 0
+
+    # Players who have become hot since warm-up get pinned too
+    if store is not None and as_of is None and access_log.is_hot(player_id, stat, WARMUP_TOP_N):
+        store.pin_histograms([(player_id, stat)])
+    return player_id, over, under
+
+
 @app.get("/search/over-under", response_model=OverUnderResponse)
 def search_over_under(
+    request: Request,
     player_id: Optional[int] = Query(None),
     player_name: Optional[str] = Query(None),
     stat: str = Query(...),
     threshold: float = Query(...),
     strict_over: bool = Query(False),
+    as_of: Optional[date] = Query(None),
 ):
-    # Validate identifier parameters
-    if (player_id is None and not player_name) or (player_id is not None and player_name):
-        raise HTTPException(status_code=400, detail="Provide exactly one of player_id or player_name")
+    """
+    Over/under counts across the player's games. as_of gives the counts as
+    they stood before that date (games on it excluded), for point-in-time use.
+    Identical concurrent requests share one query.
+    """
+    _validate_search_params(player_id, player_name, stat)
+    media_type = requested_media_type(request)
 
-    # Validate stat
+    # The raw name: it is resolved with an exact match, so names differing
+    # only in whitespace can have different answers
+    who = ("id", player_id) if player_id is not None else ("name", player_name)
+    key = ("over-under", who, stat, threshold, strict_over, as_of)
+    player_id, over, under = search_flights.do(
+        key, lambda: _over_under_counts(player_id, player_name, stat, threshold, strict_over, as_of)
+    )
+    access_log.record("over-under", player_id, stat, threshold)
+
+    return _respond(
+        request,
+        media_type,
+        OverUnderResponse(over=over, under=under),
+        {"over": [over], "under": [under]},
+        {"player_id": player_id, "stat": stat, "threshold": threshold, **({"as_of": as_of.isoformat()} if as_of else {})},
+    )
+
+
+VALID_TEAM_SIDES = {"for", "against"}
+
+
+def _resolve_team_id(conn: sqlite3.Connection, team_id: Optional[int], team_name: Optional[str]) -> int:
+    if (team_id is None and not team_name) or (team_id is not None and team_name):
+        raise HTTPException(status_code=400, detail="Provide exactly one of team_id or team_name")
+    if team_id is not None:
+        return team_id
+    row = conn.execute("SELECT team_id FROM teams WHERE team_name = ?", (team_name.strip(),)).fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Team not found")
+    return int(row["team_id"])
+
+
+def team_over_under_sql(stat: str, side: str, strict_over: bool, where: List[str], materialized: bool = True) -> str:
+    """
+    Over/under aggregate of one team's per-game totals; `stat` and `side`
+    must already be validated. side=against counts what the team conceded.
+    Reads team_game_stats, or sums player_game_stats when not materialized.
+    """
+    over_op, under_op = _comparators(strict_over)
+    stat_col = stat if side == "for" else f"conceded_{stat}"
+    source = "team_game_stats" if materialized else f"({TEAM_TOTALS_FALLBACK_SQL})"
+    filters = "".join(f" AND {clause}" for clause in where)
+
+    return f"""
+        WITH base AS (
+            SELECT tgs.location, tgs.venue_id, v.venue_name, tgs.opponent_team_id,
+                   opponent.team_name AS opponent_name, g.game_type, tgs.game_time, g.game_date,
+                   tgs.{stat_col} AS stat_value
+            FROM {source} tgs
+            JOIN games g ON tgs.game_id = g.game_id
+            JOIN venues v ON tgs.venue_id = v.venue_id
+            JOIN teams opponent ON tgs.opponent_team_id = opponent.team_id
+            WHERE tgs.team_id = :team_id
+        )
+        SELECT
+            SUM(CASE WHEN stat_value {over_op} :threshold THEN 1 ELSE 0 END) AS over,
+            SUM(CASE WHEN stat_value {under_op} :threshold THEN 1 ELSE 0 END) AS under
+        FROM base
+        WHERE 1 = 1{filters}
+    """
+
+
+@app.get("/search/team-over-under", response_model=OverUnderResponse)
+def search_team_over_under(
+    request: Request,
+    team_id: Optional[int] = Query(None),
+    team_name: Optional[str] = Query(None),
+    stat: str = Query(...),
+    threshold: float = Query(...),
+    side: str = Query("for"),
+    strict_over: bool = Query(False),
+    as_of: Optional[date] = Query(None),
+    filters: GameFilters = Depends(game_filters),
+):
+    """
+    Over/under counts across a team's game totals (side=for) or what its
+    opponents put up against it (side=against), with the game filters and
+    as_of of the player searches.
+    """
     if stat not in VALID_STATS:
         raise HTTPException(status_code=400, detail="Invalid stat. Must be one of disposals|goals")
+    if side not in VALID_TEAM_SIDES:
+        raise HTTPException(status_code=400, detail="Invalid side. Must be one of for|against")
+    media_type = requested_media_type(request)
 
+    where, params = game_filters_sql(filters)
+    if as_of is not None:
+        where.append("game_date < :as_of")
+        params["as_of"] = as_of.isoformat()
     with get_connection() as conn:
-        # Resolve player_id from player_name if needed
-        if player_id is None:
-            cur = conn.execute(
-                "SELECT player_id FROM vw_complete_game_stats WHERE player_name = ? LIMIT 1",
-                (player_name,),
-            )
-            row = cur.fetchone()
-            if not row:
-                raise HTTPException(status_code=404, detail="Player not found")
-            player_id = int(row["player_id"])  # type: ignore
-
-        # Build SQL dynamically for stat comparator
-        over_op = ">" if strict_over else ">="
-        under_op = "<=" if strict_over else "<"
-        # Inline the stat column name (validated)
-        stat_col = stat
-
-        sql = f"""
-            WITH base AS (
-                SELECT player_id, game_date, {stat_col} AS stat_value
-                FROM vw_complete_game_stats
-                WHERE player_id = :player_id
-            )
+        team_id = _resolve_team_id(conn, team_id, team_name)
+        sql = team_over_under_sql(stat, side, strict_over, where, materialized=has_team_game_stats(conn))
+        row = conn.execute(sql, {**params, "team_id": team_id, "threshold": threshold}).fetchone()
+    over = int(row["over"]) if row and row["over"] is not None else 0
+    under = int(row["under"]) if row and row["under"] is not None else 0
+
+    return _respond(
+        request,
+        media_type,
+        OverUnderResponse(over=over, under=under),
+        {"over": [over], "under": [under]},
+        {"team_id": team_id, "stat": stat, "side": side, "threshold": threshold},
+    )
+
+
+class WeightedOverUnderResponse(BaseModel):
+    over: int
+    under: int
+    over_probability: Optional[float]
+    under_probability: Optional[float]
+    effective_games: float
+
+
+@app.get("/search/over-under/weighted", response_model=WeightedOverUnderResponse)
+def search_over_under_weighted(
+    player_id: Optional[int] = Query(None),
+    player_name: Optional[str] = Query(None),
+    stat: str = Query(...),
+    threshold: float = Query(...),
+    strict_over: bool = Query(False),
+    half_life_days: float = Query(365, gt=0),
+    adjust_opponent: bool = Query(False),
+    adjust_venue: bool = Query(False),
+    opponent_team_id: Optional[int] = Query(None),
+    venue_id: Optional[int] = Query(None),
+):
+    """
+    Over/under probabilities with recent games weighted more (exponential
+    decay by game_date) and, optionally, values adjusted for opponent and
+    venue effects. opponent_team_id/venue_id describe the upcoming game;
+    without them adjusted values are context-neutral. over/under are counts
+    of the (adjusted) values; effective_games is the Kish effective sample size.
+    """
+    from app.stat_store import get_stat_store
+    from app.weighting import weighted_hit_rate
+
+    _validate_search_params(player_id, player_name, stat)
+    with get_connection() as conn:
+        player_id = _resolve_player_id(conn, player_id, player_name)
+    access_log.record("over-under-weighted", player_id, stat, threshold)
+
+    result = weighted_hit_rate(
+        get_stat_store(current_db_path()),
+        player_id,
+        stat,
+        threshold,
+        strict_over,
+        half_life_days=half_life_days,
+        adjust_opponent=adjust_opponent,
+        adjust_venue=adjust_venue,
+        opponent_team_id=opponent_team_id,
+        venue_id=venue_id,
+    )
+    return WeightedOverUnderResponse(**result._asdict())
+
+
+def _store_filters(conn: sqlite3.Connection, filters: GameFilters) -> Dict[str, object]:
+    """GameFilters as StatStore.filter_mask() arguments, with venue/opponent names resolved to ids"""
+    resolved = {
+        "location": filters.location,
+        "venue_id": filters.venue_id,
+        "opponent_team_id": filters.opponent_team_id,
+        "game_type": filters.game_type,
+        "game_time": filters.time_of_day,
+        "start_date": filters.start_date,
+        "end_date": filters.end_date,
+    }
+    for name, key, sql in (
+        (filters.venue_name, "venue_id", "SELECT venue_id FROM venues WHERE venue_name = ?"),
+        (filters.opponent_name, "opponent_team_id", "SELECT team_id FROM teams WHERE team_name = ?"),
+    ):
+        if name is None:
+            continue
+        row = conn.execute(sql, (name,)).fetchone()
+        # An unknown name, or one that disagrees with the id, matches no games
+        found = int(row[0]) if row else -1
+        resolved[key] = found if resolved[key] in (None, found) else -1
+    return resolved
+
+
+class StreakRun(BaseModel):
+    length: int
+    start_date: date
+    end_date: date
+
+
+class CurrentStreak(StreakRun):
+    side: str
+
+
+class StreaksResponse(BaseModel):
+    player_id: int
+    games: int
+    current: Optional[CurrentStreak]
+    longest_over: Optional[StreakRun]
+    longest_under: Optional[StreakRun]
+
+
+@app.get("/search/streaks", response_model=StreaksResponse)
+def search_streaks(
+    player_id: Optional[int] = Query(None),
+    player_name: Optional[str] = Query(None),
+    stat: str = Query(...),
+    threshold: float = Query(...),
+    strict_over: bool = Query(False),
+    filters: GameFilters = Depends(game_filters),
+):
+    """
+    Current streak plus longest over and under streaks, with their date
+    ranges, over the player's games that match the filters. Over/under is
+    decided exactly as in /search/over-under.
+    """
+    from app.stat_store import get_stat_store
+    from app.streaks import player_streaks
+
+    _validate_search_params(player_id, player_name, stat)
+    with get_connection() as conn:
+        player_id = _resolve_player_id(conn, player_id, player_name)
+        store_filters = _store_filters(conn, filters)
+    access_log.record("streaks", player_id, stat, threshold)
+
+    result = player_streaks(get_stat_store(current_db_path()), player_id, stat, threshold, strict_over, **store_filters)
+    return StreaksResponse(player_id=player_id, **result)
+
+
+class StreakLeader(StreakRun):
+    player_id: int
+    player_name: Optional[str]
+
+
+class StreakLeadersResponse(BaseModel):
+    side: str
+    leaders: List[StreakLeader]
+
+
+@app.get("/search/streaks/active", response_model=StreakLeadersResponse)
+def search_active_streaks(
+    stat: str = Query(...),
+    threshold: float = Query(...),
+    strict_over: bool = Query(False),
+    side: str = Query("over"),
+    min_length: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=500),
+    active_since: Optional[date] = Query(None),
+    filters: GameFilters = Depends(game_filters),
+):
+    """
+    Players ranked by their active streak: the run of overs (or unders)
+    ending at their latest game matching the filters. Use active_since to
+    leave out players who haven't played since a date.
+    """
+    from app.stat_store import get_stat_store
+    from app.streaks import active_streak_leaders
+
+    if stat not in VALID_STATS:
+        raise HTTPException(status_code=400, detail="Invalid stat. Must be one of disposals|goals")
+    if side not in ("over", "under"):
+        raise HTTPException(status_code=400, detail="Invalid side. Must be one of over|under")
+
+    with get_connection() as conn:
+        store_filters = _store_filters(conn, filters)
+        leaders = active_streak_leaders(
+            get_stat_store(current_db_path()),
+            stat,
+            threshold,
+            strict_over,
+            over=side == "over",
+            min_length=min_length,
+            limit=limit,
+            active_since=active_since,
+            **store_filters,
+        )
+        names = {}
+        if leaders:
+            ids = [leader["player_id"] for leader in leaders]
+            placeholders = ", ".join("?" * len(ids))
+            names = dict(conn.execute(
+                f"SELECT player_id, player_name FROM players WHERE player_id IN ({placeholders})", ids
+            ).fetchall())
+    return StreakLeadersResponse(
+        side=side,
+        leaders=[StreakLeader(player_name=names.get(leader["player_id"]), **leader) for leader in leaders],
+    )
+
+
+MAX_BATCH_THRESHOLDS = 100
+
+
+class OverUnderBatchRequest(BaseModel):
+    stat: str
+    thresholds: List[float]
+    player_ids: Optional[List[int]] = None
+    strict_over: bool = False
+
+
+@app.post("/search/over-under/batch")
+def search_over_under_batch(body: OverUnderBatchRequest, request: Request):
+    """
+    Over/under for many players at many thresholds, for bulk clients.
+    One row per (player, threshold), returned as columns; every player in
+    the database if player_ids is omitted. Computed from the stat store's
+    per-player histograms rather than one SQL query per pair.
+    """
+    import numpy as np
+
+    from app.stat_store import get_stat_store
+
+    if body.stat not in VALID_STATS:
+        raise HTTPException(status_code=400, detail="Invalid stat. Must be one of disposals|goals")
+    if not body.thresholds or len(body.thresholds) > MAX_BATCH_THRESHOLDS:
+        raise HTTPException(status_code=400, detail=f"Provide 1 to {MAX_BATCH_THRESHOLDS} thresholds")
+    media_type = requested_media_type(request)
+
+    store = get_stat_store(current_db_path())
+    if body.player_ids is None:
+        player_ids = np.unique(store.player_id)
+    else:
+        player_ids = np.array(list(dict.fromkeys(body.player_ids)), dtype=np.int64)
+    thresholds = np.array(body.thresholds, dtype=np.float64)
+    over, under = store.over_under_table(player_ids, body.stat, thresholds, body.strict_over)
+
+    columns = {
+        "player_id": np.repeat(player_ids, len(thresholds)),
+        "threshold": np.tile(thresholds, len(player_ids)),
+        "over": over.ravel(),
+        "under": under.ravel(),
+    }
+    metadata = {"stat": body.stat, "strict_over": body.strict_over}
+    return columnar_response(request, media_type, columns, metadata, COMPRESS_MIN_BYTES)
+
+
+MAX_MARKETS = 5000
+
+
+class Market(BaseModel):
+    player_id: Optional[int] = None
+    player_name: Optional[str] = None
+    stat: str
+    line: float
+    over_odds: float
+    under_odds: float
+
+
+class MarketPriceRequest(BaseModel):
+    markets: List[Market]
+    confidence: float = 0.95
+    strict_over: bool = False
+
+
+class MarketPrice(BaseModel):
+    player_id: int
+    stat: str
+    line: float
+    over: int
+    under: int
+    games: int
+    empirical_over: Optional[float]
+    ci_low: Optional[float]
+    ci_high: Optional[float]
+    posterior_over: float
+    implied_over: float
+    implied_under: float
+    overround: float
+    fair_over: float
+    edge_over: Optional[float]
+    ev_over: Optional[float]
+    ev_under: Optional[float]
+
+
+class MarketPriceResponse(BaseModel):
+    confidence: float
+    markets: List[MarketPrice]
+
+
+@app.post("/markets/price", response_model=MarketPriceResponse)
+def price_markets(body: MarketPriceRequest, request: Request):
+    """
+    Empirical over probability for each market against the bookmaker's odds:
+    Wilson interval, Beta(1, 1) posterior mean, margin-free implied
+    probability, edge and expected value per unit stake. Counts for the
+    whole batch come from the stat store's per-player histograms.
+    """
+    import numpy as np
+
+    from app.pricing import price
+    from app.stat_store import get_stat_store
+
+    if not body.markets or len(body.markets) > MAX_MARKETS:
+        raise HTTPException(status_code=400, detail=f"Provide 1 to {MAX_MARKETS} markets")
+    if not 0 < body.confidence < 1:
+        raise HTTPException(status_code=400, detail="confidence must be between 0 and 1")
+    for market in body.markets:
+        _validate_search_params(market.player_id, market.player_name, market.stat)
+        if market.over_odds <= 1 or market.under_odds <= 1:
+            raise HTTPException(status_code=400, detail="Odds must be decimal odds greater than 1")
+    media_type = requested_media_type(request)
+
+    resolved: Dict[str, int] = {}
+    with get_connection() as conn:
+        for market in body.markets:
+            if market.player_name is not None and market.player_name not in resolved:
+                resolved[market.player_name] = _resolve_player_id(conn, None, market.player_name)
+    player_ids = np.array(
+        [m.player_id if m.player_id is not None else resolved[m.player_name] for m in body.markets], dtype=np.int64
+    )
+    stats = np.array([m.stat for m in body.markets])
+    lines = np.array([m.line for m in body.markets], dtype=np.float64)
+
+    store = get_stat_store(current_db_path())
+    over = np.zeros(len(body.markets), dtype=np.int64)
+    under = np.zeros(len(body.markets), dtype=np.int64)
+    for stat in VALID_STATS:
+        idx = np.flatnonzero(stats == stat)
+        if len(idx):
+            over[idx], under[idx] = store.over_under_pairs(player_ids[idx], stat, lines[idx], body.strict_over)
+
+    priced = price(
+        over,
+        under,
+        np.array([m.over_odds for m in body.markets], dtype=np.float64),
+        np.array([m.under_odds for m in body.markets], dtype=np.float64),
+        body.confidence,
+    )
+    columns = {"player_id": player_ids, "stat": stats.tolist(), "line": lines, "over": over, "under": under, **priced}
+    rows = [
+        MarketPrice(**{
+            name: (None if isinstance(value, float) and np.isnan(value) else value)
+            for name, value in zip(columns, values)
+        })
+        for values in zip(*(np.asarray(col).tolist() for col in columns.values()))
+    ]
+    model = MarketPriceResponse(confidence=body.confidence, markets=rows)
+    return _respond(request, media_type, model, columns, {"confidence": body.confidence})
+
+
+MAX_BACKTEST_POINTS = 2_000_000
+
+
+class BacktestPoints(BaseModel):
+    """Historical lines as parallel columns, one entry per (player, game, line)"""
+    player_id: List[int]
+    game_id: List[int]
+    line: List[float]
+    over_odds: List[float]
+    under_odds: List[float]
+
+
+class BacktestRequest(BaseModel):
+    stat: str
+    strict_over: bool = False
+    # Either explicit historical lines...
+    points: Optional[BacktestPoints] = None
+    # ...or every game of a season at each of these lines and fixed odds
+    season: Optional[int] = None
+    lines: Optional[List[float]] = None
+    over_odds: float = 1.9
+    under_odds: float = 1.9
+    # Strategy
+    min_games: int = 5
+    min_edge: float = 0.05
+    estimator: str = "posterior"
+    sides: str = "both"
+    stake: float = 1.0
+
+
+class BacktestSideSummary(BaseModel):
+    bets: int
+    wins: int
+    hit_rate: Optional[float]
+    staked: float
+    profit: float
+    roi: Optional[float]
+
+
+class BacktestResponse(BacktestSideSummary):
+    points: int
+    unmatched: int
+    eligible: int
+    by_side: Dict[str, BacktestSideSummary]
+    brier: Optional[float]
+    mean_edge: Optional[float]
+
+
+@app.post("/backtest", response_model=BacktestResponse)
+def run_backtest(body: BacktestRequest):
+    """
+    Replay a strategy over historical lines without lookahead: at each game
+    the estimate only uses the player's earlier games (the /search/over-under
+    as_of counts), bets the side with at least min_edge over the margin-free
+    implied probability, and is settled on the actual result. Points whose
+    player didn't play that game are reported as unmatched.
+    """
+    import numpy as np
+
+    from app.backtest import ESTIMATORS, SIDES, backtest
+    from app.stat_store import get_stat_store
+
+    if body.stat not in VALID_STATS:
+        raise HTTPException(status_code=400, detail="Invalid stat. Must be one of disposals|goals")
+    if (body.points is None) == (body.season is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of points or season")
+    if body.estimator not in ESTIMATORS:
+        raise HTTPException(status_code=400, detail="Invalid estimator. Must be one of empirical|posterior")
+    if body.sides not in SIDES:
+        raise HTTPException(status_code=400, detail="Invalid sides. Must be one of both|over|under")
+    if body.stake <= 0 or body.min_games < 0:
+        raise HTTPException(status_code=400, detail="stake must be positive and min_games non-negative")
+
+    store = get_stat_store(current_db_path())
+    if body.points is not None:
+        points = body.points
+        n = len(points.player_id)
+        if any(len(col) != n for col in (points.game_id, points.line, points.over_odds, points.under_odds)):
+            raise HTTPException(status_code=400, detail="points columns must all be the same length")
+        rows = store.rows_for(np.array(points.player_id), np.array(points.game_id))
+        lines = np.array(points.line, dtype=np.float64)
+        over_odds = np.array(points.over_odds, dtype=np.float64)
+        under_odds = np.array(points.under_odds, dtype=np.float64)
+    else:
+        if not body.lines:
+            raise HTTPException(status_code=400, detail="Provide lines with season")
+        season_rows = np.flatnonzero(store.season_year == body.season)
+        n = len(season_rows) * len(body.lines)
+        rows = np.repeat(season_rows, len(body.lines))
+        lines = np.tile(np.array(body.lines, dtype=np.float64), len(season_rows))
+        over_odds = np.full(n, body.over_odds)
+        under_odds = np.full(n, body.under_odds)
+    if n > MAX_BACKTEST_POINTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BACKTEST_POINTS} points per backtest")
+    if n and (over_odds.min() <= 1 or under_odds.min() <= 1):
+        raise HTTPException(status_code=400, detail="Odds must be decimal odds greater than 1")
+
+    matched = rows >= 0
+    result = backtest(
+        store,
+        rows[matched],
+        body.stat,
+        lines[matched],
+        over_odds[matched],
+        under_odds[matched],
+        strict_over=body.strict_over,
+        min_games=body.min_games,
+        min_edge=body.min_edge,
+        estimator=body.estimator,
+        sides=body.sides,
+        stake=body.stake,
+    )
+    return BacktestResponse(**{**result, "points": n, "unmatched": int(n - matched.sum())})
+
+
+# Split dimensions -> SQL expression producing the bucket label.
+# Rest buckets follow Example 8 in schema.sql.
+SPLIT_DIMENSIONS = {
+    "location": "location",
+    "venue_name": "venue_name",
+    "opponent_name": "opponent_name",
+    "game_type": "game_type",
+    "game_time": "COALESCE(game_time, 'Unknown')",
+    "days_since_last_game": """CASE
+        WHEN days_since_last_game IS NULL THEN 'First Game'
+        WHEN days_since_last_game > 7 THEN 'Extended Rest (>7 days)'
+        ELSE 'Normal Rest (<=7 days)'
+    END""",
+}
+
+
+class SplitsResponse(BaseModel):
+    player_id: int
+    stat: str
+    threshold: float
+    overall: OverUnderResponse
+    splits: Dict[str, Dict[str, OverUnderResponse]]
+
+
+def splits_sql(stat: str, strict_over: bool, dimensions: List[str]) -> str:
+    """Grouping-sets style splits query; stat and dimensions must be validated"""
+    over_op, under_op = _comparators(strict_over)
+
+    # Overall totals are the empty grouping set
+    grouping_sets = ["SELECT NULL AS dimension, NULL AS bucket, SUM(is_over) AS over, SUM(is_under) AS under FROM base"]
+    for dim in dimensions:
+        grouping_sets.append(
+            f"SELECT '{dim}', {SPLIT_DIMENSIONS[dim]} AS bucket, SUM(is_over), SUM(is_under) "
+            f"FROM base GROUP BY bucket"
+        )
+    union = "\nUNION ALL\n".join(grouping_sets)
+
+    return f"""
+        WITH base AS MATERIALIZED (
             SELECT
-                SUM(CASE WHEN stat_value {over_op} :threshold THEN 1 ELSE 0 END) AS over,
-                SUM(CASE WHEN stat_value {under_op} :threshold THEN 1 ELSE 0 END) AS under
-            FROM base
-        """
-        cur = conn.execute(sql, {"player_id": player_id, "threshold": threshold})
-        row = cur.fetchone()
-        over = int(row["over"]) if row and row["over"] is not None else 0
-        under = int(row["under"]) if row and row["under"] is not None else 0
-        return OverUnderResponse(over=over, under=under)
+                location, venue_name, opponent_name, game_type, game_time, days_since_last_game,
+                CASE WHEN {stat} {over_op} :threshold THEN 1 ELSE 0 END AS is_over,
+                CASE WHEN {stat} {under_op} :threshold THEN 1 ELSE 0 END AS is_under
+            FROM vw_complete_game_stats
+            WHERE player_id = :player_id
+        )
+        {union}
+    """
+
+
+@app.get("/search/splits", response_model=SplitsResponse)
+def search_splits(
+    request: Request,
+    player_id: Optional[int] = Query(None),
+    player_name: Optional[str] = Query(None),
+    stat: str = Query(...),
+    threshold: float = Query(...),
+    strict_over: bool = Query(False),
+    dimensions: Optional[List[str]] = Query(None),
+):
+    """
+    Over/under for one player broken down by every split dimension.
+    The player's rows are materialized once and each dimension is grouped
+    from that, emulating GROUP BY GROUPING SETS in a single statement.
+    """
+    _validate_search_params(player_id, player_name, stat)
+    media_type = requested_media_type(request)
+
+    requested = list(dict.fromkeys(dimensions)) if dimensions else list(SPLIT_DIMENSIONS)
+    invalid = [d for d in requested if d not in SPLIT_DIMENSIONS]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid dimension(s): {', '.join(invalid)}. Must be any of {'|'.join(SPLIT_DIMENSIONS)}",
+        )
+
+    with get_connection() as conn:
+        player_id = _resolve_player_id(conn, player_id, player_name)
+        access_log.record("splits", player_id, stat, threshold)
+        sql = splits_sql(stat, strict_over, requested)
+        rows = conn.execute(sql, {"player_id": player_id, "threshold": threshold}).fetchall()
+
+    overall = OverUnderResponse(over=0, under=0)
+    splits: Dict[str, Dict[str, OverUnderResponse]] = {dim: {} for dim in requested}
+    for row in rows:
+        counts = OverUnderResponse(over=int(row["over"] or 0), under=int(row["under"] or 0))
+        if row["dimension"] is None:
+            overall = counts
+        else:
+            splits[row["dimension"]][str(row["bucket"])] = counts
+
+    model = SplitsResponse(
+        player_id=player_id,
+        stat=stat,
+        threshold=threshold,
+        overall=overall,
+        splits=splits,
+    )
+    # One row per bucket; the overall row has a null dimension and bucket
+    columns = {
+        "dimension": [row["dimension"] for row in rows],
+        "bucket": [None if row["bucket"] is None else str(row["bucket"]) for row in rows],
+        "over": [int(row["over"] or 0) for row in rows],
+        "under": [int(row["under"] or 0) for row in rows],
+    }
+    return _respond(request, media_type, model, columns, {"player_id": player_id, "stat": stat, "threshold": threshold})
+
+
+def _export_response(
+    where: List[str], params: Dict[str, object], export_format: str, after: Optional[str], limit: Optional[int]
+) -> StreamingResponse:
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Invalid format. Must be one of ndjson|csv")
+    try:
+        cursor = parse_cursor(after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db_path = current_db_path()
+    if not os.path.exists(db_path):
+        raise HTTPException(status_code=500, detail=f"Database file not found at: {db_path}")
+
+    rows = iter_rows(db_path, where, params, cursor, limit, busy_timeout_ms=DB_BUSY_TIMEOUT_MS)
+    lines = ndjson_lines(rows) if export_format == "ndjson" else csv_lines(rows)
+    return StreamingResponse(lines, media_type=EXPORT_FORMATS[export_format])
+
+
+@app.get("/players/{player_id}/games")
+def player_games(
+    player_id: int,
+    filters: GameFilters = Depends(game_filters),
+    export_format: str = Query("ndjson", alias="format"),
+    after: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """
+    A player's game log, oldest first, streamed as NDJSON or CSV.
+    To fetch the next page, pass after=game_date,game_id,stat_id of the last row.
+    """
+    with get_connection() as conn:
+        if conn.execute("SELECT 1 FROM players WHERE player_id = ?", (player_id,)).fetchone() is None:
+            raise HTTPException(status_code=404, detail="Player not found")
+    where, params = game_filters_sql(filters, storage_coded())
+    return _export_response(["player_id = :player_id"] + where, {**params, "player_id": player_id}, export_format, after, limit)
+
+
+@app.get("/export/games")
+def export_games(
+    filters: GameFilters = Depends(game_filters),
+    season_year: Optional[int] = Query(None),
+    export_format: str = Query("ndjson", alias="format"),
+    after: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    """Every player's game log, in (game_date, game_id, stat_id) order; paged like /players/{id}/games"""
+    where, params = game_filters_sql(filters, storage_coded())
+    if season_year is not None:
+        where.append("season_year = :season_year")
+        params["season_year"] = season_year
+    return _export_response(where, params, export_format, after, limit)
+
+
+VALID_RELATIONSHIPS = {"any", "teammates", "opponents"}
+
+
+class SameGameLeg(BaseModel):
+    player_id: Optional[int] = None
+    player_name: Optional[str] = None
+    stat: str
+    threshold: float
+    strict_over: bool = False
+
+
+class SameGameMultiRequest(BaseModel):
+    legs: List[SameGameLeg]
+    relationship: str = "any"
+
+
+class SameGameLegResult(BaseModel):
+    player_id: int
+    stat: str
+    threshold: float
+    hits: int
+
+
+class SameGameMultiResponse(BaseModel):
+    games_together: int
+    all_hit: int
+    legs: List[SameGameLegResult]
+
+
+@app.post("/search/same-game-multi", response_model=SameGameMultiResponse)
+def search_same_game_multi(request: SameGameMultiRequest, http_request: Request):
+    """
+    How often every leg hit in games where all the legs' players appeared.
+    Each player's games are a bitset over the stat store's game index, so
+    co-occurrence is a bitwise AND rather than a self-join of the view.
+    """
+    # NumPy and the stat store load on first use to keep cold start fast
+    import numpy as np
+
+    from app.stat_store import get_stat_store, popcount
+
+    if len(request.legs) < 2:
+        raise HTTPException(status_code=400, detail="Provide at least two legs")
+    if request.relationship not in VALID_RELATIONSHIPS:
+        raise HTTPException(status_code=400, detail="Invalid relationship. Must be one of any|teammates|opponents")
+    for leg in request.legs:
+        _validate_search_params(leg.player_id, leg.player_name, leg.stat)
+    media_type = requested_media_type(http_request)
+
+    with get_connection() as conn:
+        player_ids = [_resolve_player_id(conn, leg.player_id, leg.player_name) for leg in request.legs]
+    for leg, pid in zip(request.legs, player_ids):
+        access_log.record("same-game-multi", pid, leg.stat, leg.threshold)
+    store = get_stat_store(current_db_path())
+
+    together = None
+    for pid in player_ids:
+        played = store.game_bitset(store.player_slice(pid))
+        together = played if together is None else together & played
+
+    if request.relationship != "any":
+        games = store.bitset_games(together)
+        teams = np.stack([store.team_id[store.rows_in_games(pid, games)] for pid in player_ids])
+        same_team = (teams == teams[0]).all(axis=0)
+        keep = same_team if request.relationship == "teammates" else ~same_team
+        mask = np.zeros(store.n_games, dtype=bool)
+        mask[games[keep]] = True
+        together &= np.packbits(mask)
+
+    all_hit = together
+    leg_results = []
+    for leg, pid in zip(request.legs, player_ids):
+        rows = store.player_slice(pid)
+        hit = store.game_bitset(rows, store.hit_mask(rows, leg.stat, leg.threshold, leg.strict_over))
+        hit &= together
+        all_hit = all_hit & hit
+        leg_results.append(
+            SameGameLegResult(player_id=pid, stat=leg.stat, threshold=leg.threshold, hits=popcount(hit))
+        )
+
+    model = SameGameMultiResponse(
+        games_together=popcount(together),
+        all_hit=popcount(all_hit),
+        legs=leg_results,
+    )
+    columns = {field: [getattr(leg, field) for leg in leg_results] for field in ("player_id", "stat", "threshold", "hits")}
+    metadata = {"games_together": model.games_together, "all_hit": model.all_hit}
+    return _respond(http_request, media_type, model, columns, metadata)
+
+
+MAX_SIMULATION_TRIALS = 10_000_000
+MAX_SIMULATION_LEGS = 20
+
+_simulation_pool = None
+_simulation_pool_lock = threading.Lock()
+
+
+def _simulation_executor(trials: int):
+    """The shared worker pool for big runs, started on first use; None to run in-process"""
+    global _simulation_pool
+    if SIMULATION_WORKERS <= 0 or trials < SIMULATION_POOL_MIN_TRIALS:
+        return None
+    with _simulation_pool_lock:
+        if _simulation_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # spawn, not fork: the server process has threads
+            _simulation_pool = ProcessPoolExecutor(SIMULATION_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _simulation_pool
+
+
+class SimulationLeg(BaseModel):
+    player_id: Optional[int] = None
+    player_name: Optional[str] = None
+    stat: str
+    line: float
+    side: str = "over"
+
+
+class SimulationRequest(BaseModel):
+    legs: List[SimulationLeg]
+    trials: int = 100_000
+    seed: Optional[int] = None
+    confidence: float = 0.95
+    strict_over: bool = False
+    half_life_days: Optional[float] = None
+
+
+class SimulatedProbability(BaseModel):
+    probability: float
+    ci_low: float
+    ci_high: float
+
+
+class SimulatedLeg(SimulatedProbability):
+    player_id: int
+    stat: str
+    line: float
+    side: str
+
+
+class SimulationResponse(BaseModel):
+    games: int
+    trials: int
+    replicates: int
+    seed: int
+    confidence: float
+    legs: List[SimulatedLeg]
+    combined: SimulatedProbability
+    independent_probability: float
+    lift: Optional[float]
+    fair_odds: Optional[float]
+
+
+@app.post("/simulate", response_model=SimulationResponse)
+def simulate_legs(body: SimulationRequest):
+    """
+    Monte Carlo probability that every leg lands, bootstrapped from games all
+    the legs' players appeared in so correlated legs are priced jointly. One
+    leg simulates the player's next game. Pass the returned seed to reproduce
+    a run; half_life_days samples recent games more often.
+    """
+    from app.simulation import SIDES, joint_outcomes, new_seed, recency_weights, shared_games, simulate
+    from app.stat_store import get_stat_store
+
+    if not 1 <= len(body.legs) <= MAX_SIMULATION_LEGS:
+        raise HTTPException(status_code=400, detail=f"Provide 1 to {MAX_SIMULATION_LEGS} legs")
+    if not 1 <= body.trials <= MAX_SIMULATION_TRIALS:
+        raise HTTPException(status_code=400, detail=f"trials must be between 1 and {MAX_SIMULATION_TRIALS}")
+    if not 0 < body.confidence < 1:
+        raise HTTPException(status_code=400, detail="confidence must be between 0 and 1")
+    if body.half_life_days is not None and body.half_life_days <= 0:
+        raise HTTPException(status_code=400, detail="half_life_days must be positive")
+    if body.seed is not None and body.seed < 0:
+        # SeedSequence only takes non-negative entropy
+        raise HTTPException(status_code=400, detail="seed must be non-negative")
+    for leg in body.legs:
+        _validate_search_params(leg.player_id, leg.player_name, leg.stat)
+        if leg.side not in SIDES:
+            raise HTTPException(status_code=400, detail="Invalid side. Must be one of over|under")
+
+    with get_connection() as conn:
+        player_ids = [_resolve_player_id(conn, leg.player_id, leg.player_name) for leg in body.legs]
+    for leg, pid in zip(body.legs, player_ids):
+        access_log.record("simulate", pid, leg.stat, leg.line)
+    store = get_stat_store(current_db_path())
+
+    games = shared_games(store, player_ids, [leg.stat for leg in body.legs])
+    if not len(games):
+        raise HTTPException(status_code=404, detail="No games where all the legs' players appeared")
+    outcomes = joint_outcomes(
+        store, games, [(pid, leg.stat, leg.line, leg.side) for leg, pid in zip(body.legs, player_ids)], body.strict_over
+    )
+    weights = recency_weights(store, store.rows_in_games(player_ids[0], games), body.half_life_days)
+    seed = body.seed if body.seed is not None else new_seed()
+    result = simulate(outcomes, body.trials, seed, body.confidence, weights, _simulation_executor(body.trials))
+
+    combined = result["combined"]["probability"]
+    return SimulationResponse(
+        **{key: result[key] for key in ("games", "trials", "replicates", "seed", "independent_probability", "lift")},
+        confidence=body.confidence,
+        legs=[
+            SimulatedLeg(player_id=pid, stat=leg.stat, line=leg.line, side=leg.side, **estimate)
+            for leg, pid, estimate in zip(body.legs, player_ids, result["legs"])
+        ],
+        combined=SimulatedProbability(**result["combined"]),
+        fair_odds=1 / combined if combined else None,
+    )
+
+
+@app.get("/board/{round_number}")
+def prop_board(round_number: int, request: Request, season: Optional[int] = Query(None)):
+    """
+    The precomputed prop board for a round, served straight from the file
+    scripts/build_prop_board.py wrote (gzipped when the client accepts it).
+    Defaults to the latest season with a board for that round.
+    """
+    from app.prop_board import board_bytes, find_board
+
+    path = find_board(BOARD_DIR, round_number, season)
+    if path is None:
+        raise HTTPException(status_code=404, detail="No board has been built for that round")
+    raw, compressed = board_bytes(path)
+    headers = {"Vary": "Accept-Encoding", "Cache-Control": "public, max-age=300"}
+    if negotiate_encoding(request.headers.get("accept-encoding"), ["gzip"]):
+        return Response(content=compressed, media_type=JSON, headers={**headers, "Content-Encoding": "gzip"})
+    return Response(content=raw, media_type=JSON, headers=headers)
+
+
+class LiveLine(BaseModel):
+    player_id: int
+    player_name: str
+    team_id: int
+    disposals: int
+    goals: int
+    updated_at: str
+
+
+class LiveTeamTotal(BaseModel):
+    team_id: int
+    disposals: int
+    goals: int
+
+
+class LiveGameResponse(BaseModel):
+    game_id: int
+    updated_at: str
+    teams: List[LiveTeamTotal]
+    players: List[LiveLine]
+
+
+@app.get("/live/{game_id}", response_model=LiveGameResponse)
+def live_game(game_id: int):
+    """
+    Provisional running totals for a game in progress, as written by
+    scripts/live_ingest.py. 404 once the game is promoted to final.
+    """
+    from database.live_stats import has_live_stats
+
+    with get_connection() as conn:
+        if not has_live_stats(conn):
+            raise HTTPException(status_code=404, detail="No live stats for that game")
+        rows = conn.execute(
+            """SELECT l.player_id, p.player_name, l.team_id, l.disposals, l.goals, l.updated_at
+               FROM live_player_game_stats l
+               JOIN players p ON l.player_id = p.player_id
+               WHERE l.game_id = ?
+               ORDER BY l.team_id, l.disposals DESC, l.player_id""",
+            (game_id,),
+        ).fetchall()
+    if not rows:
+        raise HTTPException(status_code=404, detail="No live stats for that game")
+    players = [LiveLine(**dict(row)) for row in rows]
+    teams: Dict[int, LiveTeamTotal] = {}
+    for line in players:
+        total = teams.setdefault(line.team_id, LiveTeamTotal(team_id=line.team_id, disposals=0, goals=0))
+        total.disposals += line.disposals
+        total.goals += line.goals
+    return LiveGameResponse(
+        game_id=game_id,
+        updated_at=max(line.updated_at for line in players),
+        teams=list(teams.values()),
+        players=players,
+    )
+
+
+@app.get("/admin/hot-keys", dependencies=[Depends(require_api_key)])
+def hot_keys(k: int = Query(20, ge=1, le=DEFAULT_HOT_KEYS_CAPACITY)):
+    """
+    Most queried (player, stat) and (player, stat, threshold) keys since boot.
+    Counts are space-saving estimates: the true count lies in [count - error, count].
+    """
+    return access_log.snapshot(k)
+
+
+@app.get("/admin/metrics", dependencies=[Depends(require_api_key)])
+def metrics():
+    """Request coalescing, access-log, rate-limit and load-shedding counters since boot"""
+    return {
+        "single_flight": search_flights.stats(),
+        "access_log": {"recorded": access_log.recorded, "written": access_log.written, "dropped": access_log.dropped},
+        "rate_limit": rate_limiter.stats() if rate_limiter is not None else None,
+        "load_shedding": load_shedder.stats() if load_shedder is not None else None,
+    }
 
 
+def warmup_statements() -> List[Tuple[str, object]]:
+    """One instance of every hot query shape, for warm-up to run once"""
+    params = {"player_id": 0, "threshold": 0}
+    statements: List[Tuple[str, object]] = [
+        ("SELECT player_id FROM vw_complete_game_stats WHERE player_name = ? LIMIT 1", ("",)),
+    ]
+    for stat in sorted(VALID_STATS):
+        for strict_over in (False, True):
+            statements.append((over_under_sql(stat, strict_over), params))
+            statements.append((splits_sql(stat, strict_over, list(SPLIT_DIMENSIONS)), params))
+    return statements
@@ -0,0 +1,67 @@
+"""
+Compare empirical hit rates with bookmaker odds.
+
+Everything here works on NumPy arrays covering the whole batch of markets,
+so pricing a round is a handful of vectorized operations. Odds are decimal
+(a winning $1 bet returns `odds` including the stake).
+"""
+
+from statistics import NormalDist
+from typing import Dict
+
+import numpy as np
+
+
+def z_score(confidence: float) -> float:
+    """Two-sided normal quantile, e.g. 0.95 -> 1.96"""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def implied_probabilities(over_odds: np.ndarray, under_odds: np.ndarray) -> Dict[str, np.ndarray]:
+    """Raw implied probabilities, the bookmaker's overround, and fair (margin-free) probabilities"""
+    implied_over = 1.0 / over_odds
+    implied_under = 1.0 / under_odds
+    book = implied_over + implied_under
+    return {
+        "implied_over": implied_over,
+        "implied_under": implied_under,
+        "overround": book - 1.0,
+        "fair_over": implied_over / book,
+    }
+
+
+def wilson_interval(hits: np.ndarray, n: np.ndarray, z: float):
+    """Wilson score interval for hits/n; NaN where n == 0"""
+    hits = hits.astype(np.float64)
+    n = n.astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = hits / n
+        denom = 1 + z * z / n
+        centre = (p + z * z / (2 * n)) / denom
+        half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return centre - half, centre + half
+
+
+def posterior_mean(hits: np.ndarray, n: np.ndarray, prior_hits: float = 1.0, prior_misses: float = 1.0) -> np.ndarray:
+    """Mean of the Beta posterior; shrinks small samples toward the prior (uniform by default)"""
+    return (hits + prior_hits) / (n + prior_hits + prior_misses)
+
+
+def price(over: np.ndarray, under: np.ndarray, over_odds: np.ndarray, under_odds: np.ndarray, confidence: float):
+    """Per-market probabilities, intervals and expected value per unit stake"""
+    n = over + under
+    with np.errstate(invalid="ignore", divide="ignore"):
+        empirical = over / n
+    ci_low, ci_high = wilson_interval(over, n, z_score(confidence))
+    implied = implied_probabilities(over_odds, under_odds)
+    return {
+        "games": n,
+        "empirical_over": empirical,
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "posterior_over": posterior_mean(over, n),
+        **implied,
+        "edge_over": empirical - implied["fair_over"],
+        "ev_over": empirical * over_odds - 1.0,
+        "ev_under": (1.0 - empirical) * under_odds - 1.0,
+    }
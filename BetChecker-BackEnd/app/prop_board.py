@@ -0,0 +1,208 @@
+"""
+Precomputed prop board for a round.
+
+build_board() takes the round's games from `games`, each team's recent
+roster (players on a current player_team_history stint who played in one of
+the team's last ROSTER_GAMES games), and computes over/under counts and hit
+rates for every player at every standard line under each common split. Only
+games before the round count. write_board() saves it as JSON plus a gzipped
+copy, which /board/{round} serves as-is.
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.stat_store import CATEGORY_CODES, StatStore, first_over_values
+
+BOARD_LINES = {
+    "disposals": tuple(line + 0.5 for line in range(14, 35)),
+    "goals": (0.5, 1.5, 2.5, 3.5),
+}
+# all: whole career; season: this season so far; location/venue/opponent: as in the upcoming game
+BOARD_SPLITS = ("all", "season", "last_10", "last_5", "location", "venue", "opponent")
+ROSTER_GAMES = 3
+
+ROUND_GAMES_SQL = """
+    SELECT g.game_id, g.game_date, g.game_time, g.venue_id, v.venue_name,
+           g.home_team_id, home.team_name AS home_team, g.away_team_id, away.team_name AS away_team
+    FROM games g
+    JOIN venues v ON g.venue_id = v.venue_id
+    JOIN teams home ON g.home_team_id = home.team_id
+    JOIN teams away ON g.away_team_id = away.team_id
+    WHERE g.season_year = :season AND g.round_number = :round_number
+    ORDER BY g.game_date, g.game_id
+"""
+
+# Current-stint players who played in one of the team's last :roster_games games before :before
+ROSTER_SQL = """
+    SELECT DISTINCT pgs.player_id, p.player_name
+    FROM player_game_stats pgs
+    JOIN players p ON pgs.player_id = p.player_id
+    JOIN player_team_history pth
+        ON pth.player_id = pgs.player_id AND pth.team_id = pgs.team_id AND pth.is_current = 1
+    WHERE pgs.team_id = :team_id
+    AND pgs.game_id IN (
+        SELECT DISTINCT recent.game_id
+        FROM player_game_stats recent
+        JOIN games g ON recent.game_id = g.game_id
+        WHERE recent.team_id = :team_id AND g.game_date < :before
+        ORDER BY g.game_date DESC
+        LIMIT :roster_games
+    )
+    ORDER BY pgs.player_id
+"""
+
+
+def upcoming_round(conn: sqlite3.Connection, today: date) -> Optional[Tuple[int, int]]:
+    """(season, round) of the earliest game on or after today"""
+    row = conn.execute(
+        """SELECT season_year, round_number FROM games
+           WHERE game_date >= ? AND round_number IS NOT NULL
+           ORDER BY game_date, game_id LIMIT 1""",
+        (today.isoformat(),),
+    ).fetchone()
+    return (int(row[0]), int(row[1])) if row else None
+
+
+def _split_masks(store: StatStore, rows: slice, season: int, before: np.datetime64, context: dict) -> Dict[str, np.ndarray]:
+    prior = store.game_date[rows] < before
+    n = int(prior.sum())
+    # Rows are date-ordered, so the prior games are a prefix of the slice
+    recent = np.arange(len(prior))
+    location = CATEGORY_CODES["location"].index(context["location"])
+    return {
+        "all": prior,
+        "season": prior & (store.season_year[rows] == season),
+        "last_10": prior & (recent >= n - 10),
+        "last_5": prior & (recent >= n - 5),
+        "location": prior & (store.location[rows] == location),
+        "venue": prior & (store.venue_id[rows] == context["venue_id"]),
+        "opponent": prior & (store.opponent_team_id[rows] == context["opponent_team_id"]),
+    }
+
+
+def _rate(over: np.ndarray, games: int) -> List[Optional[float]]:
+    if not games:
+        return [None] * len(over)
+    return [round(v, 3) for v in (over / games).tolist()]
+
+
+def build_board(
+    conn: sqlite3.Connection,
+    store: StatStore,
+    season: int,
+    round_number: int,
+    strict_over: bool = False,
+    roster_games: int = ROSTER_GAMES,
+) -> dict:
+    conn.row_factory = sqlite3.Row
+    games = [dict(row) for row in conn.execute(ROUND_GAMES_SQL, {"season": season, "round_number": round_number})]
+    cuts = {stat: first_over_values(lines, strict_over) for stat, lines in BOARD_LINES.items()}
+
+    players = []
+    for game in games:
+        before = np.datetime64(game["game_date"], "D")
+        for side, team, opponent in (
+            ("Home", game["home_team_id"], game["away_team_id"]),
+            ("Away", game["away_team_id"], game["home_team_id"]),
+        ):
+            roster = conn.execute(
+                ROSTER_SQL, {"team_id": team, "before": game["game_date"], "roster_games": roster_games}
+            ).fetchall()
+            context = {"location": side, "venue_id": game["venue_id"], "opponent_team_id": opponent}
+            for player_id, player_name in roster:
+                rows = store.player_slice(player_id)
+                masks = _split_masks(store, rows, season, before, context)
+                splits = {}
+                for split, mask in masks.items():
+                    games_in_split = int(mask.sum())
+                    entry = {"games": games_in_split}
+                    for stat, cut in cuts.items():
+                        values = store.stats[stat][rows][mask]
+                        # NULL (-1) is neither over nor under
+                        recorded = int((values >= 0).sum())
+                        over = (values[:, None] >= cut[None, :]).sum(axis=0)
+                        entry[stat] = {
+                            "over": over.tolist(),
+                            "under": (recorded - over).tolist(),
+                            "hit_rate": _rate(over, recorded),
+                        }
+                    splits[split] = entry
+                players.append({
+                    "player_id": player_id,
+                    "player_name": player_name,
+                    "team_id": team,
+                    "game_id": game["game_id"],
+                    "location": side,
+                    "splits": splits,
+                })
+
+    return {
+        "season": season,
+        "round": round_number,
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "strict_over": strict_over,
+        "lines": {stat: list(lines) for stat, lines in BOARD_LINES.items()},
+        "splits": list(BOARD_SPLITS),
+        "games": games,
+        "players": players,
+    }
+
+
+def board_path(directory: str, season: int, round_number: int) -> Path:
+    return Path(directory) / f"board-{season}-r{round_number}.json"
+
+
+def write_board(board: dict, directory: str) -> Path:
+    """
+    Write board JSON and a .gz copy, each atomically (temp file + rename).
+    The .gz goes first: readers key their cache on the JSON file's mtime.
+    """
+    path = board_path(directory, board["season"], board["round"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    raw = json.dumps(board, separators=(",", ":")).encode()
+    for target, data in ((path.with_name(path.name + ".gz"), gzip.compress(raw, 9)), (path, raw)):
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=target.name, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+    return path
+
+
+def find_board(directory: str, round_number: int, season: Optional[int] = None) -> Optional[Path]:
+    """The board for a round: the given season's, or the latest season that has one"""
+    if season is not None:
+        path = board_path(directory, season, round_number)
+        return path if path.exists() else None
+    found = sorted(
+        Path(directory).glob(f"board-*-r{round_number}.json"),
+        key=lambda p: int(p.name.split("-")[1]),
+    )
+    return found[-1] if found else None
+
+
+_cache: Dict[str, Tuple[float, bytes, bytes]] = {}
+_cache_lock = threading.Lock()
+
+
+def board_bytes(path: Path) -> Tuple[bytes, bytes]:
+    """(JSON, gzipped JSON) for a board file, re-read only when the file changes"""
+    key = str(path)
+    mtime = path.stat().st_mtime
+    cached = _cache.get(key)
+    if cached is None or cached[0] != mtime:
+        gz = path.with_name(path.name + ".gz")
+        raw = path.read_bytes()
+        compressed = gz.read_bytes() if gz.exists() else gzip.compress(raw)
+        with _cache_lock:
+            _cache[key] = cached = (mtime, raw, compressed)
+    return cached[1], cached[2]
@@ -0,0 +1,206 @@
+"""
+Per-client quotas and load shedding.
+
+Each client (API key, else IP) gets a token bucket, which allows short
+bursts, and a sliding-window counter, which caps sustained use per window.
+The window is approximated from two fixed-window counts: the previous
+window's count weighted by how much of it still overlaps, plus the current
+count. State is a few numbers per client in an LRU bounded by max_clients;
+an evicted client simply starts again with a full bucket.
+
+Bulk requests (batch, export, backtest and simulation endpoints, requests
+marked X-Priority: bulk, and clients using over half their window) are shed
+first under load. LoadShedder tracks requests in flight and an average of
+interactive latency, and raises the share of bulk requests it rejects while
+either is over target, then eases it back as they recover. Interactive
+requests are never shed, only rate limited.
+"""
+
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+
+DEFAULT_MAX_CLIENTS = 100_000
+DEFAULT_WINDOW_SECONDS = 60.0
+
+# Path prefixes that are bulk traffic
+BULK_PATHS = (
+    "/search/over-under/batch",
+    "/markets/price",
+    "/backtest",
+    "/simulate",
+    "/export/",
+)
+# Never limited: probes and docs
+EXEMPT_PATHS = {"/", "/ready", "/docs", "/redoc", "/openapi.json"}
+# Share of the window quota above which a client's requests count as bulk
+BULK_USAGE = 0.5
+
+
+class Verdict(NamedTuple):
+    allowed: bool
+    retry_after: float
+    remaining: int
+    usage: float
+
+
+class _ClientState:
+    __slots__ = ("tokens", "refilled_at", "window", "previous", "current")
+
+    def __init__(self, tokens: float, now: float, window: int):
+        self.tokens = tokens
+        self.refilled_at = now
+        self.window = window
+        self.previous = 0
+        self.current = 0
+
+
+class ClientRateLimiter:
+    """Token bucket of `burst` refilling at `rate` per second, plus `window_limit` requests per window"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        window_limit: int,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        max_clients: int = DEFAULT_MAX_CLIENTS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.window_limit = window_limit
+        self.window_seconds = window_seconds
+        self.max_clients = max_clients
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._clients: "OrderedDict[str, _ClientState]" = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+
+    def _state(self, key: str, now: float, window: int) -> _ClientState:
+        state = self._clients.get(key)
+        if state is None:
+            state = self._clients[key] = _ClientState(float(self.burst), now, window)
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(key)
+        return state
+
+    def check(self, key: str, cost: int = 1) -> Verdict:
+        """Charge key `cost` requests if both limits allow it"""
+        now = self._clock()
+        window, into = divmod(now, self.window_seconds)
+        window = int(window)
+        overlap = 1 - into / self.window_seconds
+        with self._lock:
+            state = self._state(key, now, window)
+            state.tokens = min(self.burst, state.tokens + (now - state.refilled_at) * self.rate)
+            state.refilled_at = now
+            if window != state.window:
+                state.previous = state.current if window == state.window + 1 else 0
+                state.current = 0
+                state.window = window
+            used = state.previous * overlap + state.current
+
+            retry_after = 0.0
+            if state.tokens < cost:
+                retry_after = (cost - state.tokens) / self.rate
+            if used + cost > self.window_limit:
+                if state.current + cost > self.window_limit or not state.previous:
+                    # Only the next window frees enough
+                    wait = self.window_seconds - into
+                else:
+                    # Until enough of the previous window has slid out
+                    wait = (used + cost - self.window_limit) / state.previous * self.window_seconds
+                retry_after = max(retry_after, wait)
+            if retry_after:
+                self.limited += 1
+                return Verdict(False, retry_after, max(int(self.window_limit - used), 0), used / self.window_limit)
+
+            state.tokens -= cost
+            state.current += cost
+            self.allowed += 1
+            used += cost
+            return Verdict(True, 0.0, max(int(self.window_limit - used), 0), used / self.window_limit)
+
+    def stats(self) -> dict:
+        return {"clients": len(self._clients), "allowed": self.allowed, "limited": self.limited}
+
+
+class LoadShedder:
+    """
+    Rejects a growing share of bulk requests while in-flight requests exceed
+    max_in_flight or average interactive latency exceeds latency_target.
+    """
+
+    def __init__(
+        self,
+        latency_target: float,
+        max_in_flight: int,
+        step: float = 0.05,
+        max_shed: float = 0.95,
+        smoothing: float = 0.2,
+        stale_after: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.latency_target = latency_target
+        self.max_in_flight = max_in_flight
+        self.step = step
+        # Below 1 so some bulk requests still get through to show recovery
+        self.max_shed = max_shed
+        self.smoothing = smoothing
+        # A latency average this old no longer says anything about load
+        self.stale_after = stale_after
+        self._clock = clock
+        self._rng = rng
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.latency = 0.0
+        self._latency_at = None
+        self.shed_fraction = 0.0
+        self.shed = 0
+
+    def overloaded(self) -> bool:
+        if self.in_flight > self.max_in_flight:
+            return True
+        fresh = self._latency_at is not None and self._clock() - self._latency_at < self.stale_after
+        return fresh and self.latency > self.latency_target
+
+    def admit(self, bulk: bool) -> bool:
+        """Start a request unless it is bulk and this one is to be shed"""
+        with self._lock:
+            if bulk and self.shed_fraction and self._rng() < self.shed_fraction:
+                self.shed += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def finished(self, seconds: float, bulk: bool):
+        """Record an admitted request's latency and adjust the shed share"""
+        with self._lock:
+            self.in_flight -= 1
+            if not bulk:
+                self.latency += self.smoothing * (seconds - self.latency)
+                self._latency_at = self._clock()
+            if self.overloaded():
+                self.shed_fraction = min(self.max_shed, self.shed_fraction + self.step)
+            else:
+                # Ease off slower than we back off
+                self.shed_fraction = max(0.0, self.shed_fraction - self.step / 4)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "latency_ms": round(self.latency * 1000, 1),
+            "shed_fraction": round(self.shed_fraction, 3),
+            "shed": self.shed,
+        }
+
+
+def is_bulk(path: str, priority: str = "") -> bool:
+    return priority.lower() == "bulk" or path.startswith(BULK_PATHS)
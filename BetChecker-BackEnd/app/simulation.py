@@ -0,0 +1,131 @@
+"""
+Monte Carlo pricing of single and multi-leg bets.
+
+Correlated legs (a midfielder's disposals and a teammate's goals) can't be
+priced by multiplying per-leg hit rates. Each trial instead draws one game
+that every selected player appeared in and reads all the legs off that game,
+so the joint outcome keeps whatever correlation the history has. A single
+leg is the next-game case.
+
+Trials are grouped into bootstrap replicates the size of the shared-game
+sample: the estimate is the mean over all trials and the confidence interval
+comes from the spread of replicate means. Replicates run in fixed-size
+chunks, each seeded by its own child of the request's SeedSequence, so a
+seed gives the same numbers in-process or spread over a process pool.
+"""
+
+from concurrent.futures import Executor
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.stat_store import StatStore, first_over_values
+
+# Trials per chunk: bounds the (replicates, games, legs) index array a chunk holds
+CHUNK_TRIALS = 250_000
+# Enough replicate means for stable percentile intervals on long careers
+MIN_REPLICATES = 200
+SIDES = ("over", "under")
+
+
+def shared_games(store: StatStore, player_ids: Sequence[int], stats: Optional[Sequence[str]] = None) -> np.ndarray:
+    """game_idx of every game all the players appeared in (with stats[i] recorded for player_ids[i], if given)"""
+    together = None
+    for i, player_id in enumerate(player_ids):
+        rows = store.player_slice(player_id)
+        played = store.game_bitset(rows, None if stats is None else store.recorded(rows, stats[i]))
+        together = played if together is None else together & played
+    return store.bitset_games(together)
+
+
+def joint_outcomes(
+    store: StatStore,
+    games: np.ndarray,
+    legs: Sequence[Tuple[int, str, float, str]],
+    strict_over: bool,
+) -> np.ndarray:
+    """(games, legs) hit matrix for legs of (player_id, stat, line, side)"""
+    outcomes = np.empty((len(games), len(legs)), dtype=bool)
+    for j, (player_id, stat, line, side) in enumerate(legs):
+        values = store.stats[stat][store.rows_in_games(player_id, games)]
+        over = values >= first_over_values([line], strict_over)[0]
+        outcomes[:, j] = over if side == "over" else ~over
+    return outcomes
+
+
+def recency_weights(store: StatStore, rows: np.ndarray, half_life_days: Optional[float]) -> Optional[np.ndarray]:
+    """Sampling probabilities halving every half_life_days back from the latest game; None for uniform"""
+    if half_life_days is None:
+        return None
+    dates = store.game_date[rows].astype(np.int64)
+    weights = 0.5 ** ((dates.max() - dates) / half_life_days)
+    return weights / weights.sum()
+
+
+def _run_chunk(
+    outcomes: np.ndarray, weights: Optional[np.ndarray], replicates: int, seed: np.random.SeedSequence
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(replicates, legs) leg hit rates and (replicates,) all-legs hit rates"""
+    n = len(outcomes)
+    rng = np.random.default_rng(seed)
+    if weights is None:
+        draws = rng.integers(0, n, size=(replicates, n))
+    else:
+        draws = rng.choice(n, size=(replicates, n), p=weights)
+    hits = outcomes[draws]
+    return hits.mean(axis=1), hits.all(axis=2).mean(axis=1)
+
+
+def _interval(samples: np.ndarray, confidence: float) -> Tuple[np.ndarray, np.ndarray]:
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(samples, [tail, 100 - tail], axis=0)
+    return low, high
+
+
+def simulate(
+    outcomes: np.ndarray,
+    trials: int,
+    seed: int,
+    confidence: float = 0.95,
+    weights: Optional[np.ndarray] = None,
+    executor: Optional[Executor] = None,
+) -> dict:
+    """
+    Leg and combined hit probabilities from about `trials` draws (rounded up
+    to whole replicates, at least MIN_REPLICATES). Chunks go to `executor` when one is given.
+    """
+    n = len(outcomes)
+    replicates = max(-(-trials // n), MIN_REPLICATES)
+    per_chunk = max(CHUNK_TRIALS // n, 1)
+    sizes = [min(per_chunk, replicates - start) for start in range(0, replicates, per_chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = ([outcomes] * len(sizes), [weights] * len(sizes), sizes, seeds)
+    results = list(executor.map(_run_chunk, *args)) if executor is not None else list(map(_run_chunk, *args))
+
+    leg_rates = np.concatenate([r[0] for r in results])
+    combined_rates = np.concatenate([r[1] for r in results])
+    leg_low, leg_high = _interval(leg_rates, confidence)
+    combined_low, combined_high = _interval(combined_rates, confidence)
+    legs = leg_rates.mean(axis=0)
+    combined = float(combined_rates.mean())
+    independent = float(np.prod(legs))
+    return {
+        "games": n,
+        "trials": replicates * n,
+        "replicates": replicates,
+        "seed": seed,
+        "legs": [
+            {"probability": float(p), "ci_low": float(lo), "ci_high": float(hi)}
+            for p, lo, hi in zip(legs, np.atleast_1d(leg_low), np.atleast_1d(leg_high))
+        ],
+        "combined": {"probability": combined, "ci_low": float(combined_low), "ci_high": float(combined_high)},
+        # What multiplying the legs would say; lift > 1 means they tend to land together
+        "independent_probability": independent,
+        "lift": combined / independent if independent else None,
+    }
+
+
+def new_seed() -> int:
+    """A fresh seed to report back, so any run can be reproduced"""
+    return int(np.random.SeedSequence().generate_state(1, dtype=np.uint64)[0] >> 1)
+
@@ -0,0 +1,505 @@
+"""
+In-memory columnar copy of player_game_stats for vectorized queries.
+
+Rows are sorted by (player_id, game_date, game_id) so each player's history
+is one contiguous, date-ordered slice. A per-game roster index maps every
+game to its stat rows sorted by player_id.
+
+The rows are the ones vw_complete_game_stats returns (the same inner joins),
+and a NULL stat is stored as -1 and counts as neither over nor under, as it
+does in the SQL aggregates.
+"""
+
+import math
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import numpy as np
+
+from app.context_effects import ContextEffects
+from database.change_log import affected_players, first_seq, latest_seq, read_changes
+from database.connection import connect_reader, file_version
+from database.storage_codes import CATEGORY_CODES, has_storage_codes
+
+STAT_COLUMNS = ("disposals", "goals")
+
+# vw_complete_game_stats inner-joins these, so rows without them never reach the SQL path either
+_VIEW_JOINS = """JOIN players p ON pgs.player_id = p.player_id
+    JOIN teams t ON pgs.team_id = t.team_id
+    JOIN teams opponent ON pgs.opponent_team_id = opponent.team_id
+    JOIN venues v ON pgs.venue_id = v.venue_id"""
+
+STORE_LOAD_SQL = f"""
+    SELECT
+        pgs.stat_id,
+        pgs.player_id,
+        pgs.game_id,
+        g.game_date,
+        g.season_year,
+        pgs.team_id,
+        pgs.opponent_team_id,
+        pgs.venue_id,
+        pgs.location,
+        g.game_type,
+        pgs.game_time,
+        pgs.disposals,
+        pgs.goals,
+        pgs.days_since_last_game
+    FROM player_game_stats pgs
+    JOIN games g ON pgs.game_id = g.game_id
+    {_VIEW_JOINS}
+    ORDER BY pgs.player_id, g.game_date, pgs.game_id
+"""
+
+# The same rows with dates and categories already integers, for databases
+# with storage codes: nothing to parse per row
+STORE_LOAD_CODED_SQL = f"""
+    SELECT
+        pgs.stat_id,
+        pgs.player_id,
+        pgs.game_id,
+        g.game_day AS game_date,
+        g.season_year,
+        pgs.team_id,
+        pgs.opponent_team_id,
+        pgs.venue_id,
+        pgs.location_code AS location,
+        g.game_type_code AS game_type,
+        pgs.game_time_code AS game_time,
+        pgs.disposals,
+        pgs.goals,
+        pgs.days_since_last_game
+    FROM player_game_stats pgs
+    JOIN games g ON pgs.game_id = g.game_id
+    {_VIEW_JOINS}
+    ORDER BY pgs.player_id, g.game_day, pgs.game_id
+"""
+
+
+# Column name -> dtype. NULL stats and days_since_last_game are stored as -1.
+COLUMN_DTYPES = {
+    "stat_id": np.int64,
+    "player_id": np.int64,
+    "game_id": np.int64,
+    "game_date": "datetime64[D]",
+    "season_year": np.int32,
+    "team_id": np.int64,
+    "opponent_team_id": np.int64,
+    "venue_id": np.int64,
+    "location": np.int8,
+    "game_type": np.int8,
+    "game_time": np.int8,
+    "disposals": np.int32,
+    "goals": np.int32,
+    "days_since_last_game": np.int32,
+}
+
+# Refresh by reloading rather than patching once this share of players changed
+FULL_RELOAD_FRACTION = 0.5
+
+
+def store_load_sql(conn: sqlite3.Connection) -> Tuple[str, bool]:
+    """(load SQL, whether it returns coded columns) for this database"""
+    if has_storage_codes(conn):
+        return STORE_LOAD_CODED_SQL, True
+    return STORE_LOAD_SQL, False
+
+
+def _columns_from_rows(rows: list, coded: bool = False) -> Dict[str, np.ndarray]:
+    """Columns from STORE_LOAD_SQL rows, or STORE_LOAD_CODED_SQL rows when coded"""
+    columns = {}
+    for name, dtype in COLUMN_DTYPES.items():
+        if coded and name == "game_date":
+            # game_day is already the numpy day ordinal
+            days = np.fromiter((r[name] for r in rows), dtype=np.int64, count=len(rows))
+            columns[name] = days.astype(dtype)
+        elif coded and name in CATEGORY_CODES:
+            columns[name] = np.fromiter((-1 if r[name] is None else r[name] for r in rows), dtype=dtype, count=len(rows))
+        elif name == "game_date":
+            # Dates as numpy day ordinals so ranges and rest are integer maths
+            columns[name] = np.array([r[name] for r in rows], dtype=dtype)
+        elif name == "days_since_last_game" or name in STAT_COLUMNS:
+            columns[name] = np.array([-1 if r[name] is None else r[name] for r in rows], dtype=dtype)
+        elif name in CATEGORY_CODES:
+            # Position in the tuple, -1 for NULL
+            codes = {value: code for code, value in enumerate(CATEGORY_CODES[name])}
+            columns[name] = np.fromiter((codes.get(r[name], -1) for r in rows), dtype=dtype, count=len(rows))
+        else:
+            columns[name] = np.fromiter((r[name] or 0 for r in rows), dtype=dtype, count=len(rows))
+    return columns
+
+
+class StatStore:
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        last_seq: Optional[int] = None,
+        effects: Optional[ContextEffects] = None,
+    ):
+        # Sort by (player_id, game_date, game_id) whatever order rows arrived in
+        order = np.lexsort((columns["game_id"], columns["game_date"], columns["player_id"]))
+        self.columns = {name: np.asarray(col)[order] for name, col in columns.items()}
+        # change_log position this store reflects (None: database has no log)
+        self.last_seq = last_seq
+        n = len(order)
+
+        self.stat_id = self.columns["stat_id"]
+        self.player_id = self.columns["player_id"]
+        self.game_id = self.columns["game_id"]
+        self.game_date = self.columns["game_date"]
+        self.season_year = self.columns["season_year"]
+        self.team_id = self.columns["team_id"]
+        self.opponent_team_id = self.columns["opponent_team_id"]
+        self.venue_id = self.columns["venue_id"]
+        self.location = self.columns["location"]
+        self.game_type = self.columns["game_type"]
+        self.game_time = self.columns["game_time"]
+        self.stats: Dict[str, np.ndarray] = {col: self.columns[col] for col in STAT_COLUMNS}
+        self.days_since_last_game = self.columns["days_since_last_game"]
+
+        # Player slices: rows are grouped by player_id
+        players, starts = np.unique(self.player_id, return_index=True)
+        ends = np.append(starts[1:], n)
+        self._player_slices: Dict[int, Tuple[int, int]] = {
+            int(p): (int(s), int(e)) for p, s, e in zip(players, starts, ends)
+        }
+
+        # Dense game index: game_idx is the position of game_id in game_ids
+        self.game_ids, self.game_idx = np.unique(self.game_id, return_inverse=True)
+        self.game_idx = self.game_idx.astype(np.int64)
+        self.n_games = len(self.game_ids)
+
+        # Roster index: rows ordered by (game_idx, player_id), with a
+        # composite key so (game, player) lookups are one searchsorted
+        self._key_stride = int(self.player_id.max()) + 1 if n else 1
+        self.roster_order = np.lexsort((self.player_id, self.game_idx))
+        self.roster_keys = self.game_idx[self.roster_order] * self._key_stride + self.player_id[self.roster_order]
+        self.roster_offsets = np.searchsorted(
+            self.game_idx[self.roster_order], np.arange(self.n_games + 1)
+        )
+
+        # (player_id, stat) -> suffix sums of the value histogram, pinned for
+        # the hottest players so over/under at any threshold is one lookup
+        self._histograms: Dict[Tuple[int, str], np.ndarray] = {}
+
+        # Per-season opponent/venue effects; patched rather than rebuilt on refresh
+        self.effects = effects if effects is not None else ContextEffects.from_columns(self.columns, STAT_COLUMNS)
+
+    @classmethod
+    def from_connection(cls, conn: sqlite3.Connection) -> "StatStore":
+        conn.row_factory = sqlite3.Row
+        # Read the log position first: anything committed after it is
+        # re-applied on the next refresh, never missed
+        last_seq = latest_seq(conn)
+        sql, coded = store_load_sql(conn)
+        return cls(_columns_from_rows(conn.execute(sql).fetchall(), coded), last_seq)
+
+    def with_players_replaced(
+        self, player_ids: Set[int], rows: list, last_seq: Optional[int], coded: bool = False
+    ) -> "StatStore":
+        """New store with every row of player_ids swapped for rows"""
+        keep = ~np.isin(self.player_id, np.fromiter(player_ids, dtype=np.int64, count=len(player_ids)))
+        fresh = _columns_from_rows(rows, coded)
+        merged = {name: np.concatenate([col[keep], fresh[name]]) for name, col in self.columns.items()}
+        removed = {name: col[~keep] for name, col in self.columns.items()}
+        return StatStore(merged, last_seq, self.effects.updated(removed, fresh))
+
+    def refreshed(self, conn: sqlite3.Connection) -> Tuple["StatStore", Optional[Set[int]]]:
+        """
+        Apply change_log entries after last_seq.
+        Returns (store, changed player_ids); None player_ids means a full reload happened.
+        """
+        if self.last_seq is None or latest_seq(conn) is None or self.last_seq < first_seq(conn) - 1:
+            # No log to tail, or it was pruned past what this store applied
+            return self._carry_pins(StatStore.from_connection(conn)), None
+        conn.row_factory = sqlite3.Row
+        changes = read_changes(conn, self.last_seq)
+        if not changes:
+            return self, set()
+        new_seq = changes[-1].seq
+        players = affected_players(conn, changes)
+        if players is None or len(players) > FULL_RELOAD_FRACTION * max(len(self._player_slices), 1):
+            return self._carry_pins(StatStore.from_connection(conn)), None
+
+        load_sql, coded = store_load_sql(conn)
+        rows = []
+        ids = sorted(players)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            sql = load_sql.replace(
+                "ORDER BY", f"WHERE pgs.player_id IN ({placeholders})\n    ORDER BY"
+            )
+            rows.extend(conn.execute(sql, chunk).fetchall())
+        return self._carry_pins(self.with_players_replaced(players, rows, new_seq, coded), players), players
+
+    def _carry_pins(self, store: "StatStore", players: Optional[Set[int]] = None) -> "StatStore":
+        """Pin the same histograms on store, recomputing only players' (all of them when None)"""
+        if players is None:
+            store.pin_histograms(self._histograms.keys())
+            return store
+        for key, suffix in self._histograms.items():
+            if key[0] not in players:
+                store._histograms[key] = suffix
+        store.pin_histograms(key for key in self._histograms if key[0] in players)
+        return store
+
+    def pin_histograms(self, keys: Iterable[Tuple[int, str]]):
+        """Precompute histograms for (player_id, stat) pairs"""
+        for player_id, stat in list(keys):
+            if stat not in self.stats or not self.has_player(player_id):
+                continue
+            values = self.stats[stat][self.player_slice(player_id)]
+            counts = np.bincount(values[values >= 0], minlength=1)
+            self._histograms[(player_id, stat)] = np.cumsum(counts[::-1])[::-1]
+
+    @property
+    def pinned(self) -> Set[Tuple[int, str]]:
+        return set(self._histograms)
+
+    def pinned_over_under(
+        self, player_id: int, stat: str, threshold: float, strict_over: bool
+    ) -> Optional[Tuple[int, int]]:
+        """(over, under) from a pinned histogram, or None if not pinned"""
+        suffix = self._histograms.get((player_id, stat))
+        if suffix is None:
+            return None
+        total = int(suffix[0])
+        first_over = _first_over(threshold, strict_over)
+        if first_over <= 0:
+            over = total
+        elif first_over < len(suffix):
+            over = int(suffix[first_over])
+        else:
+            over = 0
+        return over, total - over
+
+    def _suffix_histograms(self, player_ids: np.ndarray, stat: str) -> np.ndarray:
+        """
+        Per-player suffix sums of the value histogram, shape (players, max value + 2):
+        [i, v] is how many of player_ids[i]'s games had stat >= v. Unknown players are all
+        zero, and games with the stat NULL aren't counted.
+        """
+        n = len(player_ids)
+        if n == 0 or len(self) == 0:
+            return np.zeros((n, 1), dtype=np.int64)
+        values = self.stats[stat].astype(np.int64)
+        width = max(int(values.max()), 0) + 2
+        # Row -> index of its player in player_ids, for rows of requested players
+        order = np.argsort(player_ids, kind="stable")
+        sorted_ids = player_ids[order]
+        pos = np.minimum(np.searchsorted(sorted_ids, self.player_id), n - 1)
+        wanted = (sorted_ids[pos] == self.player_id) & (values >= 0)
+        rows = order[pos[wanted]]
+        counts = np.bincount(rows * width + values[wanted], minlength=n * width).reshape(n, width)
+        return np.cumsum(counts[:, ::-1], axis=1)[:, ::-1]
+
+    @staticmethod
+    def _first_over_index(thresholds, strict_over: bool, width: int) -> np.ndarray:
+        first = np.array([_first_over(t, strict_over) for t in thresholds], dtype=np.int64)
+        return np.clip(first, 0, width - 1)
+
+    def over_under_table(
+        self, player_ids: np.ndarray, stat: str, thresholds: np.ndarray, strict_over: bool
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(over, under) matrices of shape (players, thresholds) from one histogram pass"""
+        suffix = self._suffix_histograms(np.asarray(player_ids, dtype=np.int64), stat)
+        over = suffix[:, self._first_over_index(thresholds, strict_over, suffix.shape[1])]
+        under = suffix[:, :1] - over
+        return over, under
+
+    def over_under_pairs(
+        self, player_ids: np.ndarray, stat: str, thresholds: np.ndarray, strict_over: bool
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(over, under) for each (player_ids[i], thresholds[i]) pair"""
+        player_ids = np.asarray(player_ids, dtype=np.int64)
+        unique, inverse = np.unique(player_ids, return_inverse=True)
+        suffix = self._suffix_histograms(unique, stat)
+        over = suffix[inverse, self._first_over_index(thresholds, strict_over, suffix.shape[1])]
+        under = suffix[inverse, 0] - over
+        return over, under
+
+    def __len__(self) -> int:
+        return len(self.stat_id)
+
+    def has_player(self, player_id: int) -> bool:
+        return player_id in self._player_slices
+
+    def player_slice(self, player_id: int) -> slice:
+        """Date-ordered rows for a player (empty slice if unknown)"""
+        start, end = self._player_slices.get(player_id, (0, 0))
+        return slice(start, end)
+
+    def game_roster(self, game_id: int) -> np.ndarray:
+        """Stat row indices for a game, sorted by player_id"""
+        pos = np.searchsorted(self.game_ids, game_id)
+        if pos >= self.n_games or self.game_ids[pos] != game_id:
+            return np.empty(0, dtype=np.int64)
+        return self.roster_order[self.roster_offsets[pos]:self.roster_offsets[pos + 1]]
+
+    def rows_in_games(self, player_id: int, game_idx: np.ndarray) -> np.ndarray:
+        """Row index of player_id in each game of game_idx (-1 if absent)"""
+        if not len(self.roster_keys):
+            return np.full(len(game_idx), -1, dtype=np.int64)
+        keys = game_idx * self._key_stride + player_id
+        pos = np.searchsorted(self.roster_keys, keys)
+        pos = np.minimum(pos, len(self.roster_keys) - 1)
+        found = self.roster_keys[pos] == keys
+        return np.where(found, self.roster_order[pos], -1)
+
+    def rows_for(self, player_ids: np.ndarray, game_ids: np.ndarray) -> np.ndarray:
+        """Row index of each (player_ids[i], game_ids[i]) pair (-1 if absent)"""
+        player_ids = np.asarray(player_ids, dtype=np.int64)
+        game_ids = np.asarray(game_ids, dtype=np.int64)
+        if not len(self.roster_keys) or not len(game_ids):
+            return np.full(len(game_ids), -1, dtype=np.int64)
+        game_idx = np.minimum(np.searchsorted(self.game_ids, game_ids), self.n_games - 1)
+        known = (self.game_ids[game_idx] == game_ids) & (player_ids >= 0) & (player_ids < self._key_stride)
+        keys = game_idx * self._key_stride + player_ids
+        pos = np.minimum(np.searchsorted(self.roster_keys, keys), len(self.roster_keys) - 1)
+        found = known & (self.roster_keys[pos] == keys)
+        return np.where(found, self.roster_order[pos], -1)
+
+    def recorded(self, rows, stat: str) -> np.ndarray:
+        """Boolean mask of the given rows whose stat isn't NULL"""
+        return self.stats[stat][rows] >= 0
+
+    def hit_mask(self, rows, stat: str, threshold: float, strict_over: bool) -> np.ndarray:
+        """Boolean 'over' mask for the given rows, matching /search/over-under (NULL is never over)"""
+        values = self.stats[stat][rows]
+        return ((values > threshold) if strict_over else (values >= threshold)) & (values >= 0)
+
+    def filter_mask(
+        self,
+        rows,
+        location: Optional[str] = None,
+        venue_id: Optional[int] = None,
+        opponent_team_id: Optional[int] = None,
+        game_type: Optional[str] = None,
+        game_time: Optional[str] = None,
+        start_date=None,
+        end_date=None,
+    ) -> np.ndarray:
+        """Boolean mask over `rows` for the search filters that are set (dates inclusive)"""
+        mask = np.ones(len(self.stat_id[rows]), dtype=bool)
+        for column, value in (("venue_id", venue_id), ("opponent_team_id", opponent_team_id)):
+            if value is not None:
+                mask &= self.columns[column][rows] == value
+        for column, value in (("location", location), ("game_type", game_type), ("game_time", game_time)):
+            if value is not None:
+                codes = CATEGORY_CODES[column]
+                mask &= self.columns[column][rows] == (codes.index(value) if value in codes else -2)
+        if start_date is not None:
+            mask &= self.game_date[rows] >= np.datetime64(start_date, "D")
+        if end_date is not None:
+            mask &= self.game_date[rows] <= np.datetime64(end_date, "D")
+        return mask
+
+    def game_bitset(self, rows, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Packed bitset over game_idx with a bit set for each (masked) row's game"""
+        bits = np.zeros(self.n_games, dtype=bool)
+        games = self.game_idx[rows]
+        bits[games if mask is None else games[mask]] = True
+        return np.packbits(bits)
+
+    def bitset_games(self, bitset: np.ndarray) -> np.ndarray:
+        """game_idx positions set in a packed bitset"""
+        return np.flatnonzero(np.unpackbits(bitset, count=self.n_games))
+
+
+def _first_over(threshold: float, strict_over: bool) -> int:
+    """Smallest integer stat value that counts as over threshold"""
+    return math.floor(threshold) + 1 if strict_over else math.ceil(threshold)
+
+
+def first_over_values(thresholds, strict_over: bool) -> np.ndarray:
+    """_first_over for an array of thresholds"""
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    return (np.floor(thresholds) + 1 if strict_over else np.ceil(thresholds)).astype(np.int64)
+
+
+def popcount(bitset: np.ndarray) -> int:
+    return int(np.unpackbits(bitset).sum())
+
+
+# _cache_lock guards only the dict and is never held while loading;
+# _load_lock serializes the loads and refreshes themselves
+_cache_lock = threading.Lock()
+_load_lock = threading.Lock()
+_cache: "OrderedDict[str, Tuple[tuple, StatStore]]" = OrderedDict()
+# Paths with a background refresh started by cached_stat_store
+_refreshing: Set[str] = set()
+# Current snapshot plus the one readers may still be draining from
+_CACHE_SIZE = 2
+
+
+def _lookup(db_path: str, version: tuple) -> Tuple[Optional[StatStore], bool]:
+    """(cached store, whether it matches version)"""
+    with _cache_lock:
+        cached = _cache.get(db_path)
+        if cached is None:
+            return None, False
+        _cache.move_to_end(db_path)
+        return cached[1], cached[0] == version
+
+
+def _refresh_in_background(db_path: str):
+    try:
+        get_stat_store(db_path)
+    except Exception:
+        # The next request retries; until then it is answered from SQL
+        pass
+    finally:
+        with _cache_lock:
+            _refreshing.discard(db_path)
+
+
+def cached_stat_store(db_path: str) -> Optional[StatStore]:
+    """
+    Up-to-date store for db_path, or None without waiting: when nothing is
+    loaded yet, or the file changed and the refresh is left to a background
+    thread. Callers answer from SQL meanwhile.
+    """
+    store, current = _lookup(db_path, file_version(db_path))
+    if store is None or current:
+        return store
+    with _cache_lock:
+        if db_path in _refreshing:
+            return None
+        _refreshing.add(db_path)
+    threading.Thread(target=_refresh_in_background, args=(db_path,), daemon=True).start()
+    return None
+
+
+def get_stat_store(db_path: str) -> StatStore:
+    """
+    Return the store for db_path, loading it if needed. When the file
+    changes, tail change_log and patch only the affected players; fall back
+    to a full reload otherwise.
+    """
+    version = file_version(db_path)
+    store, current = _lookup(db_path, version)
+    if current:
+        return store
+    with _load_lock:
+        # Another caller may have loaded it while we waited
+        version = file_version(db_path)
+        cached, current = _lookup(db_path, version)
+        if current:
+            return cached
+        conn = connect_reader(db_path)
+        try:
+            if cached is not None:
+                store, _ = cached.refreshed(conn)
+            else:
+                store = StatStore.from_connection(conn)
+        finally:
+            conn.close()
+        with _cache_lock:
+            _cache[db_path] = (version, store)
+            _cache.move_to_end(db_path)
+            while len(_cache) > _CACHE_SIZE:
+                _cache.popitem(last=False)
+    return store
@@ -0,0 +1,107 @@
+"""
+Over/under streaks from run-length encoding the stat store.
+
+Store rows are grouped by player and date-ordered, so a run is a maximal
+stretch of consecutive (filtered) rows with the same player and the same
+over/under outcome. One pass over the whole store yields every run, which
+answers both a single player's streaks and the cross-player ranking.
+"""
+
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.stat_store import StatStore
+
+
+class Runs(NamedTuple):
+    # Parallel arrays, one entry per run, in row order
+    player_id: np.ndarray
+    over: np.ndarray
+    length: np.ndarray
+    start_date: np.ndarray
+    end_date: np.ndarray
+
+
+def run_length_encode(store: StatStore, rows: np.ndarray, hits: np.ndarray) -> Runs:
+    """Runs of equal `hits` within each player over store rows `rows` (ascending)"""
+    players = store.player_id[rows]
+    n = len(rows)
+    if n == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return Runs(empty, np.empty(0, dtype=bool), empty, store.game_date[:0], store.game_date[:0])
+    boundary = np.empty(n, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = (hits[1:] != hits[:-1]) | (players[1:] != players[:-1])
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], n) - 1
+    dates = store.game_date[rows]
+    return Runs(players[starts], hits[starts], ends - starts + 1, dates[starts], dates[ends])
+
+
+def _run(runs: Runs, i: int) -> Dict[str, object]:
+    return {
+        "length": int(runs.length[i]),
+        "start_date": str(runs.start_date[i]),
+        "end_date": str(runs.end_date[i]),
+    }
+
+
+def _longest(runs: Runs, over: bool) -> Optional[Dict[str, object]]:
+    """Longest run on one side; the most recent wins a tie"""
+    candidates = np.flatnonzero(runs.over == over)
+    if not len(candidates):
+        return None
+    lengths = runs.length[candidates]
+    best = candidates[len(lengths) - 1 - int(np.argmax(lengths[::-1]))]
+    return _run(runs, best)
+
+
+def player_streaks(
+    store: StatStore, player_id: int, stat: str, threshold: float, strict_over: bool, **filters
+) -> Dict[str, object]:
+    """Current streak and longest over/under streaks for one player"""
+    window = store.player_slice(player_id)
+    rows = np.arange(window.start, window.stop)
+    # Games with the stat NULL are neither over nor under, so they don't break a run
+    rows = rows[store.filter_mask(rows, **filters) & store.recorded(rows, stat)]
+    runs = run_length_encode(store, rows, store.hit_mask(rows, stat, threshold, strict_over))
+    current = None
+    if len(runs.length):
+        current = {"side": "over" if runs.over[-1] else "under", **_run(runs, len(runs.length) - 1)}
+    return {
+        "games": len(rows),
+        "current": current,
+        "longest_over": _longest(runs, True),
+        "longest_under": _longest(runs, False),
+    }
+
+
+def active_streak_leaders(
+    store: StatStore,
+    stat: str,
+    threshold: float,
+    strict_over: bool,
+    over: bool,
+    min_length: int = 1,
+    limit: int = 20,
+    active_since=None,
+    **filters,
+) -> List[Dict[str, object]]:
+    """
+    Players ranked by the length of the streak running through their latest
+    (filtered) game, on the requested side. active_since drops players whose
+    latest game is older. Longest first; ties go to the more recent streak.
+    """
+    rows = np.flatnonzero(store.filter_mask(slice(None), **filters) & store.recorded(slice(None), stat))
+    runs = run_length_encode(store, rows, store.hit_mask(rows, stat, threshold, strict_over))
+    if not len(runs.length):
+        return []
+    # A player's last run is the active one
+    last = np.append(runs.player_id[1:] != runs.player_id[:-1], True)
+    keep = last & (runs.over == over) & (runs.length >= min_length)
+    if active_since is not None:
+        keep &= runs.end_date >= np.datetime64(active_since, "D")
+    active = np.flatnonzero(keep)
+    order = np.lexsort((-runs.end_date[active].astype(np.int64), -runs.length[active]))[:limit]
+    return [{"player_id": int(runs.player_id[i]), **_run(runs, i)} for i in active[order]]
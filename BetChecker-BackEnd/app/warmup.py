@@ -0,0 +1,149 @@
+"""
+Startup warm-up for the API process.
+
+Runs once after boot so the first real requests don't pay for cold page
+cache, first-use query parsing or loading the stat store:
+1. preload_pages      - read the database file once to pull it into the OS page cache
+2. prime_statements   - run every hot query shape once
+3. stat store         - build the in-memory store (and import NumPy)
+4. histograms         - pin over/under histograms for the top-N players in the access log
+
+The readiness endpoint reports ready only once this has finished.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+WARMUP_MODES = {"background", "blocking", "off"}
+
+_PRELOAD_CHUNK = 1 << 20
+
+
+class WarmupState:
+    def __init__(self):
+        self.ready = False
+        self.running = False
+        self.error: Optional[str] = None
+        self.steps: Dict[str, float] = {}
+        self.pinned = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "ready": self.ready,
+            "running": self.running,
+            "error": self.error,
+            "steps_ms": {name: round(ms, 1) for name, ms in self.steps.items()},
+            "pinned_histograms": self.pinned,
+        }
+
+
+def preload_pages(db_path: str, max_bytes: Optional[int] = None) -> int:
+    """Sequentially read the database (and WAL) so later random reads hit the page cache"""
+    total = 0
+    for path in (db_path, db_path + "-wal"):
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            while max_bytes is None or total < max_bytes:
+                chunk = f.read(_PRELOAD_CHUNK)
+                if not chunk:
+                    break
+                total += len(chunk)
+    return total
+
+
+def prime_statements(conn: sqlite3.Connection, statements: List[Tuple[str, object]]) -> int:
+    """Execute each hot query once; returns how many succeeded"""
+    primed = 0
+    for sql, params in statements:
+        try:
+            conn.execute(sql, params).fetchall()
+            primed += 1
+        except sqlite3.Error:
+            continue
+    return primed
+
+
+def top_queried(access_log_path: Optional[str], n: int) -> List[Tuple[int, str]]:
+    """
+    Most frequent (player_id, stat) pairs in an NDJSON access log.
+    Lines without a player_id (e.g. name lookups that failed) are skipped.
+    """
+    if not access_log_path or not os.path.exists(access_log_path) or n <= 0:
+        return []
+    counts: Counter = Counter()
+    with open(access_log_path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("player_id") is not None and entry.get("stat"):
+                counts[(int(entry["player_id"]), entry["stat"])] += 1
+    return [key for key, _ in counts.most_common(n)]
+
+
+def run_warmup(
+    db_path: str,
+    state: WarmupState,
+    statements: List[Tuple[str, object]],
+    access_log_path: Optional[str] = None,
+    top_n: int = 0,
+    preload_max_bytes: Optional[int] = None,
+    log: Callable[[str], None] = lambda message: None,
+):
+    state.running = True
+    state.error = None
+
+    def step(name: str, fn: Callable[[], object]):
+        start = time.perf_counter()
+        result = fn()
+        state.steps[name] = (time.perf_counter() - start) * 1000
+        log(f"Warm-up {name}: {state.steps[name]:.1f} ms ({result})")
+        return result
+
+    try:
+        step("preload_pages", lambda: f"{preload_pages(db_path, preload_max_bytes)} bytes")
+
+        from database.connection import connect_reader
+
+        conn = connect_reader(db_path)
+        try:
+            step("prime_statements", lambda: f"{prime_statements(conn, statements)} statements")
+        finally:
+            conn.close()
+
+        # Deferred import keeps NumPy off the process's import-time path
+        from app.stat_store import get_stat_store
+
+        store = step("stat_store", lambda: get_stat_store(db_path))
+        hot = top_queried(access_log_path, top_n)
+        step("histograms", lambda: store.pin_histograms(hot) or f"{len(store.pinned)} pinned")
+        state.pinned = len(store.pinned)
+        state.ready = True
+    except Exception as e:
+        state.error = str(e)
+        log(f"Warm-up failed: {e}")
+        # Serving cold beats not serving
+        state.ready = True
+    finally:
+        state.running = False
+
+
+def start_warmup(mode: str, **kwargs) -> Optional[threading.Thread]:
+    """Run warm-up per WARMUP mode: inline, in a daemon thread, or not at all"""
+    state: WarmupState = kwargs["state"]
+    if mode == "off":
+        state.ready = True
+        return None
+    if mode == "blocking":
+        run_warmup(**kwargs)
+        return None
+    thread = threading.Thread(target=run_warmup, kwargs=kwargs, name="warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,69 @@
+"""
+Recency-weighted, context-adjusted hit rates.
+
+Each of a player's games gets weight 0.5 ** (age / half_life_days), with age
+measured back from their latest game (the reference date cancels out of the
+ratio). Optionally each value is first divided by that game's opponent and
+venue effects, then multiplied by the effects for the upcoming game, so a
+big day against a weak defence counts for less.
+"""
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from app.stat_store import StatStore
+
+
+class WeightedHitRate(NamedTuple):
+    over: int
+    under: int
+    over_probability: Optional[float]
+    under_probability: Optional[float]
+    effective_games: float
+
+
+def weighted_hit_rate(
+    store: StatStore,
+    player_id: int,
+    stat: str,
+    threshold: float,
+    strict_over: bool,
+    half_life_days: Optional[float] = None,
+    adjust_opponent: bool = False,
+    adjust_venue: bool = False,
+    opponent_team_id: Optional[int] = None,
+    venue_id: Optional[int] = None,
+) -> WeightedHitRate:
+    window = store.player_slice(player_id)
+    rows = np.arange(window.start, window.stop)
+    # Games with the stat NULL are neither over nor under
+    rows = rows[store.recorded(rows, stat)]
+    values = store.stats[stat][rows].astype(np.float64)
+    seasons = store.season_year[rows]
+
+    for enabled, context, target in (
+        (adjust_opponent, "opponent_team_id", opponent_team_id),
+        (adjust_venue, "venue_id", venue_id),
+    ):
+        if not enabled:
+            continue
+        values = values / store.effects.factors(context, stat, seasons, store.columns[context][rows])
+        if target is not None:
+            values = values * store.effects.latest_factor(context, stat, target)
+
+    if half_life_days is None:
+        weights = np.ones(len(values))
+    else:
+        dates = store.game_date[rows].astype(np.int64)
+        ages = (dates.max() - dates) if len(dates) else dates
+        weights = 0.5 ** (ages / half_life_days)
+
+    hits = values > threshold if strict_over else values >= threshold
+    over = int(hits.sum())
+    total = float(weights.sum())
+    if total == 0:
+        return WeightedHitRate(over, len(values) - over, None, None, 0.0)
+    over_probability = float(weights[hits].sum() / total)
+    effective_games = total * total / float((weights * weights).sum())
+    return WeightedHitRate(over, len(values) - over, over_probability, 1.0 - over_probability, effective_games)
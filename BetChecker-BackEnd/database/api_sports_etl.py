@@ -0,0 +1,199 @@
+"""
+Extract, transform and load API-Sports AFL data, following ETL_PLAN.md.
+
+Each stage is separate so it can be timed and profiled on its own:
+extract_season() makes the API calls through a `fetch(endpoint, params)`
+callable (real API, fixture server or an in-process test client),
+transform_season() turns the response envelopes into plain row dicts, and
+load_season() writes them through DatabaseManager in one bulk_load().
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional
+
+from database.db_manager_api import DatabaseManager
+
+AFL_LEAGUE_ID = 1
+# /games/statistics/players accepts at most 10 ids per call
+STATISTICS_IDS_PER_CALL = 10
+
+Fetch = Callable[[str, dict], dict]
+
+
+def determine_game_time(time_string: Optional[str]) -> Optional[str]:
+    """"14:00" -> Day, "16:30" -> Twilight, "19:20" -> Night"""
+    if not time_string:
+        return None
+    hour = int(time_string.split(":")[0])
+    if hour < 15:
+        return "Day"
+    if hour < 18:
+        return "Twilight"
+    return "Night"
+
+
+def determine_game_type(round_text: Optional[str]) -> str:
+    """Map the API's round text onto the games.game_type values"""
+    text = (round_text or "").lower()
+    if "final" in text:
+        return "Finals"
+    if "pre" in text:
+        return "Pre-Season"
+    return "Regular Season"
+
+
+def parse_response(envelope: dict) -> list:
+    """The response list, or ValueError if the API reported errors in the body"""
+    errors = envelope.get("errors")
+    if errors:
+        raise ValueError(f"API-Sports error for {envelope.get('get')}: {errors}")
+    return envelope.get("response") or []
+
+
+def extract_season(fetch: Fetch, season: int, league: int = AFL_LEAGUE_ID, teams: Optional[list] = None) -> dict:
+    """Every response needed to load one season; pass `teams` to skip refetching them"""
+    if teams is None:
+        teams = parse_response(fetch("teams", {}))
+    players = {
+        team["id"]: parse_response(fetch("players", {"team": team["id"], "season": season}))
+        for team in teams
+    }
+    games = parse_response(fetch("games", {"season": season, "league": league}))
+    game_ids = [str(game["game"]["id"]) for game in games]
+    statistics = []
+    for start in range(0, len(game_ids), STATISTICS_IDS_PER_CALL):
+        ids = "-".join(game_ids[start:start + STATISTICS_IDS_PER_CALL])
+        statistics.extend(parse_response(fetch("games/statistics/players", {"ids": ids})))
+    return {"season": season, "teams": teams, "players": players, "games": games, "statistics": statistics}
+
+
+def transform_game(api_game: dict) -> dict:
+    game_type = determine_game_type(api_game.get("round"))
+    return {
+        "api_game_id": api_game["game"]["id"],
+        "season_year": api_game["league"]["season"],
+        # Finals have no round number
+        "round_number": api_game.get("week") if game_type != "Finals" else None,
+        "game_type": game_type,
+        "game_date": api_game["date"][:10],
+        "game_time": api_game.get("time"),
+        "venue_name": api_game["venue"],
+        "home_api_team_id": api_game["teams"]["home"]["id"],
+        "away_api_team_id": api_game["teams"]["away"]["id"],
+    }
+
+
+def transform_game_statistics(item: dict, game: dict) -> List[dict]:
+    """One row per player line in a /games/statistics/players item; `game` is transform_game() output"""
+    team_ids = [team["team"]["id"] for team in item["teams"]]
+    bucket = determine_game_time(game["game_time"])
+    rows = []
+    for team in item["teams"]:
+        team_id = team["team"]["id"]
+        if team_id == game["home_api_team_id"]:
+            location = "Home"
+        elif team_id == game["away_api_team_id"]:
+            location = "Away"
+        else:
+            raise ValueError(f"Team {team_id} not in game {game['api_game_id']}")
+        opponent = next(t for t in team_ids if t != team_id)
+        for line in team["players"]:
+            rows.append({
+                "api_player_id": line["player"]["id"],
+                "api_game_id": game["api_game_id"],
+                "api_team_id": team_id,
+                "api_opponent_team_id": opponent,
+                "location": location,
+                "game_time": bucket,
+                "disposals": line.get("disposals") or 0,
+                "goals": (line.get("goals") or {}).get("total") or 0,
+            })
+    return rows
+
+
+def transform_season(extracted: dict) -> dict:
+    games = [transform_game(game) for game in extracted["games"]]
+    by_id = {game["api_game_id"]: game for game in games}
+    stats = []
+    for item in extracted["statistics"]:
+        game = by_id.get(item["game"]["id"])
+        if game is not None:
+            stats.extend(transform_game_statistics(item, game))
+    players = {}
+    for roster in extracted["players"].values():
+        for player in roster:
+            players[player["id"]] = player["name"]
+    return {
+        "teams": [(team["id"], team["name"]) for team in extracted["teams"]],
+        "players": players,
+        "games": games,
+        "stats": stats,
+    }
+
+
+def load_season(db: DatabaseManager, transformed: dict) -> Dict[str, int]:
+    """Write one transformed season in a single transaction; returns row counts"""
+    counts = {"teams": 0, "players": 0, "games": 0, "stats": 0, "skipped_stats": 0}
+    with db.bulk_load():
+        team_ids = {}
+        for api_team_id, name in transformed["teams"]:
+            team_ids[api_team_id] = db.get_or_create_team(name, api_team_id=api_team_id)
+            counts["teams"] += 1
+
+        player_ids = {}
+        for api_player_id, name in transformed["players"].items():
+            player_ids[api_player_id] = db.get_or_create_player(name, api_player_id)
+            counts["players"] += 1
+
+        venue_ids: Dict[str, int] = {}
+        games = {}
+        for game in transformed["games"]:
+            venue = game["venue_name"]
+            if venue not in venue_ids:
+                venue_ids[venue] = db.get_or_create_venue(venue)
+            game_id = db.get_or_create_game(
+                api_game_id=game["api_game_id"],
+                season_year=game["season_year"],
+                round_number=game["round_number"],
+                game_type=game["game_type"],
+                game_date=game["game_date"],
+                game_time=game["game_time"],
+                venue_id=venue_ids[venue],
+                home_team_id=team_ids[game["home_api_team_id"]],
+                away_team_id=team_ids[game["away_api_team_id"]],
+            )
+            games[game["api_game_id"]] = (game_id, venue_ids[venue])
+            counts["games"] += 1
+
+        for row in transformed["stats"]:
+            player_id = player_ids.get(row["api_player_id"])
+            if player_id is None:
+                # Not on any roster we fetched; leave it for the duplicate review
+                counts["skipped_stats"] += 1
+                continue
+            game_id, venue_id = games[row["api_game_id"]]
+            db.insert_player_stats(
+                player_id=player_id,
+                game_id=game_id,
+                team_id=team_ids[row["api_team_id"]],
+                opponent_team_id=team_ids[row["api_opponent_team_id"]],
+                venue_id=venue_id,
+                location=row["location"],
+                game_time=row["game_time"],
+                disposals=row["disposals"],
+                goals=row["goals"],
+            )
+            counts["stats"] += 1
+    return counts
+
+
+def run_seasons(db: DatabaseManager, fetch: Fetch, seasons: Iterable[int]) -> Dict[str, int]:
+    """Plain extract -> transform -> load over several seasons"""
+    totals: Dict[str, int] = {}
+    teams = None
+    for season in seasons:
+        extracted = extract_season(fetch, season, teams=teams)
+        teams = extracted["teams"]
+        for key, value in load_season(db, transform_season(extracted)).items():
+            totals[key] = totals.get(key, 0) + value
+    db.update_days_since_last_game()
+    return totals
@@ -0,0 +1,129 @@
+"""
+Change-data-capture log for ETL writes.
+
+DatabaseManager appends a row to change_log in the same transaction as
+every insert/update, so the log and the data can never disagree. Readers
+(the API's caches) remember the last seq they applied and fetch only what
+came after it.
+"""
+
+import sqlite3
+from typing import Iterable, List, NamedTuple, Optional, Set, Tuple
+
+CHANGE_LOG_DDL = """
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,   -- Monotonically increasing
+    entity TEXT NOT NULL,                    -- 'players', 'games' or 'player_game_stats'
+    op TEXT NOT NULL,                        -- 'insert' or 'update'
+    entity_id INTEGER NOT NULL,              -- 0 for table-wide updates
+    player_id INTEGER,                       -- Affected player, when known
+    game_id INTEGER,                         -- Affected game, when known
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    CHECK (entity IN ('players', 'games', 'player_game_stats')),
+    CHECK (op IN ('insert', 'update'))
+)
+"""
+
+
+class Change(NamedTuple):
+    seq: int
+    entity: str
+    op: str
+    entity_id: int
+    player_id: Optional[int]
+    game_id: Optional[int]
+
+
+def ensure_change_log(conn: sqlite3.Connection):
+    conn.execute(CHANGE_LOG_DDL)
+
+
+def has_change_log(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log'"
+    ).fetchone()
+    return row is not None
+
+
+def append_change(
+    conn: sqlite3.Connection,
+    entity: str,
+    op: str,
+    entity_id: int,
+    player_id: Optional[int] = None,
+    game_id: Optional[int] = None,
+):
+    conn.execute(
+        "INSERT INTO change_log (entity, op, entity_id, player_id, game_id) VALUES (?, ?, ?, ?, ?)",
+        (entity, op, entity_id, player_id, game_id),
+    )
+
+
+def append_changes(conn: sqlite3.Connection, entity: str, op: str, rows: Iterable[Tuple[int, Optional[int], Optional[int]]]):
+    """One entry per (entity_id, player_id, game_id) row"""
+    conn.executemany(
+        "INSERT INTO change_log (entity, op, entity_id, player_id, game_id) VALUES (?, ?, ?, ?, ?)",
+        ((entity, op, entity_id, player_id, game_id) for entity_id, player_id, game_id in rows),
+    )
+
+
+def _assigned_seq(conn: sqlite3.Connection) -> int:
+    """Highest seq ever assigned, including pruned entries (0 if none)"""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+    return row[0] if row else 0
+
+
+def latest_seq(conn: sqlite3.Connection) -> Optional[int]:
+    """Highest seq in the log (0 if never written), or None if the database has no log"""
+    if not has_change_log(conn):
+        return None
+    latest = conn.execute("SELECT MAX(seq) FROM change_log").fetchone()[0]
+    return latest if latest is not None else _assigned_seq(conn)
+
+
+def first_seq(conn: sqlite3.Connection) -> int:
+    """
+    Lowest seq still in the log. A reader whose last applied seq is below
+    first_seq - 1 missed pruned entries and has to reload in full.
+    """
+    first = conn.execute("SELECT MIN(seq) FROM change_log").fetchone()[0]
+    return first if first is not None else _assigned_seq(conn) + 1
+
+
+def read_changes(conn: sqlite3.Connection, after_seq: int, limit: Optional[int] = None) -> List[Change]:
+    sql = "SELECT seq, entity, op, entity_id, player_id, game_id FROM change_log WHERE seq > ? ORDER BY seq"
+    params: tuple = (after_seq,)
+    if limit is not None:
+        sql += " LIMIT ?"
+        params += (limit,)
+    return [Change(*row) for row in conn.execute(sql, params)]
+
+
+def affected_players(conn: sqlite3.Connection, changes: List[Change]) -> Optional[Set[int]]:
+    """
+    Players whose stat rows may differ after applying changes.
+    None means a table-wide change (no player or game recorded): reload everything.
+    """
+    if any(c.player_id is None and c.game_id is None for c in changes):
+        return None
+    players = {c.player_id for c in changes if c.player_id is not None}
+    # A changed game (e.g. corrected date) touches everyone who played in it
+    game_ids = sorted({c.game_id for c in changes if c.entity == "games" and c.game_id is not None})
+    for start in range(0, len(game_ids), 500):
+        chunk = game_ids[start:start + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        players.update(
+            row[0] for row in conn.execute(
+                f"SELECT DISTINCT player_id FROM player_game_stats WHERE game_id IN ({placeholders})", chunk
+            )
+        )
+    return players
+
+
+def prune_change_log(conn: sqlite3.Connection, through_seq: int) -> int:
+    """
+    Delete entries through through_seq; returns rows removed. Readers that
+    hadn't applied them notice via first_seq() and reload in full.
+    """
+    return conn.execute("DELETE FROM change_log WHERE seq <= ?", (through_seq,)).rowcount
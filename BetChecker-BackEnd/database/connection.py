@@ -0,0 +1,100 @@
+"""
+Managed SQLite connections shared by the API (readers) and the ETL (writer).
+
+The writer puts the database in WAL mode so a weekly load never blocks API
+readers, and takes over checkpointing from SQLite's auto-checkpoint so the
+WAL is folded back into the main file at a time of the ETL's choosing.
+Readers are query-only and never change the journal mode themselves.
+"""
+
+import os
+import random
+import sqlite3
+import time
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+DEFAULT_RETRY_ATTEMPTS = 5
+DEFAULT_RETRY_BASE_DELAY = 0.05
+
+
+def is_busy_error(error: Exception) -> bool:
+    """True for the lock/busy errors that are worth retrying"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def with_retry(
+    fn: Callable[[], T],
+    attempts: int = DEFAULT_RETRY_ATTEMPTS,
+    base_delay: float = DEFAULT_RETRY_BASE_DELAY,
+) -> T:
+    """Run fn, retrying busy errors with jittered exponential backoff"""
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except sqlite3.OperationalError as e:
+            if not is_busy_error(e) or attempt == attempts - 1:
+                raise
+            time.sleep(base_delay * (2 ** attempt) * (0.5 + random.random()))
+    raise AssertionError("unreachable")
+
+
+def connect_reader(db_path: str, busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS) -> sqlite3.Connection:
+    """Read-only connection for API requests"""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+    conn.execute("PRAGMA query_only = 1")
+    return conn
+
+
+def connect_writer(
+    db_path: str,
+    busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+    wal_autocheckpoint: int = 0,
+) -> sqlite3.Connection:
+    """
+    The single ETL writer connection. Enables WAL (persisted in the file) and
+    sets wal_autocheckpoint; 0 disables auto-checkpoints so the ETL decides
+    when to call checkpoint().
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+    mode = with_retry(lambda: conn.execute("PRAGMA journal_mode = WAL").fetchone()[0])
+    if mode.lower() != "wal":
+        raise sqlite3.OperationalError(f"Could not enable WAL mode (journal_mode={mode})")
+    # NORMAL is durable across application crashes in WAL mode and avoids an fsync per commit
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA wal_autocheckpoint = {int(wal_autocheckpoint)}")
+    return conn
+
+
+def file_version(db_path: str) -> tuple:
+    """Change marker for the database, including commits still in the WAL"""
+    st = os.stat(db_path)
+    try:
+        wal = os.stat(db_path + "-wal")
+        wal_version = (wal.st_mtime_ns, wal.st_size)
+    except FileNotFoundError:
+        wal_version = None
+    return (st.st_mtime_ns, st.st_size, wal_version)
+
+
+def checkpoint(conn: sqlite3.Connection, mode: str = "PASSIVE") -> dict:
+    """
+    Fold the WAL back into the main database file.
+    PASSIVE never waits on readers; TRUNCATE waits (busy_timeout) and resets the WAL to zero bytes.
+    """
+    mode = mode.upper()
+    if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+        raise ValueError(f"Invalid checkpoint mode: {mode}")
+    busy, log_frames, checkpointed = with_retry(
+        lambda: conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    )
+    return {"busy": bool(busy), "log_frames": log_frames, "checkpointed_frames": checkpointed}
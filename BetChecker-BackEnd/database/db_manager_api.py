@@ -3,15 +3,96 @@ Database Manager updated for API-Sports.io integration.
 Uses API IDs as primary identifiers instead of name + DOB.
 """
 
+import json
 import sqlite3
-from typing import Optional, Tuple
+from contextlib import contextmanager
+from typing import Iterable, Optional, Tuple
 from datetime import date, datetime
 
+from database.change_log import append_change, append_changes, ensure_change_log, prune_change_log
+from database.connection import (
+    DEFAULT_BUSY_TIMEOUT_MS,
+    checkpoint,
+    connect_writer,
+    with_retry,
+)
+from database.live_stats import LIVE_COLUMNS, ensure_live_stats
+from database.storage_codes import ensure_storage_codes
+from database.team_stats import ensure_team_game_stats, rebuild_team_game_stats
+
+# days_since_last_game for one game's rows, from each player's previous game
+GAME_DAYS_SINCE_LAST_SQL = """
+    UPDATE player_game_stats
+    SET days_since_last_game = (
+        SELECT this.game_day - MAX(prev.game_day)
+        FROM games this, player_game_stats earlier
+        JOIN games prev ON earlier.game_id = prev.game_id
+        WHERE this.game_id = player_game_stats.game_id
+        AND earlier.player_id = player_game_stats.player_id
+        AND prev.game_day < this.game_day
+    )
+    WHERE game_id = ?
+"""
+
+
 class DatabaseManager:
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        busy_timeout_ms: int = DEFAULT_BUSY_TIMEOUT_MS,
+        wal_autocheckpoint: int = 0,
+    ):
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
+        # Single writer: WAL lets API readers keep going while we load
+        self.conn = connect_writer(db_path, busy_timeout_ms, wal_autocheckpoint)
+        self._batch_depth = 0
+        # Players whose team history is rebuilt when the bulk load finishes
+        self._history_players = set()
+        # Games whose team_game_stats rows are rebuilt when the bulk load finishes
+        self._team_games = set()
+        ensure_change_log(self.conn)
+        ensure_live_stats(self.conn)
+        ensure_team_game_stats(self.conn)
+        ensure_storage_codes(self.conn)
+        self.conn.commit()
+
+    def _commit(self):
+        """Commit now unless inside bulk_load(), which commits once at the end"""
+        if self._batch_depth == 0:
+            with_retry(self.conn.commit)
+
+    @contextmanager
+    def bulk_load(self):
+        """
+        Group many get_or_create_*/insert_* calls into one write transaction.
+        Rolls back everything on error.
+        """
+        if self._batch_depth == 0:
+            with_retry(lambda: self.conn.execute("BEGIN IMMEDIATE"))
+        self._batch_depth += 1
+        try:
+            yield self
+        except Exception:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._history_players.clear()
+                self._team_games.clear()
+                self.conn.rollback()
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            players, self._history_players = self._history_players, set()
+            games, self._team_games = self._team_games, set()
+            if games:
+                rebuild_team_game_stats(self.conn, games)
+            if players:
+                # One pass for the whole load; commits it along with the data
+                self.rebuild_player_team_history(players)
+            with_retry(self.conn.commit)
+
+    def checkpoint(self, mode: str = "PASSIVE") -> dict:
+        """Fold the WAL into the main file (call after a load; TRUNCATE to reset the WAL)"""
+        return checkpoint(self.conn, mode)
     
     def get_or_create_team(self, team_name: str, api_team_id: Optional[int] = None) -> int:
         """
@@ -41,7 +122,7 @@ class DatabaseManager:
                     "UPDATE teams SET api_team_id = ? WHERE team_id = ?",
                     (api_team_id, row['team_id'])
                 )
-                self.conn.commit()
+                self._commit()
             return row['team_id']
         
         # Create new team
@@ -49,7 +130,7 @@ class DatabaseManager:
             "INSERT INTO teams (team_name, api_team_id, is_active) VALUES (?, ?, 1) RETURNING team_id",
             (team_name, api_team_id)
         )
-        self.conn.commit()
+        self._commit()
         return cur.fetchone()['team_id']
     
     def get_or_create_venue(self, venue_name: str) -> int:
@@ -66,7 +147,7 @@ class DatabaseManager:
             "INSERT INTO venues (venue_name) VALUES (?) RETURNING venue_id",
             (venue_name,)
         )
-        self.conn.commit()
+        self._commit()
         return cur.fetchone()['venue_id']
     
     def get_or_create_player(
@@ -90,11 +171,13 @@ class DatabaseManager:
         row = cur.fetchone()
         if row:
             # Update name if it changed (shouldn't happen, but just in case)
-            self.conn.execute(
-                "UPDATE players SET player_name = ? WHERE player_id = ?",
-                (player_name, row['player_id'])
+            cur = self.conn.execute(
+                "UPDATE players SET player_name = ? WHERE player_id = ? AND player_name != ?",
+                (player_name, row['player_id'], player_name)
             )
-            self.conn.commit()
+            if cur.rowcount:
+                append_change(self.conn, 'players', 'update', row['player_id'], player_id=row['player_id'])
+                self._commit()
             return row['player_id']
         
         # Check if name already exists with different API ID (potential duplicate)
@@ -117,8 +200,10 @@ class DatabaseManager:
                RETURNING player_id""",
             (player_name, api_player_id, first_name, last_name, date_of_birth, debut_year)
         )
-        self.conn.commit()
-        return cur.fetchone()['player_id']
+        player_id = cur.fetchone()['player_id']
+        append_change(self.conn, 'players', 'insert', player_id, player_id=player_id)
+        self._commit()
+        return player_id
     
     def get_or_create_game(
         self,
@@ -159,7 +244,8 @@ class DatabaseManager:
                 "UPDATE games SET api_game_id = ? WHERE game_id = ?",
                 (api_game_id, row['game_id'])
             )
-            self.conn.commit()
+            append_change(self.conn, 'games', 'update', row['game_id'], game_id=row['game_id'])
+            self._commit()
             return row['game_id']
         
         # Create new game
@@ -172,8 +258,10 @@ class DatabaseManager:
             (api_game_id, season_year, round_number, game_type, game_date, game_time,
              venue_id, home_team_id, away_team_id)
         )
-        self.conn.commit()
-        return cur.fetchone()['game_id']
+        game_id = cur.fetchone()['game_id']
+        append_change(self.conn, 'games', 'insert', game_id, game_id=game_id)
+        self._commit()
+        return game_id
     
     def insert_player_stats(
         self,
@@ -188,8 +276,10 @@ class DatabaseManager:
         goals: int
     ) -> int:
         """
-        Insert player stats and handle team history updates.
-        Returns stat_id.
+        Insert player stats. Returns stat_id.
+        Team history (rebuild_player_team_history()) and team_game_stats are
+        derived afterwards: once per bulk_load(), or straight away for a
+        standalone insert.
         """
         # Check if stats already exist
         cur = self.conn.execute(
@@ -200,46 +290,6 @@ class DatabaseManager:
         if existing:
             return existing['stat_id']
         
-        # Get game date for team history check
-        cur = self.conn.execute(
-            "SELECT game_date FROM games WHERE game_id = ?",
-            (game_id,)
-        )
-        game_date = cur.fetchone()['game_date']
-        
-        # Check if team changed
-        cur = self.conn.execute(
-            """SELECT team_id FROM player_game_stats 
-               WHERE player_id = ? 
-               ORDER BY game_id DESC LIMIT 1""",
-            (player_id,)
-        )
-        last_game = cur.fetchone()
-        
-        if last_game and last_game['team_id'] != team_id:
-            # Team changed! Update player_team_history
-            self.conn.execute(
-                """UPDATE player_team_history 
-                   SET end_date = ?, is_current = 0 
-                   WHERE player_id = ? AND is_current = 1""",
-                (game_date, player_id)
-            )
-            
-            self.conn.execute(
-                """INSERT INTO player_team_history 
-                   (player_id, team_id, start_date, is_current) 
-                   VALUES (?, ?, ?, 1)""",
-                (player_id, team_id, game_date)
-            )
-        elif not last_game:
-            # First game for this player - create initial team history
-            self.conn.execute(
-                """INSERT INTO player_team_history 
-                   (player_id, team_id, start_date, is_current) 
-                   VALUES (?, ?, ?, 1)""",
-                (player_id, team_id, game_date)
-            )
-        
         # Insert stats
         cur = self.conn.execute(
             """INSERT INTO player_game_stats 
@@ -250,8 +300,164 @@ class DatabaseManager:
             (player_id, game_id, team_id, opponent_team_id, venue_id,
              location, game_time, disposals, goals)
         )
-        self.conn.commit()
-        return cur.fetchone()['stat_id']
+        stat_id = cur.fetchone()['stat_id']
+        append_change(self.conn, 'player_game_stats', 'insert', stat_id, player_id=player_id, game_id=game_id)
+        if self._batch_depth:
+            self._history_players.add(player_id)
+            self._team_games.add(game_id)
+        else:
+            rebuild_team_game_stats(self.conn, [game_id])
+            self.rebuild_player_team_history([player_id])
+        self._commit()
+        return stat_id
+
+    def upsert_player_stats(
+        self,
+        player_id: int,
+        game_id: int,
+        team_id: int,
+        opponent_team_id: int,
+        venue_id: int,
+        location: str,
+        game_time: Optional[str],
+        disposals: int,
+        goals: int
+    ) -> int:
+        """
+        Like insert_player_stats(), but an existing row takes the new
+        disposals and goals (a stat correction or a promoted live game).
+        Returns stat_id.
+        """
+        cur = self.conn.execute(
+            """UPDATE player_game_stats SET disposals = ?, goals = ?
+               WHERE player_id = ? AND game_id = ?
+               AND (disposals IS NOT ? OR goals IS NOT ?)
+               RETURNING stat_id""",
+            (disposals, goals, player_id, game_id, disposals, goals)
+        )
+        row = cur.fetchone()
+        if row:
+            append_change(self.conn, 'player_game_stats', 'update', row['stat_id'], player_id=player_id, game_id=game_id)
+            if self._batch_depth:
+                self._team_games.add(game_id)
+            else:
+                rebuild_team_game_stats(self.conn, [game_id])
+            self._commit()
+            return row['stat_id']
+        return self.insert_player_stats(
+            player_id, game_id, team_id, opponent_team_id, venue_id, location, game_time, disposals, goals
+        )
+
+    def get_player_id(self, api_player_id: int) -> Optional[int]:
+        """player_id for an API player ID, or None if we haven't loaded them"""
+        row = self.conn.execute(
+            "SELECT player_id FROM players WHERE api_player_id = ?", (api_player_id,)
+        ).fetchone()
+        return row['player_id'] if row else None
+
+    def upsert_live_stats(self, rows: Iterable[dict]) -> int:
+        """
+        Write running totals for games in progress (dicts keyed by
+        live_stats.LIVE_COLUMNS). Rows whose totals haven't moved are left
+        alone; returns how many were inserted or changed.
+        """
+        cur = self.conn.executemany(
+            f"""INSERT INTO live_player_game_stats ({', '.join(LIVE_COLUMNS)})
+                VALUES ({', '.join(':' + c for c in LIVE_COLUMNS)})
+                ON CONFLICT (player_id, game_id) DO UPDATE SET
+                    disposals = excluded.disposals,
+                    goals = excluded.goals,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE disposals != excluded.disposals OR goals != excluded.goals""",
+            [{c: row[c] for c in LIVE_COLUMNS} for row in rows]
+        )
+        self._commit()
+        return cur.rowcount
+
+    def promote_live_game(self, game_id: int) -> int:
+        """
+        Move a finished game's provisional rows into player_game_stats in one
+        transaction and clear them. Every row goes through the change log, so
+        API caches patch just these players. Returns rows promoted.
+        """
+        with self.bulk_load():
+            rows = self.conn.execute(
+                f"SELECT {', '.join(LIVE_COLUMNS)} FROM live_player_game_stats WHERE game_id = ?",
+                (game_id,)
+            ).fetchall()
+            for row in rows:
+                self.upsert_player_stats(**dict(row))
+            self.conn.execute("DELETE FROM live_player_game_stats WHERE game_id = ?", (game_id,))
+            # Only this game's rows need it, and it is each player's latest
+            self.conn.execute(GAME_DAYS_SINCE_LAST_SQL, (game_id,))
+        return len(rows)
+
+    def rebuild_player_team_history(self, player_ids: Optional[Iterable[int]] = None):
+        """
+        Derive player_team_history from player_game_stats in one pass: order
+        each player's games by (game_date, game_id) and run-length-encode
+        team_id. Every run becomes a stint from its first to its last game;
+        the latest stint is current with no end_date. Correct regardless of
+        the order games were loaded in. Limit to player_ids, or all players
+        with stats when None.
+        """
+        if player_ids is None:
+            scope = "SELECT DISTINCT player_id FROM player_game_stats"
+            params = {}
+        else:
+            scope = "SELECT value FROM json_each(:ids)"
+            params = {"ids": json.dumps(sorted(set(player_ids)))}
+
+        self.conn.execute(f"DELETE FROM player_team_history WHERE player_id IN ({scope})", params)
+        self.conn.execute(f"""
+            WITH ordered AS (
+                SELECT
+                    pgs.player_id,
+                    pgs.team_id,
+                    g.game_date,
+                    pgs.game_id,
+                    LAG(pgs.team_id) OVER (
+                        PARTITION BY pgs.player_id
+                        ORDER BY g.game_date, pgs.game_id
+                    ) AS prev_team_id
+                FROM player_game_stats pgs
+                JOIN games g ON pgs.game_id = g.game_id
+                WHERE pgs.player_id IN ({scope})
+            ),
+            runs AS (
+                SELECT
+                    player_id,
+                    team_id,
+                    game_date,
+                    SUM(CASE WHEN prev_team_id IS NULL OR prev_team_id != team_id THEN 1 ELSE 0 END) OVER (
+                        PARTITION BY player_id
+                        ORDER BY game_date, game_id
+                        ROWS UNBOUNDED PRECEDING
+                    ) AS run_number
+                FROM ordered
+            ),
+            stints AS (
+                SELECT
+                    player_id,
+                    team_id,
+                    run_number,
+                    MIN(game_date) AS start_date,
+                    MAX(game_date) AS last_date,
+                    MAX(run_number) OVER (PARTITION BY player_id) AS last_run
+                FROM runs
+                GROUP BY player_id, run_number
+            )
+            INSERT INTO player_team_history (player_id, team_id, start_date, end_date, is_current)
+            SELECT
+                player_id,
+                team_id,
+                start_date,
+                CASE WHEN run_number = last_run THEN NULL ELSE last_date END,
+                CASE WHEN run_number = last_run THEN 1 ELSE 0 END
+            FROM stints
+            ORDER BY player_id, run_number
+        """, params)
+        self._commit()
     
     def find_potential_duplicates(self) -> list:
         """
@@ -274,31 +480,39 @@ class DatabaseManager:
         """)
         return [dict(row) for row in cur.fetchall()]
     
-    def update_days_since_last_game(self):
-        """Calculate and update days_since_last_game for all stats"""
-        self.conn.execute("""
+    def update_days_since_last_game(self) -> int:
+        """Calculate and update days_since_last_game for all stats; returns rows changed"""
+        # One window pass joined back by stat_id (a correlated subquery
+        # re-ran the window per row); unchanged rows aren't rewritten
+        changed = self.conn.execute("""
             WITH ranked_games AS (
                 SELECT 
                     pgs.stat_id,
-                    pgs.player_id,
-                    pgs.game_id,
-                    g.game_date,
-                    LAG(g.game_date) OVER (
+                    g.game_day - LAG(g.game_day) OVER (
                         PARTITION BY pgs.player_id 
-                        ORDER BY g.game_date
-                    ) as prev_game_date
+                        ORDER BY g.game_day
+                    ) as days
                 FROM player_game_stats pgs
                 JOIN games g ON pgs.game_id = g.game_id
             )
             UPDATE player_game_stats
-            SET days_since_last_game = (
-                SELECT JULIANDAY(rg.game_date) - JULIANDAY(rg.prev_game_date)
-                FROM ranked_games rg
-                WHERE rg.stat_id = player_game_stats.stat_id
-            )
-        """)
-        self.conn.commit()
+            SET days_since_last_game = rg.days
+            FROM ranked_games rg
+            WHERE rg.stat_id = player_game_stats.stat_id
+            AND player_game_stats.days_since_last_game IS NOT rg.days
+            RETURNING stat_id, player_id, game_id
+        """).fetchall()
+        # Only the rows that moved, so readers patch those players rather than reload
+        append_changes(self.conn, 'player_game_stats', 'update', changed)
+        self._commit()
+        return len(changed)
     
+    def prune_change_log(self, through_seq: int) -> int:
+        """Drop change_log entries up to through_seq once all API nodes have applied them"""
+        removed = prune_change_log(self.conn, through_seq)
+        self._commit()
+        return removed
+
     def close(self):
         self.conn.close()
 
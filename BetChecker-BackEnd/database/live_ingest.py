@@ -0,0 +1,267 @@
+"""
+Live in-game ingestion.
+
+LivePoller polls a day's games while they are on: one /games?date= call for
+statuses, then /games/statistics/players for the games in play (10 ids per
+call). Running totals go into live_player_game_stats; when a game reaches
+full time its final totals are promoted into player_game_stats.
+
+LiveAggregates holds the latest totals in memory and diffs each poll against
+them, so only player lines that moved are written and team totals are
+patched by the deltas rather than re-summed. The gap between polls is
+derived from the API's per-minute limit and, optionally, a request budget
+for the session (API_RATE_LIMIT_STRATEGY.md: 10/minute, 100/day on the free
+plan), and a 429 backs off for its Retry-After.
+"""
+
+import math
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from database.api_sports_etl import (
+    STATISTICS_IDS_PER_CALL,
+    Fetch,
+    parse_response,
+    transform_game,
+    transform_game_statistics,
+)
+from database.db_manager_api import DatabaseManager
+from database.live_stats import read_live_rows
+
+# API-Sports game status codes (status.short)
+NOT_STARTED_STATUSES = {"NS", "TBD"}
+FINISHED_STATUSES = {"FT", "AOT"}
+CANCELLED_STATUSES = {"PST", "CANC", "ABD"}
+
+DEFAULT_REQUESTS_PER_MINUTE = 10
+DEFAULT_MIN_INTERVAL = 30.0
+
+
+class RateLimited(Exception):
+    """Raised by a fetch callable when the API answers 429"""
+
+    def __init__(self, retry_after: float = 60.0):
+        super().__init__(f"Rate limited; retry after {retry_after:g}s")
+        self.retry_after = retry_after
+
+
+class LiveAggregates:
+    """Latest per-player totals and per-team totals for the games being polled"""
+
+    def __init__(self):
+        # (game_id, player_id) -> (disposals, goals)
+        self.players: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        # (game_id, team_id) -> [disposals, goals]
+        self.teams: Dict[Tuple[int, int], List[int]] = {}
+
+    def apply(self, rows: List[dict]) -> List[dict]:
+        """Fold in a poll's rows; returns the ones that are new or changed"""
+        changed = []
+        for row in rows:
+            key = (row["game_id"], row["player_id"])
+            after = (row["disposals"], row["goals"])
+            before = self.players.get(key)
+            if before == after:
+                continue
+            self.players[key] = after
+            # Stat corrections can go down as well as up
+            previous = before or (0, 0)
+            totals = self.teams.setdefault((row["game_id"], row["team_id"]), [0, 0])
+            totals[0] += after[0] - previous[0]
+            totals[1] += after[1] - previous[1]
+            changed.append(row)
+        return changed
+
+    def team_totals(self, game_id: int) -> Dict[int, Dict[str, int]]:
+        return {
+            team_id: {"disposals": totals[0], "goals": totals[1]}
+            for (game, team_id), totals in self.teams.items() if game == game_id
+        }
+
+    def drop_game(self, game_id: int):
+        self.players = {k: v for k, v in self.players.items() if k[0] != game_id}
+        self.teams = {k: v for k, v in self.teams.items() if k[0] != game_id}
+
+
+class LivePoller:
+    def __init__(
+        self,
+        db: DatabaseManager,
+        fetch: Fetch,
+        game_date: str,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        request_budget: Optional[int] = None,
+        session_minutes: float = 240.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        request_budget caps the requests for the whole session (e.g. what is
+        left of the daily quota), spread evenly over session_minutes.
+        """
+        self.db = db
+        self.fetch = fetch
+        self.game_date = game_date
+        self.requests_per_minute = requests_per_minute
+        self.min_interval = min_interval
+        self.request_budget = request_budget
+        self.clock = clock
+        self.session_ends = clock() + session_minutes * 60
+
+        self.aggregates = LiveAggregates()
+        # Pick up where a restarted poller left off instead of rewriting every row
+        self.aggregates.apply(read_live_rows(db.conn))
+        self.requests = 0
+        self.last_poll_requests = 0
+        self.done: Set[int] = set()  # API game ids finished (and promoted) or cancelled
+        self._games: Dict[int, dict] = {}  # API game id -> transformed game plus db ids
+        self._player_ids: Dict[int, int] = {}
+
+    def _fetch(self, endpoint: str, params: dict) -> list:
+        self.requests += 1
+        return parse_response(self.fetch(endpoint, params))
+
+    def _resolve_game(self, api_game: dict) -> dict:
+        """transform_game() output plus db ids, creating the game if the schedule wasn't loaded"""
+        api_game_id = api_game["game"]["id"]
+        game = self._games.get(api_game_id)
+        if game is None:
+            game = transform_game(api_game)
+            with self.db.bulk_load():
+                teams = {
+                    side["id"]: self.db.get_or_create_team(side["name"], api_team_id=side["id"])
+                    for side in api_game["teams"].values()
+                }
+                venue_id = self.db.get_or_create_venue(game["venue_name"])
+                game_id = self.db.get_or_create_game(
+                    api_game_id=api_game_id,
+                    season_year=game["season_year"],
+                    round_number=game["round_number"],
+                    game_type=game["game_type"],
+                    game_date=game["game_date"],
+                    game_time=game["game_time"],
+                    venue_id=venue_id,
+                    home_team_id=teams[game["home_api_team_id"]],
+                    away_team_id=teams[game["away_api_team_id"]],
+                )
+            game.update(game_id=game_id, venue_id=venue_id, team_ids=teams)
+            self._games[api_game_id] = game
+        return game
+
+    def _player_id(self, api_player_id: int) -> Optional[int]:
+        player_id = self._player_ids.get(api_player_id)
+        if player_id is None:
+            # Misses aren't cached: rosters can be loaded mid-game
+            player_id = self.db.get_player_id(api_player_id)
+            if player_id is not None:
+                self._player_ids[api_player_id] = player_id
+        return player_id
+
+    def _rows(self, item: dict, game: dict) -> Tuple[List[dict], int]:
+        """live_player_game_stats rows for one statistics item, and lines skipped"""
+        rows, skipped = [], 0
+        for line in transform_game_statistics(item, game):
+            player_id = self._player_id(line["api_player_id"])
+            if player_id is None:
+                # Not loaded yet (no name in a stats line); the backfill adds them
+                skipped += 1
+                continue
+            rows.append({
+                "player_id": player_id,
+                "game_id": game["game_id"],
+                "team_id": game["team_ids"][line["api_team_id"]],
+                "opponent_team_id": game["team_ids"][line["api_opponent_team_id"]],
+                "venue_id": game["venue_id"],
+                "location": line["location"],
+                "game_time": line["game_time"],
+                "disposals": line["disposals"],
+                "goals": line["goals"],
+            })
+        return rows, skipped
+
+    def poll_once(self) -> dict:
+        """One round of requests; returns what happened"""
+        started = self.requests
+        statuses = {}
+        scheduled = []
+        for api_game in self._fetch("games", {"date": self.game_date}):
+            api_game_id = api_game["game"]["id"]
+            scheduled.append(api_game_id)
+            if api_game_id in self.done:
+                continue
+            status = (api_game.get("status") or {}).get("short")
+            statuses[api_game_id] = status
+            if status in CANCELLED_STATUSES:
+                self.done.add(api_game_id)
+            elif status not in NOT_STARTED_STATUSES:
+                self._resolve_game(api_game)
+
+        in_play = [g for g, status in statuses.items() if g in self._games and g not in self.done]
+        items = []
+        for start in range(0, len(in_play), STATISTICS_IDS_PER_CALL):
+            ids = "-".join(str(g) for g in in_play[start:start + STATISTICS_IDS_PER_CALL])
+            items.extend(self._fetch("games/statistics/players", {"ids": ids}))
+
+        changed, skipped = [], 0
+        for item in items:
+            game = self._games.get(item["game"]["id"])
+            if game is None:
+                continue
+            rows, missing = self._rows(item, game)
+            changed.extend(self.aggregates.apply(rows))
+            skipped += missing
+        written = self.db.upsert_live_stats(changed) if changed else 0
+
+        promoted = {}
+        for api_game_id in in_play:
+            if statuses[api_game_id] in FINISHED_STATUSES:
+                game_id = self._games[api_game_id]["game_id"]
+                promoted[game_id] = self.db.promote_live_game(game_id)
+                self.aggregates.drop_game(game_id)
+                self.done.add(api_game_id)
+
+        self.last_poll_requests = self.requests - started
+        return {
+            "games": len(statuses),
+            "in_play": len(in_play) - len(promoted),
+            "changed": written,
+            "skipped": skipped,
+            "promoted": promoted,
+            "requests": self.last_poll_requests,
+            "finished": all(g in self.done for g in scheduled),
+        }
+
+    def interval(self) -> float:
+        """Seconds until the next poll, or inf once the request budget is spent"""
+        per_poll = max(self.last_poll_requests, 1)
+        interval = max(self.min_interval, 60.0 * per_poll / self.requests_per_minute)
+        if self.request_budget is not None:
+            polls_left = (self.request_budget - self.requests) // per_poll
+            if polls_left <= 0:
+                return math.inf
+            interval = max(interval, (self.session_ends - self.clock()) / polls_left)
+        return interval
+
+    def run(self, sleep: Callable[[float], None] = time.sleep, max_polls: Optional[int] = None, log=print) -> int:
+        """Poll until every game is finished, the budget runs out or max_polls; returns polls made"""
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            try:
+                result = self.poll_once()
+            except RateLimited as exc:
+                log(f"429 from API; waiting {exc.retry_after:g}s")
+                sleep(exc.retry_after)
+                continue
+            polls += 1
+            log(
+                f"Poll {polls}: {result['in_play']} in play, {result['changed']} lines changed, "
+                f"{len(result['promoted'])} promoted, {result['requests']} requests ({self.requests} total)"
+            )
+            if result["finished"]:
+                break
+            wait = self.interval()
+            if math.isinf(wait):
+                log(f"Request budget of {self.request_budget} spent; stopping")
+                break
+            sleep(wait)
+        return polls
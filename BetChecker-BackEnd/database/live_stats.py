@@ -0,0 +1,58 @@
+"""
+Provisional stats for games in progress.
+
+The live poller (database/live_ingest.py) upserts each player's running
+totals here while a game is on; DatabaseManager.promote_live_game() moves
+them into player_game_stats when the game finishes and clears them. Nothing
+here feeds hit rates, so half-played games never skew the history.
+"""
+
+import sqlite3
+from typing import List
+
+LIVE_STATS_DDL = """
+CREATE TABLE IF NOT EXISTS live_player_game_stats (
+    player_id INTEGER NOT NULL,
+    game_id INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    opponent_team_id INTEGER NOT NULL,
+    venue_id INTEGER NOT NULL,
+    location TEXT NOT NULL,            -- 'Home' or 'Away'
+    game_time TEXT,                    -- 'Day', 'Twilight', or 'Night'
+    disposals INTEGER NOT NULL DEFAULT 0,
+    goals INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (player_id, game_id),
+    CHECK (location IN ('Home', 'Away')),
+    CHECK (game_time IS NULL OR game_time IN ('Day', 'Twilight', 'Night'))
+)
+"""
+
+LIVE_COLUMNS = (
+    "player_id", "game_id", "team_id", "opponent_team_id", "venue_id",
+    "location", "game_time", "disposals", "goals",
+)
+
+
+def ensure_live_stats(conn: sqlite3.Connection):
+    conn.execute(LIVE_STATS_DDL)
+
+
+def has_live_stats(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'live_player_game_stats'"
+    ).fetchone()
+    return row is not None
+
+
+def read_live_rows(conn: sqlite3.Connection, game_id=None) -> List[dict]:
+    """Provisional rows, for one game or all of them"""
+    sql = f"SELECT {', '.join(LIVE_COLUMNS)}, updated_at FROM live_player_game_stats"
+    params: tuple = ()
+    if game_id is not None:
+        sql += " WHERE game_id = ?"
+        params = (game_id,)
+    cur = conn.execute(sql + " ORDER BY game_id, team_id, player_id", params)
+    names = [d[0] for d in cur.description]
+    return [dict(zip(names, row)) for row in cur]
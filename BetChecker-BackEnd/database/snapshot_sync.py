@@ -0,0 +1,268 @@
+"""
+Distributing published snapshots to API nodes with a block-level diff.
+
+On publish, each snapshot file is cut into fixed-size blocks (one SQLite
+page by default) stored under blocks/ by their SHA-256, with a manifest
+listing the blocks in order. A weekly load rewrites a small share of
+pages, so consecutive snapshots share most blocks. Larger blocks mean
+fewer files but more unchanged pages refetched alongside each changed one.
+
+A node's SnapshotPuller reads the publisher's CURRENT pointer and, when it
+names a newer version, rebuilds that snapshot in its own directory: blocks
+the node's current file already has are copied locally and only the rest
+are fetched, each checked against its hash. The finished file must match
+the manifest's whole-file hash before the node's CURRENT pointer moves to
+it, so an API following that pointer (DB_POINTER) hot-swaps as it does on
+the publisher.
+
+Transports only read named files, so the publisher's directory can be
+shared directly or served by any static HTTP server.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Callable, Dict, Optional
+
+from database.snapshots import POINTER_NAME, SNAPSHOT_PREFIX, SnapshotManager, write_pointer
+
+BLOCKS_DIR = "blocks"
+
+
+class SnapshotSyncError(Exception):
+    pass
+
+
+def manifest_name(version: int) -> str:
+    return f"{SNAPSHOT_PREFIX}.v{version}.manifest.json"
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path: str, data: bytes):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".sync-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def page_size(path: str) -> int:
+    """Page size from the database header (1 means 65536)"""
+    with open(path, "rb") as f:
+        header = f.read(100)
+    size = int.from_bytes(header[16:18], "big")
+    return 65536 if size == 1 else size
+
+
+def write_manifest(db_dir: str, version: int, path: str, block_size: Optional[int] = None) -> dict:
+    """
+    Store the snapshot's new blocks and its manifest; call before the
+    pointer moves. block_size defaults to the database's page size.
+    """
+    block_size = block_size or page_size(path)
+    blocks_dir = os.path.join(db_dir, BLOCKS_DIR)
+    os.makedirs(blocks_dir, exist_ok=True)
+    whole = hashlib.sha256()
+    blocks = []
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(block_size)
+            if not data:
+                break
+            whole.update(data)
+            digest = _sha256(data)
+            block_path = os.path.join(blocks_dir, digest)
+            if not os.path.exists(block_path):
+                _write_atomic(block_path, data)
+            blocks.append(digest)
+    manifest = {
+        "version": version,
+        "file": os.path.basename(path),
+        "size": os.path.getsize(path),
+        "block_size": block_size,
+        "sha256": whole.hexdigest(),
+        "blocks": blocks,
+    }
+    _write_atomic(os.path.join(db_dir, manifest_name(version)), json.dumps(manifest).encode())
+    return manifest
+
+
+def prune_blocks(db_dir: str, versions) -> int:
+    """Remove manifests not in versions and blocks no remaining manifest uses; returns blocks removed"""
+    keep = set(versions)
+    referenced = set()
+    for name in os.listdir(db_dir):
+        if not name.endswith(".manifest.json"):
+            continue
+        with open(os.path.join(db_dir, name)) as f:
+            manifest = json.load(f)
+        if manifest["version"] in keep:
+            referenced.update(manifest["blocks"])
+        else:
+            os.unlink(os.path.join(db_dir, name))
+    blocks_dir = os.path.join(db_dir, BLOCKS_DIR)
+    removed = 0
+    for name in os.listdir(blocks_dir) if os.path.isdir(blocks_dir) else ():
+        if name not in referenced:
+            os.unlink(os.path.join(blocks_dir, name))
+            removed += 1
+    return removed
+
+
+class DirectoryTransport:
+    """The publisher's directory, local or on a shared mount"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def get(self, name: str) -> bytes:
+        with open(os.path.join(self.root, name), "rb") as f:
+            return f.read()
+
+
+class HttpTransport:
+    """The publisher's directory behind a static file server"""
+
+    def __init__(self, base_url: str, timeout: float = 30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def get(self, name: str) -> bytes:
+        try:
+            with urllib.request.urlopen(f"{self.base_url}/{name}", timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as exc:
+            if exc.code == 404:
+                raise FileNotFoundError(name) from exc
+            raise
+
+
+def transport_for(source: str):
+    """HttpTransport for http(s) URLs, DirectoryTransport otherwise"""
+    if source.startswith(("http://", "https://")):
+        return HttpTransport(source)
+    return DirectoryTransport(source)
+
+
+class SnapshotPuller:
+    """Keeps db_dir's CURRENT snapshot in step with the publisher's"""
+
+    def __init__(self, transport, db_dir: str, keep: int = 2):
+        self.transport = transport
+        self.manager = SnapshotManager(db_dir)
+        self.keep = keep
+
+    def remote_version(self) -> Optional[int]:
+        try:
+            pointer = json.loads(self.transport.get(POINTER_NAME))
+        except FileNotFoundError:
+            return None
+        return int(pointer["version"])
+
+    def _local_blocks(self, path: Optional[str], block_size: int) -> Dict[str, int]:
+        """hash -> offset of every block of the node's current file"""
+        offsets = {}
+        if path is None or not os.path.exists(path):
+            return offsets
+        with open(path, "rb") as f:
+            offset = 0
+            while True:
+                data = f.read(block_size)
+                if not data:
+                    break
+                offsets.setdefault(_sha256(data), offset)
+                offset += len(data)
+        return offsets
+
+    def pull(self) -> Optional[dict]:
+        """
+        Fetch and swap to the publisher's current version if it is newer.
+        Returns {'version', 'blocks', 'fetched', 'bytes_fetched'}, or None when up to date.
+        """
+        version = self.remote_version()
+        current = self.manager.current()
+        if version is None or (current is not None and current["version"] >= version):
+            return None
+        manifest = json.loads(self.transport.get(manifest_name(version)))
+        block_size = manifest["block_size"]
+        base = current["path"] if current else None
+        local = self._local_blocks(base, block_size)
+
+        target = self.manager.snapshot_path(version)
+        partial = target + ".partial"
+        fetched = bytes_fetched = 0
+        src = open(base, "rb") if local else None
+        try:
+            whole = hashlib.sha256()
+            with open(partial, "wb") as out:
+                for digest in manifest["blocks"]:
+                    if digest in local:
+                        src.seek(local[digest])
+                        data = src.read(block_size)
+                    else:
+                        data = self.transport.get(f"{BLOCKS_DIR}/{digest}")
+                        fetched += 1
+                        bytes_fetched += len(data)
+                    if _sha256(data) != digest:
+                        raise SnapshotSyncError(f"Block {digest} of version {version} failed its checksum")
+                    whole.update(data)
+                    out.write(data)
+                out.flush()
+                os.fsync(out.fileno())
+            if whole.hexdigest() != manifest["sha256"] or os.path.getsize(partial) != manifest["size"]:
+                raise SnapshotSyncError(f"Version {version} does not match its manifest")
+            os.replace(partial, target)
+        except BaseException:
+            if os.path.exists(partial):
+                os.unlink(partial)
+            raise
+        finally:
+            if src is not None:
+                src.close()
+
+        write_pointer(self.manager.pointer_path, version, os.path.basename(target))
+        self.manager.prune(keep=self.keep)
+        return {
+            "version": version,
+            "blocks": len(manifest["blocks"]),
+            "fetched": fetched,
+            "bytes_fetched": bytes_fetched,
+        }
+
+    def run(
+        self,
+        interval: float = 5.0,
+        sleep: Callable[[float], None] = time.sleep,
+        max_polls: Optional[int] = None,
+        log=print,
+    ) -> int:
+        """Check for a new version every interval seconds; returns polls made"""
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            polls += 1
+            try:
+                result = self.pull()
+            except (OSError, SnapshotSyncError, ValueError) as exc:
+                log(f"Pull failed, keeping the current snapshot: {exc}")
+                result = None
+            if result is not None:
+                log(
+                    f"Now on v{result['version']}: fetched {result['fetched']} of {result['blocks']} blocks "
+                    f"({result['bytes_fetched']} bytes)"
+                )
+            sleep(interval)
+        return polls
+
@@ -0,0 +1,197 @@
+"""
+Blue/green database snapshots.
+
+The ETL never writes into the file the API is reading. Instead it:
+1. begin()    - copies the current snapshot to a new versioned file
+2. loads into that file with DatabaseManager
+3. publish()  - runs the ValidationTester checks and, if they pass,
+                atomically repoints the CURRENT pointer file at it
+
+The API resolves its database through SnapshotPointer on every new
+connection. Requests already running keep their connection to the old
+file and drain naturally; nothing is locked or restarted.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from typing import Iterable, List, Optional
+
+from database.validation import ValidationTester
+
+POINTER_NAME = "CURRENT"
+SNAPSHOT_PREFIX = "afl_stats"
+_SNAPSHOT_RE = re.compile(rf"^{SNAPSHOT_PREFIX}\.v(\d+)\.db$")
+
+
+class SnapshotValidationError(Exception):
+    def __init__(self, path: str, failures: List[dict]):
+        self.path = path
+        self.failures = failures
+        names = ", ".join(f["test"] for f in failures)
+        super().__init__(f"Snapshot {path} failed validation: {names}")
+
+
+def read_pointer(pointer_path: str) -> Optional[dict]:
+    """{'version': int, 'path': absolute db path} or None if nothing is published"""
+    try:
+        with open(pointer_path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    path = data["path"]
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.abspath(pointer_path)), path)
+    return {"version": int(data["version"]), "path": path}
+
+
+def write_pointer(pointer_path: str, version: int, db_filename: str):
+    """Atomically replace the pointer file (readers see old or new, never partial)"""
+    directory = os.path.dirname(os.path.abspath(pointer_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".pointer-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": version, "path": db_filename}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, pointer_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class SnapshotPointer:
+    """Hot-reloadable view of the pointer file; re-reads only when it changes"""
+
+    def __init__(self, pointer_path: str):
+        self.pointer_path = pointer_path
+        self._lock = threading.Lock()
+        self._stamp: Optional[tuple] = None
+        self._current: Optional[dict] = None
+
+    def current(self) -> Optional[dict]:
+        try:
+            st = os.stat(self.pointer_path)
+        except FileNotFoundError:
+            return None
+        # os.replace gives the pointer a new inode, so this catches swaps
+        # even within one mtime tick
+        stamp = (st.st_ino, st.st_mtime_ns)
+        with self._lock:
+            if stamp != self._stamp:
+                self._current = read_pointer(self.pointer_path)
+                self._stamp = stamp
+            return self._current
+
+    def resolve(self) -> Optional[str]:
+        current = self.current()
+        return current["path"] if current else None
+
+    @property
+    def version(self) -> Optional[int]:
+        current = self.current()
+        return current["version"] if current else None
+
+
+class SnapshotManager:
+    def __init__(self, db_dir: str, distribute: bool = False, block_size: Optional[int] = None):
+        self.db_dir = os.path.abspath(db_dir)
+        self.pointer_path = os.path.join(self.db_dir, POINTER_NAME)
+        # With distribute, publish() also writes the blocks and manifest API
+        # nodes pull from (see database/snapshot_sync.py); block_size
+        # defaults to the page size
+        self.distribute = distribute
+        self.block_size = block_size
+
+    def current(self) -> Optional[dict]:
+        return read_pointer(self.pointer_path)
+
+    def versions(self) -> List[int]:
+        found = (_SNAPSHOT_RE.match(name) for name in os.listdir(self.db_dir))
+        return sorted(int(m.group(1)) for m in found if m)
+
+    def snapshot_path(self, version: int) -> str:
+        return os.path.join(self.db_dir, f"{SNAPSHOT_PREFIX}.v{version}.db")
+
+    def begin(self, base_path: Optional[str] = None) -> str:
+        """
+        Create the next snapshot file as a copy of the published one (or of
+        base_path for the first snapshot) and return its path for the ETL.
+        """
+        current = self.current()
+        source = base_path or (current["path"] if current else None)
+        version = max(self.versions(), default=0) + 1
+        target = self.snapshot_path(version)
+
+        dest = sqlite3.connect(target)
+        try:
+            if source:
+                # Online backup: consistent copy without blocking API readers
+                src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+                try:
+                    src.backup(dest)
+                finally:
+                    src.close()
+        finally:
+            dest.close()
+        return target
+
+    def validate(self, path: str, allow_failures: Iterable[str] = ()) -> List[dict]:
+        """Failed ValidationTester results, ignoring test names in allow_failures"""
+        tester = ValidationTester(path)
+        try:
+            tester.run_all_tests()
+            allowed = set(allow_failures)
+            return [r for r in tester.results if not r.get("passed", False) and r["test"] not in allowed]
+        finally:
+            tester.close()
+
+    def publish(self, path: str, allow_failures: Iterable[str] = ()) -> int:
+        """Validate the snapshot and make it the one new API connections use"""
+        match = _SNAPSHOT_RE.match(os.path.basename(path))
+        if not match or os.path.dirname(os.path.abspath(path)) != self.db_dir:
+            raise ValueError(f"Not a snapshot in {self.db_dir}: {path}")
+
+        # Fold any WAL into the file so the snapshot is self-contained
+        conn = sqlite3.connect(path)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+
+        failures = self.validate(path, allow_failures)
+        if failures:
+            raise SnapshotValidationError(path, failures)
+
+        version = int(match.group(1))
+        if self.distribute:
+            from database.snapshot_sync import write_manifest
+            # Before the pointer moves, so a node never sees a version it can't fetch
+            write_manifest(self.db_dir, version, path, self.block_size)
+        write_pointer(self.pointer_path, version, os.path.basename(path))
+        return version
+
+    def prune(self, keep: int = 2) -> List[str]:
+        """
+        Delete all but the newest `keep` snapshots, never the published one.
+        On POSIX, readers still draining from a deleted file keep working.
+        """
+        current = self.current()
+        live = current["version"] if current else None
+        removed = []
+        for version in self.versions()[:-keep] if keep else self.versions():
+            if version == live:
+                continue
+            base = self.snapshot_path(version)
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(base + suffix):
+                    os.unlink(base + suffix)
+            removed.append(base)
+        if self.distribute:
+            from database.snapshot_sync import prune_blocks
+            prune_blocks(self.db_dir, self.versions())
+        return removed
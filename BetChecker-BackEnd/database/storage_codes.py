@@ -0,0 +1,110 @@
+"""
+Integer day ordinals and categorical codes next to the text columns.
+
+games.game_day is days since 1970-01-01 (NumPy's datetime64[D] ordinal) and
+games.game_type_code, player_game_stats.location_code and game_time_code are
+each text value's position in CATEGORY_CODES; the *_codes lookup tables
+decode them. They are VIRTUAL generated columns, so they can never disagree
+with the text the ETL writes, and their indexes hold small integers instead
+of strings. Range filters, rest-day maths and NumPy loads use them where a
+database has them.
+"""
+
+import sqlite3
+from typing import Dict, Tuple
+
+# Text columns held as small codes: position in the tuple (NULL stays NULL)
+CATEGORY_CODES: Dict[str, Tuple[str, ...]] = {
+    "location": ("Home", "Away"),
+    "game_type": ("Pre-Season", "Regular Season", "Finals"),
+    "game_time": ("Day", "Twilight", "Night"),
+}
+
+# JULIANDAY of 1970-01-01
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+
+def _case(column: str) -> str:
+    whens = " ".join(f"WHEN '{value}' THEN {code}" for code, value in enumerate(CATEGORY_CODES[column]))
+    return f"CASE {column} {whens} END"
+
+
+# (table, column, expression)
+GENERATED_COLUMNS = (
+    ("games", "game_day", f"CAST(JULIANDAY(game_date) - {UNIX_EPOCH_JULIAN_DAY} AS INTEGER)"),
+    ("games", "game_type_code", _case("game_type")),
+    ("player_game_stats", "location_code", _case("location")),
+    ("player_game_stats", "game_time_code", _case("game_time")),
+)
+
+CODE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_games_day ON games(game_day)",
+    "CREATE INDEX IF NOT EXISTS idx_games_type_code ON games(game_type_code)",
+    "CREATE INDEX IF NOT EXISTS idx_pgs_location_code ON player_game_stats(location_code)",
+    "CREATE INDEX IF NOT EXISTS idx_pgs_game_time_code ON player_game_stats(game_time_code)",
+)
+# Text indexes the code indexes replace
+TEXT_INDEXES = ("idx_games_type", "idx_pgs_location", "idx_pgs_game_time")
+
+COMPLETE_GAME_STATS_VIEW = """
+CREATE VIEW vw_complete_game_stats AS
+SELECT
+    pgs.stat_id,
+    pgs.player_id,
+    p.player_name,
+    p.first_name,
+    p.last_name,
+    pgs.game_id,
+    g.game_date,
+    g.game_day,
+    g.season_year,
+    g.round_number,
+    game_type.name AS game_type,
+    g.game_type_code,
+    pgs.team_id,
+    t.team_name,
+    pgs.opponent_team_id,
+    opponent.team_name AS opponent_name,
+    pgs.venue_id,
+    v.venue_name,
+    location.name AS location,
+    pgs.location_code,
+    game_time.name AS game_time,
+    pgs.game_time_code,
+    -- Player stats
+    pgs.disposals,
+    pgs.goals,
+    pgs.days_since_last_game
+FROM player_game_stats pgs
+JOIN players p ON pgs.player_id = p.player_id
+JOIN games g ON pgs.game_id = g.game_id
+JOIN teams t ON pgs.team_id = t.team_id
+JOIN teams opponent ON pgs.opponent_team_id = opponent.team_id
+JOIN venues v ON pgs.venue_id = v.venue_id
+LEFT JOIN game_type_codes game_type ON g.game_type_code = game_type.code
+LEFT JOIN location_codes location ON pgs.location_code = location.code
+LEFT JOIN game_time_codes game_time ON pgs.game_time_code = game_time.code
+"""
+
+
+def has_storage_codes(conn: sqlite3.Connection) -> bool:
+    # table_xinfo: generated columns are hidden from table_info
+    return any(row[1] == "game_day" for row in conn.execute("PRAGMA table_xinfo(games)"))
+
+
+def ensure_storage_codes(conn: sqlite3.Connection):
+    """Add the lookup tables, generated columns, indexes and decoding view if missing"""
+    for column, values in CATEGORY_CODES.items():
+        table = f"{column}_codes"
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (code INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+        conn.executemany(f"INSERT OR IGNORE INTO {table} (code, name) VALUES (?, ?)", list(enumerate(values)))
+    if has_storage_codes(conn):
+        return
+    for table, column, expression in GENERATED_COLUMNS:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER GENERATED ALWAYS AS ({expression}) VIRTUAL")
+    for index in TEXT_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+    for statement in CODE_INDEXES:
+        conn.execute(statement)
+    conn.execute("DROP VIEW IF EXISTS vw_complete_game_stats")
+    conn.execute(COMPLETE_GAME_STATS_VIEW)
@@ -0,0 +1,110 @@
+"""
+Per-team per-game totals.
+
+team_game_stats holds each team's disposals and goals for a game, and what
+it conceded (the opponent's totals), so team-total markets don't sum
+player_game_stats over the whole history per query. DatabaseManager
+rebuilds the rows for the games a load touched when the load commits.
+"""
+
+import json
+import sqlite3
+from typing import Iterable, Optional
+
+TEAM_GAME_STATS_DDL = """
+CREATE TABLE IF NOT EXISTS team_game_stats (
+    game_id INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    opponent_team_id INTEGER NOT NULL,
+    venue_id INTEGER NOT NULL,
+    location TEXT NOT NULL,            -- 'Home' or 'Away'
+    game_time TEXT,                    -- 'Day', 'Twilight', or 'Night'
+    players INTEGER NOT NULL,          -- Player rows summed
+    disposals INTEGER,                 -- NULL when no player row recorded the stat
+    goals INTEGER,
+    conceded_disposals INTEGER,        -- Opponent's totals; NULL until their rows load
+    conceded_goals INTEGER,
+
+    PRIMARY KEY (game_id, team_id),
+    CHECK (location IN ('Home', 'Away'))
+)
+"""
+TEAM_GAME_STATS_INDEX = "CREATE INDEX IF NOT EXISTS idx_tgs_team ON team_game_stats(team_id)"
+
+# Totals for the games in {scope}, with each side's concessions from the other side's totals
+_TEAM_TOTALS_SQL = """
+    WITH totals AS (
+        SELECT
+            game_id,
+            team_id,
+            MIN(opponent_team_id) AS opponent_team_id,
+            MIN(venue_id) AS venue_id,
+            MIN(location) AS location,
+            MIN(game_time) AS game_time,
+            COUNT(*) AS players,
+            SUM(disposals) AS disposals,
+            SUM(goals) AS goals
+        FROM player_game_stats
+        WHERE game_id IN ({scope})
+        GROUP BY game_id, team_id
+    )
+    SELECT t.*, o.disposals AS conceded_disposals, o.goals AS conceded_goals
+    FROM totals t
+    LEFT JOIN totals o ON o.game_id = t.game_id AND o.team_id = t.opponent_team_id
+"""
+
+
+
+def team_totals_sql(scope: str) -> str:
+    """Totals for the games the `scope` subquery selects"""
+    return _TEAM_TOTALS_SQL.format(scope=scope)
+
+
+# The same rows computed from player_game_stats, for databases without the table
+TEAM_TOTALS_FALLBACK_SQL = team_totals_sql("SELECT game_id FROM games")
+
+_COLUMNS = (
+    "game_id, team_id, opponent_team_id, venue_id, location, game_time, "
+    "players, disposals, goals, conceded_disposals, conceded_goals"
+)
+
+
+def has_team_game_stats(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'team_game_stats'"
+    ).fetchone()
+    return row is not None
+
+
+def _requires_totals(conn: sqlite3.Connection) -> bool:
+    """Tables created before totals became nullable reject all-NULL team-games"""
+    columns = {row[1]: row[3] for row in conn.execute("PRAGMA table_info(team_game_stats)")}
+    return bool(columns.get("disposals") or columns.get("goals"))
+
+
+def ensure_team_game_stats(conn: sqlite3.Connection):
+    """Create the table if it is missing, filling it from any stats already loaded"""
+    created = not has_team_game_stats(conn)
+    if not created and _requires_totals(conn):
+        # Derived data, so rebuilding is cheaper than a column-by-column migration
+        conn.execute("DROP TABLE team_game_stats")
+        created = True
+    conn.execute(TEAM_GAME_STATS_DDL)
+    conn.execute(TEAM_GAME_STATS_INDEX)
+    if created:
+        rebuild_team_game_stats(conn)
+
+
+def rebuild_team_game_stats(conn: sqlite3.Connection, game_ids: Optional[Iterable[int]] = None):
+    """Recompute the rows for game_ids (every game when None)"""
+    if game_ids is None:
+        scope = "SELECT DISTINCT game_id FROM player_game_stats"
+        params = {}
+    else:
+        scope = "SELECT value FROM json_each(:ids)"
+        params = {"ids": json.dumps(sorted(set(game_ids)))}
+    conn.execute(f"DELETE FROM team_game_stats WHERE game_id IN ({scope})", params)
+    conn.execute(
+        f"INSERT INTO team_game_stats ({_COLUMNS}) SELECT {_COLUMNS} FROM ({team_totals_sql(scope)})",
+        params,
+    )
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the API-Sports AFL API (https://v1.afl.api-sports.io).
+
+Serves /teams, /players, /games and /games/statistics/players in the shapes
+documented in API_ACTUAL_STRUCTURE.md and GAME_STATISTICS_ENDPOINT.md, from
+either recorded responses or a deterministic synthetic league. It can add
+latency and answer 429s, so extraction throughput and backoff can be load
+tested without spending API quota.
+
+Recorded fixtures are a directory of JSON files, each one saved response
+envelope ({"get": ..., "parameters": ..., "response": [...]}).
+
+Usage:
+    python scripts/api_sports_fixture_server.py --synthetic 2023 --rounds 23 --port 8081 \\
+        --latency-ms 150 --jitter-ms 50 --error-rate 0.02 --rate-limit 300
+    python scripts/api_sports_fixture_server.py --fixtures path/to/recorded --port 8081
+
+Point scripts at it with API_SPORTS_BASE_URL=http://localhost:8081.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+TEAM_NAMES = [
+    "Adelaide Crows", "Brisbane Lions", "Carlton Blues", "Collingwood Magpies", "Essendon Bombers",
+    "Fremantle Dockers", "Geelong Cats", "Gold Coast Suns", "GWS Giants", "Hawthorn Hawks",
+    "Melbourne Demons", "North Melbourne Kangaroos", "Port Adelaide Power", "Richmond Tigers",
+    "St Kilda Saints", "Sydney Swans", "West Coast Eagles", "Western Bulldogs",
+]
+VENUES = [
+    "Melbourne Cricket Ground", "Marvel Stadium", "Adelaide Oval", "Optus Stadium", "The Gabba",
+    "SCG", "GMHBA Stadium", "People First Stadium", "Engie Stadium",
+]
+PLAYERS_PER_TEAM = 22
+
+
+class FixtureDataset:
+    """Everything the server can answer, indexed the way the endpoints filter it"""
+
+    def __init__(self):
+        self.teams: List[dict] = []
+        # (team_id, season) -> player list, plus every player by id
+        self.players: Dict[Tuple[int, int], List[dict]] = {}
+        self.players_by_id: Dict[int, dict] = {}
+        self.games: List[dict] = []
+        # game id -> one /games/statistics/players response item
+        self.statistics: Dict[int, dict] = {}
+
+    def add_players(self, players: Iterable[dict], team: Optional[int] = None, season: Optional[int] = None):
+        players = list(players)
+        for player in players:
+            self.players_by_id[player["id"]] = player
+        if team is not None and season is not None:
+            self.players.setdefault((team, season), []).extend(players)
+
+    @classmethod
+    def synthetic(cls, seasons: List[int], rounds: int, seed: int = 0) -> "FixtureDataset":
+        """A deterministic league: 18 teams of 22, nine games a week"""
+        rng = random.Random(seed)
+        dataset = cls()
+        dataset.teams = [
+            {"id": i + 1, "name": name, "logo": f"https://media.api-sports.io/afl/teams/{i + 1}.png"}
+            for i, name in enumerate(TEAM_NAMES)
+        ]
+        team_count = len(dataset.teams)
+        for season in seasons:
+            for team in dataset.teams:
+                roster = [
+                    {"id": team["id"] * 1000 + p, "name": f"{team['name'].split()[0]} Player {p}"}
+                    for p in range(PLAYERS_PER_TEAM)
+                ]
+                dataset.add_players(roster, team["id"], season)
+
+            game_id = season * 1000
+            for week in range(1, rounds + 1):
+                kickoff = datetime(season, 3, 14, 19, 20, tzinfo=timezone.utc) + timedelta(days=7 * (week - 1))
+                for g in range(team_count // 2):
+                    game_id += 1
+                    home = dataset.teams[(g + week) % team_count]
+                    away = dataset.teams[(team_count - 1 - g + week) % team_count]
+                    dataset.games.append(_game(game_id, season, week, kickoff, VENUES[g % len(VENUES)], home, away))
+                    dataset.statistics[game_id] = {
+                        "game": {"id": game_id},
+                        "teams": [
+                            {
+                                "team": {"id": team["id"]},
+                                "players": [_player_line(player, rng) for player in dataset.players[(team["id"], season)]],
+                            }
+                            for team in (home, away)
+                        ],
+                    }
+        return dataset
+
+    @classmethod
+    def from_directory(cls, directory: Path) -> "FixtureDataset":
+        """Load recorded response envelopes"""
+        dataset = cls()
+        teams: Dict[int, dict] = {}
+        games: Dict[int, dict] = {}
+        for path in sorted(Path(directory).glob("*.json")):
+            envelope = json.loads(path.read_text())
+            endpoint = envelope.get("get")
+            params = envelope.get("parameters") or {}
+            response = envelope.get("response") or []
+            if endpoint == "teams":
+                teams.update((t["id"], t) for t in response)
+            elif endpoint == "players":
+                team, season = params.get("team"), params.get("season")
+                dataset.add_players(
+                    response,
+                    int(team) if team is not None else None,
+                    int(season) if season is not None else None,
+                )
+            elif endpoint == "games":
+                games.update((g["game"]["id"], g) for g in response)
+            elif endpoint == "games/statistics/players":
+                dataset.statistics.update((item["game"]["id"], item) for item in response)
+        dataset.teams = list(teams.values())
+        dataset.games = sorted(games.values(), key=lambda g: (g["date"], g["game"]["id"]))
+        return dataset
+
+
+def _game(game_id: int, season: int, week: int, kickoff: datetime, venue: str, home: dict, away: dict) -> dict:
+    def side(team):
+        return {"id": team["id"], "name": team["name"], "logo": team["logo"]}
+
+    def score(goals, behinds):
+        return {"score": goals * 6 + behinds, "goals": goals, "behinds": behinds}
+
+    return {
+        "game": {"id": game_id},
+        "league": {"id": 1, "season": season},
+        "date": kickoff.isoformat(),
+        "time": kickoff.strftime("%H:%M"),
+        "timestamp": str(int(kickoff.timestamp())),
+        "timezone": "UTC",
+        "round": "Regular Season",
+        "week": week,
+        "venue": venue,
+        "attendance": None,
+        "status": {"long": "Finished", "short": "FT"},
+        "teams": {"home": side(home), "away": side(away)},
+        "scores": {"home": score(12, 10), "away": score(10, 8)},
+    }
+
+
+def _player_line(player: dict, rng: random.Random) -> dict:
+    kicks, handballs = rng.randint(2, 20), rng.randint(1, 15)
+    return {
+        "player": {"id": player["id"], "number": player["id"] % 100},
+        "goals": {"total": rng.choice([0, 0, 0, 1, 1, 2, 3]), "assists": rng.randint(0, 2)},
+        "behinds": rng.randint(0, 2),
+        "disposals": kicks + handballs,
+        "kicks": kicks,
+        "handballs": handballs,
+        "marks": rng.randint(0, 10),
+        "tackles": rng.randint(0, 8),
+        "hitouts": 0,
+        "clearances": rng.randint(0, 6),
+        "free_kicks": {"for": rng.randint(0, 2), "against": rng.randint(0, 2)},
+    }
+
+
+class FaultInjector:
+    """Latency, random 429s and a per-minute quota, all seeded"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0.0,
+        rate_limit_per_minute: Optional[int] = None,
+        seed: int = 0,
+        clock=time.monotonic,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_per_minute = rate_limit_per_minute
+        self.clock = clock
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window: deque = deque()
+        self.requests = 0
+        self.throttled = 0
+
+    def delay(self) -> float:
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(self.latency_ms + jitter, 0.0) / 1000
+
+    def admit(self) -> Tuple[bool, Optional[int]]:
+        """(allowed, remaining quota); a refusal counts as throttled"""
+        with self._lock:
+            self.requests += 1
+            now = self.clock()
+            remaining = None
+            if self.rate_limit_per_minute is not None:
+                while self._window and now - self._window[0] >= 60:
+                    self._window.popleft()
+                if len(self._window) >= self.rate_limit_per_minute:
+                    self.throttled += 1
+                    return False, 0
+                self._window.append(now)
+                remaining = self.rate_limit_per_minute - len(self._window)
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.throttled += 1
+                return False, remaining
+            return True, remaining
+
+
+def _envelope(endpoint: str, params: dict, response: list, errors=None) -> dict:
+    return {"get": endpoint, "parameters": params, "errors": errors or [], "results": len(response), "response": response}
+
+
+def create_app(dataset: FixtureDataset, faults: Optional[FaultInjector] = None) -> FastAPI:
+    faults = faults or FaultInjector()
+    app = FastAPI(title="API-Sports AFL fixture server")
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        if request.url.path == "/_stats":
+            return await call_next(request)
+        delay = faults.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        allowed, remaining = faults.admit()
+        headers = {}
+        if remaining is not None:
+            headers["x-ratelimit-requests-limit"] = str(faults.rate_limit_per_minute)
+            headers["x-ratelimit-requests-remaining"] = str(remaining)
+        if not allowed:
+            return JSONResponse(
+                status_code=429,
+                content={"message": "Too many requests. You have exceeded the rate limit per minute for your plan."},
+                headers={**headers, "Retry-After": "1"},
+            )
+        if not (request.headers.get("x-rapidapi-key") or request.headers.get("x-apisports-key")):
+            endpoint = request.url.path.lstrip("/")
+            body = _envelope(endpoint, dict(request.query_params), [], {"token": "Error/Missing application key."})
+            return JSONResponse(content=body, headers=headers)
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
+
+    @app.get("/_stats")
+    def stats():
+        return {"requests": faults.requests, "throttled": faults.throttled}
+
+    @app.get("/teams")
+    def teams(request: Request):
+        params = dict(request.query_params)
+        found = dataset.teams
+        if "id" in params:
+            found = [t for t in found if str(t["id"]) == params["id"]]
+        if "name" in params:
+            found = [t for t in found if t["name"] == params["name"]]
+        return _envelope("teams", params, found)
+
+    @app.get("/players")
+    def players(request: Request):
+        params = dict(request.query_params)
+        if not params:
+            return _envelope("players", params, [], {"required": "At least one parameter is required."})
+        if "team" in params and "season" in params:
+            found = dataset.players.get((int(params["team"]), int(params["season"])), [])
+        elif "team" in params or "season" in params:
+            found = [
+                p for (team, season), roster in dataset.players.items() for p in roster
+                if str(team) == params.get("team", str(team)) and str(season) == params.get("season", str(season))
+            ]
+        else:
+            found = list(dataset.players_by_id.values())
+        if "id" in params:
+            found = [p for p in found if str(p["id"]) == params["id"]]
+        if "name" in params:
+            found = [p for p in found if p["name"] == params["name"]]
+        if "search" in params:
+            found = [p for p in found if params["search"].lower() in p["name"].lower()]
+        return _envelope("players", params, found)
+
+    @app.get("/games")
+    def games(request: Request):
+        params = dict(request.query_params)
+        if not {"id", "date", "season"} & set(params):
+            return _envelope("games", params, [], {"required": "At least one parameter is required."})
+        found = dataset.games
+        if "id" in params:
+            found = [g for g in found if str(g["game"]["id"]) == params["id"]]
+        if "season" in params:
+            found = [g for g in found if str(g["league"]["season"]) == params["season"]]
+        if "league" in params:
+            found = [g for g in found if str(g["league"]["id"]) == params["league"]]
+        if "date" in params:
+            found = [g for g in found if g["date"][:10] == params["date"]]
+        if "team" in params:
+            found = [g for g in found if params["team"] in (str(g["teams"]["home"]["id"]), str(g["teams"]["away"]["id"]))]
+        return _envelope("games", params, found)
+
+    @app.get("/games/statistics/players")
+    def game_player_statistics(request: Request):
+        params = dict(request.query_params)
+        if "id" in params:
+            ids = [params["id"]]
+        elif "ids" in params:
+            ids = params["ids"].split("-")
+            if len(ids) > 10:
+                return _envelope("games/statistics/players", params, [], {"ids": "Maximum of 10 ids."})
+        elif "date" in params:
+            ids = [str(g["game"]["id"]) for g in dataset.games if g["date"][:10] == params["date"]]
+        else:
+            return _envelope("games/statistics/players", params, [], {"required": "At least one parameter is required."})
+        found = [dataset.statistics[int(i)] for i in ids if i.isdigit() and int(i) in dataset.statistics]
+        return _envelope("games/statistics/players", params, found)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--fixtures", type=Path, help="Directory of recorded response envelopes")
+    source.add_argument("--synthetic", type=int, nargs="+", metavar="SEASON", help="Generate these seasons")
+    parser.add_argument("--rounds", type=int, default=23, help="Rounds per synthetic season")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Requests per minute before 429s")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    if args.fixtures:
+        dataset = FixtureDataset.from_directory(args.fixtures)
+    else:
+        dataset = FixtureDataset.synthetic(args.synthetic, args.rounds, args.seed)
+    print(
+        f"Serving {len(dataset.teams)} teams, {len(dataset.players_by_id)} players, "
+        f"{len(dataset.games)} games ({len(dataset.statistics)} with player statistics)",
+        file=sys.stderr,
+    )
+    faults = FaultInjector(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit, args.seed)
+    uvicorn.run(create_app(dataset, faults), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+End-to-end ETL throughput benchmark: extract -> transform -> load into a
+fresh database, at several history sizes, against the offline fixture server.
+
+For each size it records per-stage wall time and rows/sec, SQL statements and
+commits, WAL frames and fsyncs, and the process's peak RSS, then projects
+how long a full reload since 2006 takes at the measured rate. Extraction goes
+through an in-process client of scripts/api_sports_fixture_server.py unless
+--base-url points at a running server (add --latency-ms there to include the
+network). Optional cProfile/pyinstrument profiles are written per size.
+
+SQLite's fsyncs happen inside the C library, so they are derived from the
+journal settings: in WAL mode with synchronous=NORMAL a commit doesn't sync;
+each checkpoint that copies frames syncs the WAL and then the database file.
+With synchronous=FULL every commit adds one.
+
+Usage:
+    python scripts/benchmark_etl.py [--sizes 1 5 20] [--rounds 23] [--output results.json]
+        [--profile cprofile|pyinstrument] [--profile-dir profiles]
+        [--budget-minutes 60] [--baseline previous.json --max-regression 0.2]
+    python scripts/benchmark_etl.py --fixtures path/to/recorded --sizes 1
+"""
+
+import argparse
+import json
+import os
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from database.api_sports_etl import extract_season, load_season, transform_season  # noqa: E402
+from database.db_manager_api import DatabaseManager  # noqa: E402
+
+SCHEMA_DIR = BACKEND_DIR / "BetChecker-PlayerDatabase"
+FIRST_SEASON = 2006
+DEFAULT_SIZES = [1, 5, 20]
+STAGES = ("extract", "transform", "load", "finalize")
+
+
+def create_database(path: Path) -> Path:
+    """Empty database from schema.sql plus the API ID migration"""
+    conn = sqlite3.connect(path)
+    conn.executescript((SCHEMA_DIR / "schema.sql").read_text())
+    conn.executescript((SCHEMA_DIR / "add_api_ids_migration.sql").read_text())
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(teams)")}
+    if "api_team_id" not in columns:
+        conn.execute("ALTER TABLE teams ADD COLUMN api_team_id INTEGER")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def http_fetcher(base_url: str, api_key: str):
+    def fetch(endpoint: str, params: dict) -> dict:
+        url = f"{base_url.rstrip('/')}/{endpoint}"
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        request = urllib.request.Request(url, headers={"x-apisports-key": api_key})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.load(response)
+    return fetch
+
+
+def in_process_fetcher(dataset):
+    from fastapi.testclient import TestClient
+    from scripts.api_sports_fixture_server import create_app
+
+    client = TestClient(create_app(dataset))
+
+    def fetch(endpoint: str, params: dict) -> dict:
+        response = client.get(f"/{endpoint}", params=params, headers={"x-apisports-key": "benchmark"})
+        response.raise_for_status()
+        return response.json()
+    return fetch
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Profiler:
+    """cProfile or pyinstrument around the whole run, written to one file per size"""
+
+    def __init__(self, kind: Optional[str], directory: Path):
+        self.kind = kind
+        self.directory = directory
+        if kind == "pyinstrument":
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                raise SystemExit("pyinstrument is not installed (pip install pyinstrument)")
+
+    @contextmanager
+    def run(self, label: str):
+        if self.kind is None:
+            yield None
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.kind == "cprofile":
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield None
+            finally:
+                profiler.disable()
+                path = self.directory / f"etl_{label}.prof"
+                profiler.dump_stats(path)
+                print(f"  profile: {path} (view with: python -m pstats {path})")
+        else:
+            from pyinstrument import Profiler as Pyinstrument
+
+            profiler = Pyinstrument()
+            profiler.start()
+            try:
+                yield None
+            finally:
+                profiler.stop()
+                path = self.directory / f"etl_{label}.html"
+                path.write_text(profiler.output_html())
+                print(f"  profile: {path}")
+
+
+def benchmark(fetch, seasons: List[int], workdir: Path, profiler: Profiler) -> dict:
+    """Load `seasons` into a fresh database and report what it cost"""
+    db_path = create_database(workdir / f"etl_{len(seasons)}.db")
+    db = DatabaseManager(str(db_path))
+    statements = {"total": 0, "commits": 0}
+    requests = 0
+
+    def counted_fetch(endpoint: str, params: dict) -> dict:
+        nonlocal requests
+        requests += 1
+        return fetch(endpoint, params)
+
+    def trace(sql: str):
+        statements["total"] += 1
+        if sql.lstrip().upper().startswith("COMMIT"):
+            statements["commits"] += 1
+
+    db.conn.set_trace_callback(trace)
+    synchronous = db.conn.execute("PRAGMA synchronous").fetchone()[0]
+
+    seconds = dict.fromkeys(STAGES, 0.0)
+    counts: Dict[str, int] = {}
+    teams = None
+    started = time.perf_counter()
+    with profiler.run(f"{len(seasons)}seasons"):
+        for season in seasons:
+            t0 = time.perf_counter()
+            extracted = extract_season(counted_fetch, season, teams=teams)
+            t1 = time.perf_counter()
+            transformed = transform_season(extracted)
+            t2 = time.perf_counter()
+            loaded = load_season(db, transformed)
+            t3 = time.perf_counter()
+            seconds["extract"] += t1 - t0
+            seconds["transform"] += t2 - t1
+            seconds["load"] += t3 - t2
+            teams = extracted["teams"]
+            for key, value in loaded.items():
+                counts[key] = counts.get(key, 0) + value
+
+        t0 = time.perf_counter()
+        db.update_days_since_last_game()
+        wal = db.checkpoint("PASSIVE")
+        db.checkpoint("TRUNCATE")
+        seconds["finalize"] = time.perf_counter() - t0
+    total_seconds = time.perf_counter() - started
+    db.conn.set_trace_callback(None)
+    db.close()
+
+    # synchronous: 1 = NORMAL, 2 = FULL, 3 = EXTRA; autocheckpoint is off, so
+    # the PASSIVE checkpoint above did all the copying (TRUNCATE found nothing left)
+    checkpoints = 1 if wal["checkpointed_frames"] else 0
+    fsyncs = 2 * checkpoints + (statements["commits"] if synchronous >= 2 else 0)
+    rows = counts.get("stats", 0)
+    return {
+        "seasons": len(seasons),
+        "first_season": seasons[0],
+        "rows": rows,
+        "counts": counts,
+        "requests": requests,
+        "seconds": {stage: round(value, 4) for stage, value in seconds.items()},
+        "total_seconds": round(total_seconds, 4),
+        "rows_per_second": {
+            stage: round(rows / value, 1) if value else None for stage, value in seconds.items()
+        },
+        "end_to_end_rows_per_second": round(rows / total_seconds, 1) if total_seconds else None,
+        "statements": statements["total"],
+        "commits": statements["commits"],
+        "wal_frames": wal["log_frames"],
+        "fsyncs": fsyncs,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "database_mb": round(os.path.getsize(db_path) / (1024 * 1024), 2),
+    }
+
+
+def project_full_reload(result: dict, through_season: int) -> float:
+    """Seconds to reload FIRST_SEASON..through_season at this run's per-season rate"""
+    return result["total_seconds"] / result["seasons"] * (through_season - FIRST_SEASON + 1)
+
+
+def regressions(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """Stages whose rows/sec dropped by more than `tolerance` against a baseline run of the same size"""
+    previous = {run["seasons"]: run for run in baseline}
+    found = []
+    for run in results:
+        before = previous.get(run["seasons"])
+        if before is None:
+            continue
+        for stage in STAGES:
+            old, new = before["rows_per_second"].get(stage), run["rows_per_second"].get(stage)
+            if old and new and new < old * (1 - tolerance):
+                found.append(f"{run['seasons']} seasons, {stage}: {new:.0f} rows/s vs {old:.0f} baseline")
+    return found
+
+
+def print_result(result: dict):
+    print(
+        f"{result['seasons']:>3} seasons  {result['rows']:>8} rows  "
+        f"{result['total_seconds']:>8.2f} s  {result['end_to_end_rows_per_second'] or 0:>9.0f} rows/s  "
+        f"commits {result['commits']:>4}  fsyncs {result['fsyncs']:>3}  peak RSS {result['peak_rss_mb']:.0f} MB"
+    )
+    for stage in STAGES:
+        rate = result["rows_per_second"][stage]
+        print(f"      {stage:<10} {result['seconds'][stage]:>8.2f} s  {rate or 0:>10.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Seasons per run")
+    parser.add_argument("--first-season", type=int, default=FIRST_SEASON)
+    parser.add_argument("--rounds", type=int, default=23, help="Rounds per synthetic season")
+    parser.add_argument("--fixtures", type=Path, help="Directory of recorded responses instead of a synthetic league")
+    parser.add_argument("--base-url", help="Extract over HTTP from a running fixture server")
+    parser.add_argument("--api-key", default=os.getenv("API_SPORTS_KEY", "benchmark"))
+    parser.add_argument("--workdir", type=Path, help="Where the databases go (default: a temp dir)")
+    parser.add_argument("--profile", choices=("cprofile", "pyinstrument"))
+    parser.add_argument("--profile-dir", type=Path, default=Path("profiles"))
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--budget-minutes", type=float, help="Fail if a full reload since 2006 is projected to take longer")
+    parser.add_argument("--baseline", type=Path, help="Earlier --output to compare rows/sec against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed rows/sec drop against --baseline")
+    args = parser.parse_args()
+
+    from scripts.api_sports_fixture_server import FixtureDataset
+
+    sizes = sorted(args.sizes)
+    if args.fixtures:
+        dataset = FixtureDataset.from_directory(args.fixtures)
+        available = sorted({game["league"]["season"] for game in dataset.games})
+    else:
+        available = list(range(args.first_season, args.first_season + max(sizes)))
+        dataset = None if args.base_url else FixtureDataset.synthetic(available, args.rounds)
+    if max(sizes) > len(available):
+        raise SystemExit(f"Only {len(available)} seasons available, asked for {max(sizes)}")
+    fetch = http_fetcher(args.base_url, args.api_key) if args.base_url else in_process_fetcher(dataset)
+
+    profiler = Profiler(args.profile, args.profile_dir)
+    results = []
+    # Smallest first: peak RSS is a process high-water mark
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or Path(tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        for size in sizes:
+            result = benchmark(fetch, available[:size], workdir, profiler)
+            print_result(result)
+            results.append(result)
+
+    through = date.today().year
+    projected = project_full_reload(results[-1], through)
+    print()
+    print(f"Projected full reload {FIRST_SEASON}-{through}: {projected / 60:.1f} min")
+    report = {"runs": results, "projected_full_reload_seconds": round(projected, 1)}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    failed = False
+    if args.budget_minutes is not None and projected > args.budget_minutes * 60:
+        print(f"Over the {args.budget_minutes:.0f} min maintenance window")
+        failed = True
+    if args.baseline:
+        for line in regressions(results, json.loads(args.baseline.read_text())["runs"], args.max_regression):
+            print(f"Regression: {line}")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
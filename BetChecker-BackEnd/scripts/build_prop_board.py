@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Build the prop board for the upcoming round (or a given one) and write it
+where /board/{round} serves it from. Run it after each ETL load and on a
+schedule through the week (e.g. hourly from cron) so late team changes are
+picked up.
+
+Usage:
+    python scripts/build_prop_board.py [--db PATH] [--out-dir DIR] [--season 2025 --round 7]
+        [--today 2025-04-20] [--strict-over]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.prop_board import build_board, upcoming_round, write_board  # noqa: E402
+from app.stat_store import StatStore  # noqa: E402
+from database.connection import connect_reader  # noqa: E402
+
+DB_DIR = Path(__file__).parent.parent / "BetChecker-PlayerDatabase"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.getenv("DB_PATH", str(DB_DIR / "afl_stats.db")))
+    parser.add_argument("--out-dir", default=os.getenv("BOARD_DIR", str(DB_DIR / "boards")))
+    parser.add_argument("--season", type=int)
+    parser.add_argument("--round", type=int, dest="round_number")
+    parser.add_argument("--today", type=date.fromisoformat, default=date.today(), help="Pick the round after this date")
+    parser.add_argument("--strict-over", action="store_true")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    conn = connect_reader(args.db)
+    try:
+        if (args.season is None) != (args.round_number is None):
+            parser.error("--season and --round go together")
+        if args.season is None:
+            upcoming = upcoming_round(conn, args.today)
+            if upcoming is None:
+                print(f"No games scheduled on or after {args.today}")
+                return
+            season, round_number = upcoming
+        else:
+            season, round_number = args.season, args.round_number
+        store = StatStore.from_connection(conn)
+        board = build_board(conn, store, season, round_number, strict_over=args.strict_over)
+    finally:
+        conn.close()
+
+    path = write_board(board, args.out_dir)
+    print(
+        f"Round {round_number}, {season}: {len(board['games'])} games, {len(board['players'])} players "
+        f"-> {path} ({path.stat().st_size / 1024:.0f} KB, "
+        f"{path.with_name(path.name + '.gz').stat().st_size / 1024:.0f} KB gzipped) "
+        f"in {time.perf_counter() - started:.2f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Comprehensive API exploration script.
 Tests all possible endpoints and documents what's actually available.
 """
 
+import os
 import requests
 import json
 import sys
@@ -12,7 +13,7 @@ from typing import Dict, List, Optional
 class APIExplorer:
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.base_url = "https://v1.afl.api-sports.io"
+        self.base_url = os.getenv("API_SPORTS_BASE_URL", "https://v1.afl.api-sports.io")
         self.headers = {
             'x-rapidapi-key': api_key,
             'x-rapidapi-host': 'v1.afl.api-sports.io'
@@ -4,13 +4,17 @@ Systematically test endpoint variations to find the game player statistics endpo
 Based on documentation: "games > players statistics" with parameters: id, ids, date
 """
 
+import os
 import requests
 import json
 import time
 import sys
 
-api_key = sys.argv[1] if len(sys.argv) > 1 else 'fef90da058feb563c00f7b594a69b407'
-base_url = "https://v1.afl.api-sports.io"
+api_key = sys.argv[1] if len(sys.argv) > 1 else os.getenv("API_SPORTS_KEY")
+if not api_key:
+    print("Usage: python find_game_stats_endpoint.py YOUR_API_KEY (or set API_SPORTS_KEY)")
+    sys.exit(1)
+base_url = os.getenv("API_SPORTS_BASE_URL", "https://v1.afl.api-sports.io")
 headers = {
     'x-rapidapi-key': api_key,
     'x-rapidapi-host': 'v1.afl.api-sports.io'
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Replay the API's query shapes and the example_queries.sql workload through
+EXPLAIN QUERY PLAN, time them, and report unused, redundant and missing
+indexes. Writes a migration that drops dead indexes and adds the composite
+or covering indexes the planner actually picks.
+
+Candidate indexes are tried on an in-memory copy of the database, brought
+up to the schema DatabaseManager creates, so the real file is never
+modified. Statements that fail to run are skipped and listed in the report
+and the migration header; index usage is judged from the ones that ran.
+
+Usage:
+    python scripts/index_advisor.py [--db PATH] [--migration-out PATH|-] [--repeat N]
+"""
+
+import argparse
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.export import export_sql  # noqa: E402
+from app.main import SPLIT_DIMENSIONS, over_under_sql, splits_sql, team_over_under_sql  # noqa: E402
+from app.prop_board import ROSTER_SQL, ROUND_GAMES_SQL  # noqa: E402
+from app.stat_store import STORE_LOAD_SQL  # noqa: E402
+from database.change_log import ensure_change_log  # noqa: E402
+from database.db_manager_api import GAME_DAYS_SINCE_LAST_SQL  # noqa: E402
+from database.live_stats import LIVE_COLUMNS, ensure_live_stats  # noqa: E402
+from database.storage_codes import ensure_storage_codes  # noqa: E402
+from database.team_stats import ensure_team_game_stats, team_totals_sql  # noqa: E402
+
+DB_DIR = Path(__file__).parent.parent / "BetChecker-PlayerDatabase"
+
+# (name, sql, params) for every statement the API issues
+API_WORKLOAD = [
+    (
+        "api: resolve player_name",
+        "SELECT player_id FROM vw_complete_game_stats WHERE player_name = ? LIMIT 1",
+        ("Scott Pendlebury",),
+    ),
+    ("api: /search/over-under", over_under_sql("disposals", False), {"player_id": 1, "threshold": 25}),
+    (
+        "api: /search/splits",
+        splits_sql("disposals", False, list(SPLIT_DIMENSIONS)),
+        {"player_id": 1, "threshold": 25},
+    ),
+    (
+        "api: /search/team-over-under",
+        team_over_under_sql("disposals", "for", False, []),
+        {"team_id": 1, "threshold": 350},
+    ),
+    (
+        "api: /players/{id}/games",
+        export_sql(["player_id = :player_id"]),
+        {"player_id": 1, "after_date": "", "after_game_id": 0, "after_stat_id": 0, "chunk": 1000},
+    ),
+    (
+        "api: /export/games",
+        export_sql(["season_year = :season_year"]),
+        {"season_year": 2023, "after_date": "2023-06-01", "after_game_id": 0, "after_stat_id": 0, "chunk": 1000},
+    ),
+    ("api: stat store load", STORE_LOAD_SQL, ()),
+    ("board: round games", ROUND_GAMES_SQL, {"season": 2023, "round_number": 1}),
+    ("board: roster", ROSTER_SQL, {"team_id": 1, "before": "2023-06-01", "roster_games": 3}),
+]
+
+# Lookups DatabaseManager runs per inserted row, so dropping an index never
+# trades read speed for a slower ETL
+ETL_WORKLOAD = [
+    ("etl: player by api id", "SELECT player_id FROM players WHERE api_player_id = ?", (1,)),
+    ("etl: game by api id", "SELECT game_id FROM games WHERE api_game_id = ?", (1,)),
+    (
+        "etl: game by date + teams",
+        """SELECT game_id FROM games
+           WHERE season_year = ? AND round_number IS ? AND game_date = ?
+           AND home_team_id = ? AND away_team_id = ?""",
+        (2023, 1, "2023-03-16", 1, 4),
+    ),
+    ("etl: venue by name", "SELECT venue_id FROM venues WHERE venue_name = ?", ("MCG",)),
+    (
+        "etl: existing player stats",
+        "SELECT stat_id FROM player_game_stats WHERE player_id = ? AND game_id = ?",
+        (1, 1),
+    ),
+    (
+        "etl: rebuild team_game_stats",
+        team_totals_sql("SELECT value FROM json_each(:ids)"),
+        {"ids": "[1, 2, 3]"},
+    ),
+    (
+        "etl: read live game",
+        f"SELECT {', '.join(LIVE_COLUMNS)} FROM live_player_game_stats WHERE game_id = ?",
+        (1,),
+    ),
+    ("etl: promote live game", GAME_DAYS_SINCE_LAST_SQL, (1,)),
+]
+
+# Composite/covering indexes to try. Only the ones the planner uses on the
+# workload end up in the migration.
+CANDIDATE_INDEXES = [
+    # Per-player aggregates through vw_complete_game_stats: every column the
+    # flattened view needs from player_game_stats, so no table lookups
+    (
+        "idx_pgs_player_cover",
+        "player_game_stats",
+        ["player_id", "game_id", "team_id", "opponent_team_id", "venue_id", "disposals", "goals"],
+    ),
+    # Game rosters and same-team joins
+    ("idx_pgs_game_team", "player_game_stats", ["game_id", "team_id", "player_id"]),
+    # Date ordering/ranges that also need the join key
+    ("idx_games_date_id", "games", ["game_date", "game_id"]),
+    ("idx_pth_player_current", "player_team_history", ["player_id", "is_current"]),
+]
+
+_INDEX_RE = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+_SCAN_RE = re.compile(r"^SCAN (\w+)$")
+
+
+def load_example_workload(path: Path) -> list:
+    """Split example_queries.sql into individual statements"""
+    workload = []
+    buffer = ""
+    for line in path.read_text().splitlines():
+        stripped = line.split("--", 1)[0].rstrip()
+        if not stripped and not buffer:
+            continue
+        buffer += stripped + "\n"
+        if sqlite3.complete_statement(buffer):
+            first_line = buffer.strip().splitlines()[0]
+            workload.append((f"example #{len(workload) + 1}: {first_line[:50]}", buffer.strip(), ()))
+            buffer = ""
+    return workload
+
+
+def copy_to_memory(db_path: str) -> sqlite3.Connection:
+    """In-memory copy with the API id columns and the tables and indexes DatabaseManager adds"""
+    source = sqlite3.connect(db_path)
+    conn = sqlite3.connect(":memory:")
+    source.backup(conn)
+    source.close()
+    conn.row_factory = sqlite3.Row
+    # The ETL statements look up API ids, which older databases don't have yet
+    if "api_player_id" not in {r["name"] for r in conn.execute("PRAGMA table_info(players)")}:
+        conn.executescript((DB_DIR / "add_api_ids_migration.sql").read_text())
+    ensure_change_log(conn)
+    ensure_live_stats(conn)
+    ensure_team_game_stats(conn)
+    ensure_storage_codes(conn)
+    conn.commit()
+    return conn
+
+
+def list_indexes(conn: sqlite3.Connection) -> dict:
+    """name -> (table, [columns], is_auto)"""
+    indexes = {}
+    for row in conn.execute("SELECT name, tbl_name FROM sqlite_master WHERE type = 'index'"):
+        columns = [r["name"] for r in conn.execute(f"PRAGMA index_info('{row['name']}')")]
+        indexes[row["name"]] = (row["tbl_name"], columns, row["name"].startswith("sqlite_autoindex"))
+    return indexes
+
+
+def find_redundant(indexes: dict) -> dict:
+    """Indexes whose columns are a leading prefix of another index on the same table"""
+    redundant = {}
+    for name, (table, columns, is_auto) in indexes.items():
+        if is_auto:
+            continue
+        for other, (other_table, other_columns, _) in indexes.items():
+            if other == name or other_table != table or len(other_columns) < len(columns):
+                continue
+            if other_columns[:len(columns)] != columns:
+                continue
+            # Exact duplicates: keep the constraint index, else the first by name
+            if len(other_columns) > len(columns) or indexes[other][2] or other < name:
+                redundant[name] = other
+                break
+    return redundant
+
+
+def run_workload(conn: sqlite3.Connection, workload: list, repeat: int) -> list:
+    results = []
+    for name, sql, params in workload:
+        try:
+            plan = [r["detail"] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.execute(sql, params).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+        except sqlite3.Error as e:
+            results.append({"query": name, "error": str(e)})
+            continue
+        results.append({
+            "query": name,
+            "plan": plan,
+            "indexes": {m for detail in plan for m in _INDEX_RE.findall(detail)},
+            "full_scans": [m.group(1) for m in (_SCAN_RE.match(d) for d in plan) if m],
+            "temp_btrees": sum("USE TEMP B-TREE" in d for d in plan),
+            "median_ms": statistics.median(timings),
+        })
+    return results
+
+
+def time_inserts(conn: sqlite3.Connection, rows: int = 2000) -> float:
+    """Write cost of the current index set: bulk insert into player_game_stats, rolled back"""
+    conn.execute("SAVEPOINT write_cost")
+    start = time.perf_counter()
+    conn.executemany(
+        """INSERT INTO player_game_stats
+           (player_id, game_id, team_id, opponent_team_id, venue_id, location, game_time, disposals, goals)
+           VALUES (?, ?, 1, 2, 1, 'Home', 'Night', ?, ?)""",
+        ((1_000_000 + i, i % 200 + 1, i % 40, i % 5) for i in range(rows)),
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    conn.execute("ROLLBACK TO write_cost")
+    conn.execute("RELEASE write_cost")
+    return elapsed
+
+
+class IndexAdvisor:
+    def __init__(self, db_path: str, workload: list, repeat: int = 5):
+        self.db_path = db_path
+        self.workload = workload
+        self.repeat = repeat
+
+    def analyze(self) -> dict:
+        conn = copy_to_memory(self.db_path)
+        indexes = list_indexes(conn)
+        baseline = run_workload(conn, self.workload, self.repeat)
+        baseline_write_ms = time_inserts(conn)
+
+        # Usage comes from the statements that ran; failures are listed, not guessed at
+        failed = [r["query"] for r in baseline if "error" in r]
+        used = set().union(*(r.get("indexes", set()) for r in baseline))
+        unused = sorted(n for n, (_, _, auto) in indexes.items() if not auto and n not in used)
+        redundant = find_redundant(indexes)
+        drops = sorted(set(unused) | set(redundant))
+
+        # What-if: drop dead indexes, add every candidate, replay
+        for name in drops:
+            conn.execute(f"DROP INDEX {name}")
+        for name, table, columns in CANDIDATE_INDEXES:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(columns)})")
+        trial = run_workload(conn, self.workload, self.repeat)
+        trial_used = set().union(*(r.get("indexes", set()) for r in trial))
+        creates = [c for c in CANDIDATE_INDEXES if c[0] in trial_used]
+
+        # Existing indexes the planner abandoned for a candidate
+        superseded = sorted(
+            n for n, (_, _, auto) in indexes.items() if not auto and n not in drops and n not in trial_used
+        )
+        drops = sorted(set(drops) | set(superseded))
+
+        # Final state: only the candidates that were picked
+        for name, _, _ in CANDIDATE_INDEXES:
+            if name not in trial_used:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+        for name in superseded:
+            conn.execute(f"DROP INDEX {name}")
+        after = run_workload(conn, self.workload, self.repeat)
+        after_write_ms = time_inserts(conn)
+        conn.close()
+
+        return {
+            "indexes": indexes,
+            "baseline": baseline,
+            "after": after,
+            "failed": failed,
+            "unused": unused,
+            "redundant": redundant,
+            "superseded": superseded,
+            "drops": drops,
+            "creates": creates,
+            "baseline_write_ms": baseline_write_ms,
+            "after_write_ms": after_write_ms,
+        }
+
+    @staticmethod
+    def migration_sql(report: dict) -> str:
+        lines = [
+            "-- Migration: index set recommended by scripts/index_advisor.py",
+            "-- Drops indexes the workload never uses (or that duplicate a longer index)",
+            "-- and adds the composite/covering indexes the planner picked.",
+        ]
+        if report["failed"]:
+            lines.append("-- Skipped (failed to run, so not reflected in index usage):")
+            lines.extend(f"--   {name}" for name in report["failed"])
+        lines.append("")
+        for name in report["drops"]:
+            if name in report["redundant"]:
+                reason = f"prefix of {report['redundant'][name]}"
+            elif name in report["superseded"]:
+                reason = "superseded by a recommended index"
+            else:
+                reason = "unused by workload"
+            lines.append(f"DROP INDEX IF EXISTS {name};  -- {reason}")
+        if report["drops"]:
+            lines.append("")
+        for name, table, columns in report["creates"]:
+            lines.append(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(columns)});")
+        lines.append("")
+        lines.append("ANALYZE;")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def print_report(report: dict):
+        print("=" * 80)
+        print("QUERY PLAN REPORT")
+        print("=" * 80)
+        print()
+        after = {r["query"]: r for r in report["after"]}
+        for result in report["baseline"]:
+            print(result["query"])
+            if "error" in result:
+                print(f"   Skipped: {result['error']}")
+                print()
+                continue
+            for detail in result["plan"]:
+                print(f"   {detail}")
+            new = after[result["query"]]
+            print(f"   Median: {result['median_ms']:.3f} ms -> {new['median_ms']:.3f} ms with recommended indexes")
+            if result["full_scans"]:
+                print(f"   Full scans: {', '.join(result['full_scans'])}")
+            if result["temp_btrees"]:
+                print(f"   Temp B-trees: {result['temp_btrees']}")
+            print()
+
+        print("=" * 80)
+        print("INDEX USAGE")
+        print("=" * 80)
+        for name, (table, columns, is_auto) in sorted(report["indexes"].items()):
+            status = "drop" if name in report["drops"] else "keep"
+            auto = " (constraint)" if is_auto else ""
+            print(f"  [{status}] {name} ON {table}({', '.join(columns)}){auto}")
+        print()
+        print(f"Unused: {len(report['unused'])}  Redundant: {len(report['redundant'])}  "
+              f"Superseded: {len(report['superseded'])}  "
+              f"Recommended new: {len(report['creates'])}")
+        print(f"Write cost (2000 inserts): {report['baseline_write_ms']:.1f} ms -> {report['after_write_ms']:.1f} ms")
+        if report["failed"]:
+            print(f"Skipped {len(report['failed'])} statements that failed to run; index usage ignores them:")
+            for name in report["failed"]:
+                print(f"  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=str(DB_DIR / "afl_stats.db"))
+    parser.add_argument(
+        "--migration-out",
+        default=str(Path(tempfile.gettempdir()) / "index_advisor_migration.sql"),
+        help="Where to write the migration; - for stdout",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed executions per query")
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"Error: Database not found at {args.db}")
+        sys.exit(1)
+
+    print(f"Using database: {args.db}")
+    print()
+
+    workload = API_WORKLOAD + ETL_WORKLOAD + load_example_workload(DB_DIR / "example_queries.sql")
+    advisor = IndexAdvisor(args.db, workload, repeat=args.repeat)
+    report = advisor.analyze()
+    advisor.print_report(report)
+
+    migration = IndexAdvisor.migration_sql(report)
+    print()
+    if args.migration_out == "-":
+        print(migration, end="")
+    else:
+        Path(args.migration_out).write_text(migration)
+        print(f"Migration written to: {args.migration_out}")
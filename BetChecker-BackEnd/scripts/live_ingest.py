@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Poll a day's games while they are in play and keep live_player_game_stats
+current; each game's totals are promoted into player_game_stats at full
+time. Stops when every game has finished or the request budget is spent.
+
+The gap between polls follows the API's limits: at most --rpm requests a
+minute, and with --budget (e.g. what is left of the 100/day free quota) the
+requests are spread over --session-minutes. GET /live/{game_id} serves the
+provisional totals.
+
+Usage:
+    python scripts/live_ingest.py [--date 2025-04-20] [--db PATH] [--rpm 10] [--min-interval 30]
+        [--budget 80 --session-minutes 240]
+    API_SPORTS_BASE_URL=http://localhost:8081 python scripts/live_ingest.py --date 2023-03-14
+"""
+
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.db_manager_api import DatabaseManager  # noqa: E402
+from database.live_ingest import (  # noqa: E402
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    LivePoller,
+    RateLimited,
+)
+
+DB_DIR = Path(__file__).parent.parent / "BetChecker-PlayerDatabase"
+
+
+def http_fetcher(base_url: str, api_key: str):
+    def fetch(endpoint: str, params: dict) -> dict:
+        url = f"{base_url.rstrip('/')}/{endpoint}"
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        request = urllib.request.Request(url, headers={"x-apisports-key": api_key})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as exc:
+            if exc.code == 429:
+                raise RateLimited(float(exc.headers.get("Retry-After") or 60)) from exc
+            raise
+    return fetch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.getenv("DB_PATH", str(DB_DIR / "afl_stats.db")))
+    parser.add_argument("--date", default=date.today().isoformat(), help="Game day to poll (YYYY-MM-DD)")
+    parser.add_argument("--base-url", default=os.getenv("API_SPORTS_BASE_URL", "https://v1.afl.api-sports.io"))
+    parser.add_argument("--api-key", default=os.getenv("API_SPORTS_KEY"))
+    parser.add_argument("--rpm", type=int, default=DEFAULT_REQUESTS_PER_MINUTE, help="API requests allowed per minute")
+    parser.add_argument("--min-interval", type=float, default=DEFAULT_MIN_INTERVAL, help="Seconds between polls, at least")
+    parser.add_argument("--budget", type=int, help="Requests this session may use in total")
+    parser.add_argument("--session-minutes", type=float, default=240.0, help="How long --budget has to last")
+    parser.add_argument("--max-polls", type=int)
+    args = parser.parse_args()
+    if not args.api_key:
+        parser.error("Set --api-key or API_SPORTS_KEY")
+
+    db = DatabaseManager(args.db)
+    try:
+        poller = LivePoller(
+            db,
+            http_fetcher(args.base_url, args.api_key),
+            args.date,
+            requests_per_minute=args.rpm,
+            min_interval=args.min_interval,
+            request_budget=args.budget,
+            session_minutes=args.session_minutes,
+        )
+        polls = poller.run(max_polls=args.max_polls)
+        print(f"{polls} polls, {poller.requests} requests, {len(poller.done)} games done")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Measure how long a fresh interpreter takes to import the API (what uvicorn
+does before it can bind the port) and list the slowest imports.
+
+Runs `python -X importtime -c "import app.main"` in a subprocess so nothing
+is already cached in sys.modules. Exits non-zero if the total exceeds the
+target, so it can gate a deploy.
+
+Usage:
+    python scripts/measure_cold_start.py [--target-ms 600] [--top 15] [--runs 3]
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+DEFAULT_TARGET_MS = 600
+
+
+def measure_import(module: str = "app.main") -> Tuple[float, Dict[str, float]]:
+    """(total ms, cumulative ms per direct dependency of module) for one cold import"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    total_us = 0
+    packages: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        total_us += int(self_us)
+        # Nesting is two spaces per level; module itself is at level 0, its imports at level 1
+        name = name[1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 1:
+            packages[name.strip()] = int(cumulative_us) / 1000
+    return total_us / 1000, packages
+
+
+def slowest(packages: Dict[str, float], top: int) -> List[Tuple[str, float]]:
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=DEFAULT_TARGET_MS)
+    parser.add_argument("--top", type=int, default=15, help="Slowest direct imports to list")
+    parser.add_argument("--runs", type=int, default=3, help="Take the best of this many runs")
+    args = parser.parse_args()
+
+    runs = [measure_import() for _ in range(max(args.runs, 1))]
+    total_ms, packages = min(runs, key=lambda run: run[0])
+
+    print(f"Cold import of app.main: {total_ms:.0f} ms (best of {len(runs)}, target {args.target_ms:.0f} ms)")
+    print()
+    print(f"{'Package':<40} {'Cumulative ms':>14}")
+    for name, ms in slowest(packages, args.top):
+        print(f"{name:<40} {ms:>14.1f}")
+
+    if total_ms > args.target_ms:
+        print()
+        print("Over target")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
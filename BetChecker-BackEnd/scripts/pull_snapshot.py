@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Keep this API node's database in step with the snapshot publisher.
+
+Checks the publisher's CURRENT pointer every --interval seconds. When it
+moves, only the blocks this node doesn't already have are fetched, the
+result is verified against the manifest, and the node's own CURRENT
+pointer is swapped. Run the API with DB_POINTER=<dir>/CURRENT.
+
+The source is the publisher's snapshot directory, either as a path or
+served over HTTP (e.g. `python -m http.server -d BetChecker-PlayerDatabase`).
+
+Usage:
+    python scripts/pull_snapshot.py --source /mnt/publisher/BetChecker-PlayerDatabase --dir /srv/betchecker
+    python scripts/pull_snapshot.py --source http://10.0.0.5:8000 --dir /srv/betchecker --once
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.snapshot_sync import SnapshotPuller, transport_for  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", required=True, help="Publisher snapshot directory or http:// URL")
+    parser.add_argument("--dir", required=True, help="This node's snapshot directory")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between checks")
+    parser.add_argument("--keep", type=int, default=2, help="Snapshots to keep on this node")
+    parser.add_argument("--once", action="store_true", help="Pull once and exit")
+    parser.add_argument("--max-polls", type=int)
+    args = parser.parse_args()
+
+    os.makedirs(args.dir, exist_ok=True)
+    puller = SnapshotPuller(transport_for(args.source), args.dir, keep=args.keep)
+    if args.once:
+        result = puller.pull()
+        print(result if result else "Already up to date")
+        return
+    puller.run(interval=args.interval, max_polls=args.max_polls)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@ Usage:
     python scripts/test_api_sports.py YOUR_API_KEY
 """
 
+import os
 import requests
 import json
 import sys
@@ -20,7 +21,7 @@ from typing import Optional, Dict
 class APISportsTester:
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.base_url = "https://v1.afl.api-sports.io"
+        self.base_url = os.getenv("API_SPORTS_BASE_URL", "https://v1.afl.api-sports.io")
         self.headers = {
             'x-rapidapi-key': api_key,
             'x-rapidapi-host': 'v1.afl.api-sports.io'
@@ -1,5 +1,9 @@
 import os
+import sqlite3
 import sys
+from datetime import date, timedelta
+
+import pytest
 
 # Add project root to sys.path for imports like `from app.main import app`
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
@@ -9,3 +13,75 @@ if PROJECT_ROOT not in sys.path:
 # Ensure tests use the workspace-local database path by default
 DB_PATH = os.path.join(PROJECT_ROOT, "BetChecker-PlayerDatabase", "afl_stats.db")
 os.environ.setdefault("DB_PATH", DB_PATH)
+# Tests fire requests far faster than any client should; throttling tests
+# install their own limiter and shedder
+os.environ.setdefault("RATE_LIMIT_RPS", "0")
+os.environ.setdefault("SHED_LATENCY_TARGET_MS", "0")
+
+SCHEMA_DIR = os.path.join(PROJECT_ROOT, "BetChecker-PlayerDatabase")
+
+TEAMS_PER_SEASON = 18
+PLAYERS_PER_TEAM = 22
+
+
+def create_schema_db(path: str) -> str:
+    """Empty database built from schema.sql plus the API ID migration"""
+    conn = sqlite3.connect(path)
+    with open(os.path.join(SCHEMA_DIR, "schema.sql")) as f:
+        conn.executescript(f.read())
+    with open(os.path.join(SCHEMA_DIR, "add_api_ids_migration.sql")) as f:
+        conn.executescript(f.read())
+    # DatabaseManager.get_or_create_team matches on api_team_id
+    conn.execute("ALTER TABLE teams ADD COLUMN api_team_id INTEGER")
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def schema_db(tmp_path) -> str:
+    return create_schema_db(str(tmp_path / "afl_stats.db"))
+
+
+def load_synthetic_round(db, season: int, round_number: int):
+    """
+    Load one round of a synthetic season through DatabaseManager: 9 games,
+    22 players a side. Stats are deterministic in (player, round).
+    """
+    team_ids = [db.get_or_create_team(f"Team {t}", api_team_id=t) for t in range(1, TEAMS_PER_SEASON + 1)]
+    venue_id = db.get_or_create_venue(f"Venue {round_number % 9}")
+    game_date = date(season, 3, 14) + timedelta(days=7 * (round_number - 1))
+    for g in range(TEAMS_PER_SEASON // 2):
+        # Rotate pairings each round so opponents vary
+        home = (g + round_number) % TEAMS_PER_SEASON
+        away = (TEAMS_PER_SEASON - 1 - g + round_number) % TEAMS_PER_SEASON
+        game_id = db.get_or_create_game(
+            api_game_id=season * 1000 + round_number * 10 + g,
+            season_year=season,
+            round_number=round_number,
+            game_type="Regular Season",
+            game_date=game_date.isoformat(),
+            game_time="Night",
+            venue_id=venue_id,
+            home_team_id=team_ids[home],
+            away_team_id=team_ids[away],
+        )
+        for side, team, opponent in (("Home", home, away), ("Away", away, home)):
+            for p in range(PLAYERS_PER_TEAM):
+                api_player_id = (team + 1) * 100 + p
+                player_id = db.get_or_create_player(
+                    f"Player {api_player_id}",
+                    api_player_id,
+                    date_of_birth=(date(1990, 1, 1) + timedelta(days=api_player_id)).isoformat(),
+                )
+                db.insert_player_stats(
+                    player_id=player_id,
+                    game_id=game_id,
+                    team_id=team_ids[team],
+                    opponent_team_id=team_ids[opponent],
+                    venue_id=venue_id,
+                    location=side,
+                    game_time="Night",
+                    disposals=(api_player_id * 7 + round_number * 3) % 35,
+                    goals=(api_player_id + round_number) % 4,
+                )
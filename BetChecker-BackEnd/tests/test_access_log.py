@@ -0,0 +1,86 @@
+import random
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.access_log import AccessLog, SpaceSaving
+from app.warmup import top_queried
+
+client = TestClient(main.app)
+
+
+def test_space_saving_keeps_heavy_hitters_under_churn():
+    rng = random.Random(7)
+    sketch = SpaceSaving(capacity=50)
+    truth = {}
+    # Three heavy keys (~10% each) among thousands of one-off keys
+    for i in range(20000):
+        key = rng.choice(["a", "b", "c"]) if rng.random() < 0.3 else f"cold-{i}"
+        truth[key] = truth.get(key, 0) + 1
+        sketch.add(key)
+
+    top = sketch.top(3)
+    assert {key for key, _, _ in top} == {"a", "b", "c"}
+    for key, count, error in top:
+        assert count - error <= truth[key] <= count
+    assert sketch.guaranteed("a", 3)
+    assert not sketch.guaranteed("cold-5", 3)
+
+
+def test_space_saving_evicts_smallest_and_refreshes_cutoff():
+    sketch = SpaceSaving(capacity=3, cutoff_refresh=5)
+    for key, times in (("a", 5), ("b", 2), ("c", 3)):
+        for _ in range(times):
+            sketch.add(key)
+    # "b" holds the smallest count, so "d" takes its slot and inherits it
+    sketch.add("d")
+    assert "b" not in sketch
+    assert sketch.top() == [("a", 5, 0), ("c", 3, 0), ("d", 3, 2)]
+    assert sketch.guaranteed("a", 1) and not sketch.guaranteed("c", 1)
+
+    # The cut-off is reused until cutoff_refresh more adds
+    for _ in range(4):
+        sketch.add("c")
+    assert not sketch.guaranteed("c", 1)
+    sketch.add("c")
+    assert sketch.guaranteed("c", 1) and not sketch.guaranteed("a", 1)
+
+    # Stale heap entries are compacted away
+    for _ in range(100):
+        sketch.add("a")
+    assert len(sketch._heap) <= 4 * sketch.capacity
+
+
+def test_access_log_writes_ndjson_that_warmup_reads(tmp_path):
+    path = tmp_path / "access.ndjson"
+    log = AccessLog(str(path), buffer_size=3, flush_interval=60)
+    for threshold in (20.5, 25.5, 25.5):
+        log.record("over-under", 1, "disposals", threshold)
+    log.record("splits", 2, "goals", 1.5)
+    log.close()
+
+    # The ring buffer held three entries, so the oldest was dropped
+    assert (log.recorded, log.written, log.dropped) == (4, 3, 1)
+    assert len(path.read_text().splitlines()) == 3
+    assert top_queried(str(path), 1) == [(1, "disposals")]
+    # Heavy hitters count every request, including dropped log lines
+    assert log.snapshot(1)["thresholds"] == [
+        {"player_id": 1, "stat": "disposals", "threshold": 25.5, "count": 2, "error": 0}
+    ]
+
+
+def test_hot_keys_endpoint_reports_resolved_players(monkeypatch):
+    monkeypatch.setattr(main, "access_log", AccessLog())
+    for _ in range(3):
+        client.get("/search/over-under", params={"player_name": "Scott Pendlebury", "stat": "disposals", "threshold": 25})
+    client.get("/search/splits", params={"player_id": 4, "stat": "goals", "threshold": 2.5})
+
+    monkeypatch.setattr(main, "API_KEYS", frozenset({"ops"}))
+    assert client.get("/admin/hot-keys").status_code == 401
+    assert client.get("/admin/metrics", headers={"X-API-Key": "other"}).status_code == 403
+    resp = client.get("/admin/hot-keys", params={"k": 5}, headers={"X-API-Key": "ops"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["recorded"] == 4
+    assert data["players"][0] == {"player_id": 1, "stat": "disposals", "count": 3, "error": 0}
+    assert {"player_id": 4, "stat": "goals", "count": 1, "error": 0} in data["players"]
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import load_synthetic_round
+import app.main as main
+from app.backtest import prior_counts
+from app.stat_store import get_stat_store
+from database.db_manager_api import DatabaseManager
+
+client = TestClient(main.app)
+
+
+def test_over_under_as_of_excludes_later_games():
+    conn = main.get_connection()
+    try:
+        dates = [r["game_date"] for r in conn.execute(
+            "SELECT game_date FROM vw_complete_game_stats WHERE player_id = 1 ORDER BY game_date"
+        )]
+    finally:
+        conn.close()
+    params = {"player_id": 1, "stat": "disposals", "threshold": 30}
+    assert client.get("/search/over-under", params=params).json() == {"over": 1, "under": 1}
+    # Pendlebury: 32 then 29 disposals
+    assert client.get("/search/over-under", params={**params, "as_of": dates[1]}).json() == {"over": 1, "under": 0}
+    assert client.get("/search/over-under", params={**params, "as_of": dates[0]}).json() == {"over": 0, "under": 0}
+
+
+@pytest.fixture
+def season_db(schema_db, monkeypatch):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        for round_number in range(1, 11):
+            load_synthetic_round(db, 2023, round_number)
+    db.close()
+    monkeypatch.setattr(main, "DB_PATH", schema_db)
+    return schema_db
+
+
+def test_prior_counts_match_as_of_queries(season_db):
+    store = get_stat_store(season_db)
+    rng = np.random.default_rng(7)
+    rows = rng.choice(len(store), size=40, replace=False)
+    lines = rng.choice([4.5, 12, 17.5, 25.5], size=40)
+    over, games, went_over = prior_counts(store, rows, "disposals", lines, False)
+
+    for row, line, o, g, hit in zip(rows, lines, over, games, went_over):
+        player_id = int(store.player_id[row])
+        as_of = str(store.game_date[row])
+        resp = client.get(
+            "/search/over-under",
+            params={"player_id": player_id, "stat": "disposals", "threshold": float(line), "as_of": as_of},
+        ).json()
+        assert (o, g - o) == (resp["over"], resp["under"])
+        assert hit == (store.stats["disposals"][row] >= line)
+
+
+def test_backtest_endpoint(season_db):
+    season = client.post(
+        "/backtest",
+        json={"stat": "disposals", "season": 2023, "lines": [12.5, 20.5], "min_games": 3, "min_edge": 0.1},
+    ).json()
+    assert season["points"] == 10 * 396 * 2 and season["unmatched"] == 0
+    # Rounds 4-10 have three or more prior games
+    assert season["eligible"] == 7 * 396 * 2
+    assert season["bets"] == season["by_side"]["over"]["bets"] + season["by_side"]["under"]["bets"]
+    assert season["profit"] == pytest.approx(season["by_side"]["over"]["profit"] + season["by_side"]["under"]["profit"])
+    assert 0 <= season["brier"] <= 1
+
+    # Explicit lines: a near-certain over priced at evens wins every bet
+    store = get_stat_store(season_db)
+    rows = np.flatnonzero(store.stats["disposals"] >= 1)[:50]
+    points = {
+        "player_id": store.player_id[rows].tolist(),
+        "game_id": (store.game_id[rows].tolist()[:-1]) + [999999],
+        "line": [0.5] * 50,
+        "over_odds": [2.0] * 50,
+        "under_odds": [2.0] * 50,
+    }
+    result = client.post("/backtest", json={"stat": "disposals", "points": points, "min_games": 0, "sides": "over"}).json()
+    assert result["unmatched"] == 1
+    assert result["by_side"]["under"]["bets"] == 0
+    assert result["wins"] == result["bets"] and result["roi"] == pytest.approx(1.0)
+
+    bad = client.post("/backtest", json={"stat": "disposals", "season": 2023, "lines": [10], "points": points})
+    assert bad.status_code == 400
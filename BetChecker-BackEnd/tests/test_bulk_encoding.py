@@ -0,0 +1,130 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import load_synthetic_round
+import app.main as main
+from app.encoding import ARROW, MSGPACK, available_media_types, negotiate_encoding, negotiate_media_type
+from app.stat_store import get_stat_store
+from database.db_manager_api import DatabaseManager
+
+client = TestClient(main.app)
+
+PARAMS = {"player_name": "Scott Pendlebury", "stat": "disposals", "threshold": 30}
+
+
+def test_json_contract_unchanged_and_unknown_types_get_json():
+    resp = client.get("/search/over-under", params=PARAMS, headers={"Accept": "application/json, */*"})
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.json() == {"over": 1, "under": 1}
+
+    for accept in ("text/csv", "text/html,application/xhtml+xml", "garbage"):
+        resp = client.get("/search/over-under", params=PARAMS, headers={"Accept": accept})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/json"
+        assert resp.json() == {"over": 1, "under": 1}
+
+
+def test_accept_header_negotiation():
+    assert negotiate_media_type(None) == "application/json"
+    assert negotiate_media_type("text/html, */*;q=0.8") == "application/json"
+    expected = MSGPACK if MSGPACK in available_media_types() else "application/json"
+    assert negotiate_media_type("application/json;q=0.5, application/x-msgpack") == expected
+    assert negotiate_media_type("application/x-msgpack;q=0.5, application/json") == "application/json"
+    assert negotiate_media_type("image/png") == "application/json"
+    assert negotiate_encoding("gzip;q=0.5, br") == "gzip"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip;q=0, x-gzip", ["gzip"]) is None
+    assert negotiate_encoding("gzip;q=0, *", ["gzip"]) is None
+    assert negotiate_encoding("br, *;q=0.1", ["gzip"]) == "gzip"
+
+
+def test_over_under_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    resp = client.get("/search/over-under", params=PARAMS, headers={"Accept": MSGPACK})
+    assert resp.headers["content-type"] == MSGPACK
+    body = msgpack.unpackb(resp.content)
+    assert body == {
+        "player_id": 1, "stat": "disposals", "threshold": 30.0,
+        "columns": {"over": [1], "under": [1]},
+    }
+
+
+def test_batch_matches_sql_in_every_format(schema_db, monkeypatch):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        for round_number in (1, 2, 3):
+            load_synthetic_round(db, 2023, round_number)
+    db.close()
+    monkeypatch.setattr(main, "DB_PATH", schema_db)
+
+    thresholds = [0, 9.5, 17, 30.5, 40]
+    body = {"stat": "disposals", "thresholds": thresholds}
+    resp = client.post("/search/over-under/batch", json=body, headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    data = resp.json()
+    columns = data["columns"]
+    assert data["stat"] == "disposals"
+    assert len(columns["player_id"]) == 396 * len(thresholds)
+
+    conn = main.get_connection()
+    try:
+        sql = main.over_under_sql("disposals", False)
+        for i in range(0, len(columns["player_id"]), 97):
+            pid, threshold = columns["player_id"][i], columns["threshold"][i]
+            row = conn.execute(sql, {"player_id": pid, "threshold": threshold}).fetchone()
+            assert (columns["over"][i], columns["under"][i]) == (row["over"], row["under"])
+    finally:
+        conn.close()
+
+    # Explicit players (duplicates collapsed, unknown ones all zero)
+    subset = {"stat": "goals", "thresholds": [1.5], "player_ids": [5, 5, 999999], "strict_over": True}
+    columns = client.post("/search/over-under/batch", json=subset).json()["columns"]
+    assert columns["player_id"] == [5, 999999]
+    assert columns["over"][0] + columns["under"][0] == 3
+    assert (columns["over"][1], columns["under"][1]) == (0, 0)
+
+    full = data["columns"]
+    if "zstd" in (negotiate_encoding("zstd, gzip") or ""):
+        zstd = client.post("/search/over-under/batch", json=body, headers={"Accept-Encoding": "zstd, gzip"})
+        assert zstd.headers["content-encoding"] == "zstd"
+    msgpack = pytest.importorskip("msgpack")
+    packed = client.post("/search/over-under/batch", json=body, headers={"Accept": MSGPACK})
+    assert msgpack.unpackb(packed.content)["columns"] == full
+
+    pa = pytest.importorskip("pyarrow")
+    arrow = client.post("/search/over-under/batch", json=body, headers={"Accept": ARROW})
+    table = pa.ipc.open_stream(arrow.content).read_all()
+    assert table.column("over").to_pylist() == full["over"]
+    assert json.loads(table.schema.metadata[b"stat"]) == "disposals"
+
+
+def test_store_counts_match_sql_for_null_stats_and_orphan_rows(schema_db, monkeypatch):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        for round_number in (1, 2, 3):
+            load_synthetic_round(db, 2023, round_number)
+    # A stat not recorded, and a row whose venue is missing (the view drops it)
+    db.conn.execute("UPDATE player_game_stats SET disposals = NULL WHERE player_id = 1 AND game_id = 1")
+    db.conn.execute("UPDATE player_game_stats SET venue_id = 999 WHERE stat_id = (SELECT MAX(stat_id) FROM player_game_stats WHERE player_id = 2)")
+    db.conn.commit()
+    db.close()
+    monkeypatch.setattr(main, "DB_PATH", schema_db)
+
+    body = {"stat": "disposals", "thresholds": [0, 15.5], "player_ids": [1, 2]}
+    columns = client.post("/search/over-under/batch", json=body).json()["columns"]
+    store = get_stat_store(schema_db)
+    store.pin_histograms([(1, "disposals"), (2, "disposals")])
+    conn = main.get_connection()
+    try:
+        sql = main.over_under_sql("disposals", False)
+        for i, (pid, threshold) in enumerate(zip(columns["player_id"], columns["threshold"])):
+            row = conn.execute(sql, {"player_id": pid, "threshold": threshold}).fetchone()
+            expected = (row["over"], row["under"])
+            assert (columns["over"][i], columns["under"][i]) == expected
+            assert store.pinned_over_under(pid, "disposals", threshold, False) == expected
+            assert sum(expected) == 2
+    finally:
+        conn.close()
@@ -0,0 +1,128 @@
+import time
+
+from conftest import load_synthetic_round
+import app.stat_store as stat_store
+from app.stat_store import cached_stat_store, get_stat_store
+from database.connection import connect_reader
+from database.db_manager_api import DatabaseManager
+
+
+def test_stat_store_applies_changelog_per_player(schema_db):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        load_synthetic_round(db, 2023, 1)
+
+    store = get_stat_store(schema_db)
+    first_seq = store.last_seq
+    assert first_seq > 0
+    assert len(store) == 396
+
+    # A late correction: one player's stats for a newly recorded game
+    player_id = db.get_or_create_player("Player 101", 101)
+    other_id = db.get_or_create_player("Player 202", 202)
+    store.pin_histograms([(player_id, "disposals"), (other_id, "disposals")])
+    game_id = db.get_or_create_game(
+        api_game_id=999999, season_year=2023, round_number=2, game_type="Regular Season",
+        game_date="2023-03-21", game_time="Night", venue_id=1,
+        home_team_id=1, away_team_id=2,
+    )
+    db.insert_player_stats(player_id, game_id, 1, 2, 1, "Home", "Night", disposals=40, goals=5)
+
+    conn = connect_reader(schema_db)
+    try:
+        refreshed, changed = store.refreshed(conn)
+        assert changed == {player_id}
+        assert refreshed is not store
+        assert refreshed.last_seq > first_seq
+
+        rows = refreshed.player_slice(player_id)
+        assert list(refreshed.stats["disposals"][rows])[-1] == 40
+        assert len(refreshed) == 397
+        # Untouched players carry over unchanged, pinned histograms included
+        other = refreshed.player_slice(other_id)
+        assert list(refreshed.stats["goals"][other]) == list(store.stats["goals"][store.player_slice(other_id)])
+        assert refreshed._histograms[(other_id, "disposals")] is store._histograms[(other_id, "disposals")]
+        assert refreshed.pinned_over_under(player_id, "disposals", 39.5, False) == (1, 1)
+
+        # No new commits: same store, nothing changed
+        assert refreshed.refreshed(conn) == (refreshed, set())
+
+        # Recomputing days since last game logs only the rows it changed
+        assert db.update_days_since_last_game() == 1
+        patched, changed = refreshed.refreshed(conn)
+        assert changed == {player_id}
+        assert patched.days_since_last_game[patched.player_slice(player_id)][-1] == 7
+        assert db.update_days_since_last_game() == 0
+        assert patched.refreshed(conn) == (patched, set())
+    finally:
+        conn.close()
+        db.close()
+    # get_stat_store goes through the same path
+    assert get_stat_store(schema_db).last_seq == patched.last_seq
+
+
+def test_pruned_change_log_forces_a_full_reload(schema_db):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        load_synthetic_round(db, 2023, 1)
+    store = get_stat_store(schema_db)
+    store.pin_histograms([(101, "disposals")])
+
+    game_id = db.get_or_create_game(
+        api_game_id=999999, season_year=2023, round_number=2, game_type="Regular Season",
+        game_date="2023-03-21", game_time="Night", venue_id=1,
+        home_team_id=1, away_team_id=2,
+    )
+    db.insert_player_stats(db.get_or_create_player("Player 101", 101), game_id, 1, 2, 1, "Home", "Night", disposals=40, goals=1)
+    seq = db.conn.execute("SELECT MAX(seq) FROM change_log").fetchone()[0]
+    db.prune_change_log(seq)
+    conn = connect_reader(schema_db)
+    try:
+        # The log is empty but the store missed the pruned entries: reload in full
+        refreshed, changed = store.refreshed(conn)
+        assert changed is None
+        assert len(refreshed) == 397
+        assert refreshed.last_seq == seq
+        assert refreshed.pinned == {(101, "disposals")}
+        # Caught up: nothing left to apply
+        assert refreshed.refreshed(conn) == (refreshed, set())
+    finally:
+        conn.close()
+        db.close()
+
+
+def test_writes_append_monotonic_change_log(schema_db):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        load_synthetic_round(db, 2023, 1)
+    seqs = [r["seq"] for r in db.conn.execute("SELECT seq FROM change_log ORDER BY rowid")]
+    assert seqs == sorted(seqs)
+    entities = dict(db.conn.execute("SELECT entity, COUNT(*) FROM change_log GROUP BY entity").fetchall())
+    # 396 players, 9 games, 396 stat rows; re-fetching a player logs nothing
+    assert entities == {"players": 396, "games": 9, "player_game_stats": 396}
+    assert db.prune_change_log(seqs[-1]) == len(seqs)
+    db.close()
+
+
+def test_cached_store_never_waits_on_a_load(schema_db):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        load_synthetic_round(db, 2023, 1)
+    assert cached_stat_store(schema_db) is None
+    store = get_stat_store(schema_db)
+    assert cached_stat_store(schema_db) is store
+
+    with db.bulk_load():
+        load_synthetic_round(db, 2023, 2)
+    # While a load holds the lock, lookups answer None at once instead of blocking
+    with stat_store._load_lock:
+        started = time.perf_counter()
+        assert cached_stat_store(schema_db) is None
+        assert cached_stat_store(schema_db) is None
+        assert time.perf_counter() - started < 0.5
+    # The background refresh picks the change up
+    deadline = time.time() + 5
+    while cached_stat_store(schema_db) in (None, store) and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(cached_stat_store(schema_db)) == 2 * 396
+    db.close()
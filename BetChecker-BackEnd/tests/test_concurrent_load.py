@@ -0,0 +1,70 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from conftest import load_synthetic_round
+from database.db_manager_api import DatabaseManager
+
+client = TestClient(main.app)
+
+# p95 latency the API must hold for /search/over-under during an ETL load
+P95_SLO_MS = 250
+ROUNDS_PER_SEASON = 23
+
+
+def test_api_meets_latency_slo_during_full_season_load(schema_db, monkeypatch):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        load_synthetic_round(db, 2023, 1)
+    db.close()
+    monkeypatch.setattr(main, "DB_PATH", schema_db)
+
+    errors = []
+
+    def weekly_loads():
+        writer = DatabaseManager(schema_db)
+        try:
+            for round_number in range(2, ROUNDS_PER_SEASON + 1):
+                with writer.bulk_load():
+                    load_synthetic_round(writer, 2023, round_number)
+            writer.checkpoint("TRUNCATE")
+        except Exception as e:  # surfaced in the main thread
+            errors.append(e)
+        finally:
+            writer.close()
+
+    loader = threading.Thread(target=weekly_loads)
+    loader.start()
+
+    latencies = []
+    statuses = []
+    params = {"player_name": "Player 101", "stat": "disposals", "threshold": 19.5}
+    while loader.is_alive():
+        start = time.perf_counter()
+        resp = client.get("/search/over-under", params=params)
+        latencies.append((time.perf_counter() - start) * 1000)
+        statuses.append(resp.status_code)
+    loader.join()
+
+    assert not errors
+    assert len(latencies) >= 10
+    assert set(statuses) == {200}
+    p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+    assert p95 < P95_SLO_MS
+
+    # The reader sees the whole season once the load commits
+    data = client.get("/search/over-under", params=params).json()
+    assert data["over"] + data["under"] == ROUNDS_PER_SEASON
+
+
+def test_writer_enables_wal_and_controls_checkpoints(schema_db):
+    db = DatabaseManager(schema_db)
+    assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert db.conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 0
+    with db.bulk_load():
+        load_synthetic_round(db, 2023, 1)
+    result = db.checkpoint("TRUNCATE")
+    assert result["busy"] is False
+    db.close()
@@ -0,0 +1,41 @@
+import sqlite3
+
+from scripts.api_sports_fixture_server import FixtureDataset
+from scripts.benchmark_etl import Profiler, benchmark, in_process_fetcher, regressions
+from database.api_sports_etl import determine_game_time, determine_game_type
+
+
+def test_game_time_and_type_mapping():
+    assert [determine_game_time(t) for t in ("14:00", "16:30", "19:20", None)] == ["Day", "Twilight", "Night", None]
+    assert determine_game_type("Regular Season") == "Regular Season"
+    assert determine_game_type("Qualifying Final") == "Finals"
+    assert determine_game_type("Pre-Season") == "Pre-Season"
+
+
+def test_benchmark_loads_fixture_seasons(tmp_path):
+    dataset = FixtureDataset.synthetic([2023, 2024], rounds=2)
+    result = benchmark(in_process_fetcher(dataset), [2023, 2024], tmp_path, Profiler(None, tmp_path))
+
+    # 2 seasons x 2 rounds x 9 games x 44 players
+    assert result["rows"] == 2 * 2 * 9 * 44
+    assert result["counts"]["games"] == 36 and result["counts"]["skipped_stats"] == 0
+    # teams once, 18 rosters + games + 2 statistics batches per season
+    assert result["requests"] == 1 + 2 * (18 + 1 + 2)
+    # One bulk_load commit per season, one for days_since_last_game
+    assert result["commits"] == 3
+    assert result["wal_frames"] > 0 and result["fsyncs"] == 2
+    assert set(result["seconds"]) == {"extract", "transform", "load", "finalize"}
+
+    conn = sqlite3.connect(tmp_path / "etl_2.db")
+    rest = conn.execute(
+        """SELECT g.game_date, pgs.days_since_last_game FROM player_game_stats pgs
+           JOIN games g USING (game_id) JOIN players p USING (player_id)
+           WHERE p.api_player_id = 4001 ORDER BY g.game_date"""
+    ).fetchall()
+    conn.close()
+    assert [days for _, days in rest][:2] == [None, 7]
+    assert len(rest) == 4
+
+    slower = {**result, "rows_per_second": {k: (v or 0) / 2 for k, v in result["rows_per_second"].items()}}
+    assert regressions([slower], [result], 0.2)
+    assert not regressions([result], [result], 0.2)
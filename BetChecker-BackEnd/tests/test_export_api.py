@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from conftest import load_synthetic_round
+import app.main as main
+from app.export import EXPORT_COLUMNS, iter_rows
+from database.db_manager_api import DatabaseManager
+
+client = TestClient(main.app)
+
+
+def _ndjson(resp):
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def test_player_games_ndjson_csv_and_filters():
+    resp = client.get("/players/1/games")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = _ndjson(resp)
+    assert [r["disposals"] for r in rows] == [32, 29]
+    assert rows[0]["game_date"] < rows[1]["game_date"]
+    assert set(rows[0]) == set(EXPORT_COLUMNS)
+
+    resp = client.get("/players/1/games", params={"format": "csv", "opponent_name": rows[1]["opponent_name"]})
+    assert resp.headers["content-type"].startswith("text/csv")
+    parsed = list(csv.DictReader(io.StringIO(resp.text)))
+    assert [r["disposals"] for r in parsed] == ["29"]
+
+    resp = client.get("/players/1/games", params={"format": "csv", "end_date": "1900-01-01"})
+    assert resp.text.strip() == ",".join(EXPORT_COLUMNS)
+
+    assert client.get("/players/999999/games").status_code == 404
+    assert client.get("/players/1/games", params={"location": "Neutral"}).status_code == 400
+    assert client.get("/players/1/games", params={"format": "xml"}).status_code == 400
+    assert client.get("/players/1/games", params={"after": "bad"}).status_code == 400
+
+
+def test_export_keyset_pages_cover_every_row_once(schema_db, monkeypatch):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        for round_number in (1, 2, 3):
+            load_synthetic_round(db, 2023, round_number)
+    db.close()
+    monkeypatch.setattr(main, "DB_PATH", schema_db)
+
+    full = _ndjson(client.get("/export/games"))
+    assert len(full) == 396 * 3
+    keys = [(r["game_date"], r["game_id"], r["stat_id"]) for r in full]
+    assert keys == sorted(keys)
+
+    pages, after = [], None
+    while True:
+        params = {"limit": 500}
+        if after:
+            params["after"] = after
+        page = _ndjson(client.get("/export/games", params=params))
+        pages.extend(page)
+        if len(page) < 500:
+            break
+        last = page[-1]
+        after = f"{last['game_date']},{last['game_id']},{last['stat_id']}"
+    assert pages == full
+
+    # Small chunks give the same rows as one big one
+    chunked = [r["stat_id"] for r in iter_rows(schema_db, [], {}, chunk_size=7)]
+    assert chunked == [r["stat_id"] for r in full]
+
+    home = _ndjson(client.get("/export/games", params={"location": "Home", "season_year": 2023}))
+    assert len(home) == len(full) // 2
+    assert {r["location"] for r in home} == {"Home"}
@@ -0,0 +1,68 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from scripts.api_sports_fixture_server import FaultInjector, FixtureDataset, create_app
+
+KEY = {"x-rapidapi-key": "test"}
+
+
+def test_synthetic_league_serves_documented_shapes():
+    client = TestClient(create_app(FixtureDataset.synthetic([2023], rounds=2)))
+
+    teams = client.get("/teams", headers=KEY).json()
+    assert teams["get"] == "teams" and teams["results"] == 18
+
+    players = client.get("/players", params={"team": 4, "season": 2023}, headers=KEY).json()
+    assert players["results"] == 22
+    assert set(players["response"][0]) == {"id", "name"}
+
+    games = client.get("/games", params={"season": 2023, "league": 1}, headers=KEY).json()
+    assert games["results"] == 18
+    game = games["response"][0]
+    assert game["league"] == {"id": 1, "season": 2023}
+    assert game["round"] == "Regular Season" and game["week"] == 1
+
+    stats = client.get("/games/statistics/players", params={"id": game["game"]["id"]}, headers=KEY).json()
+    item = stats["response"][0]
+    assert [t["team"]["id"] for t in item["teams"]] == [game["teams"]["home"]["id"], game["teams"]["away"]["id"]]
+    line = item["teams"][0]["players"][0]
+    assert line["disposals"] == line["kicks"] + line["handballs"]
+    assert "total" in line["goals"]
+
+    # Same errors-in-body behaviour as the real API
+    missing = client.get("/teams").json()
+    assert missing["errors"] and missing["results"] == 0
+    assert client.get("/players", headers=KEY).json()["errors"]
+
+
+def test_recorded_fixtures_are_replayed(tmp_path):
+    recorded = {
+        "get": "games/statistics/players",
+        "parameters": {"id": "2524"},
+        "results": 1,
+        "response": [{"game": {"id": 2524}, "teams": []}],
+    }
+    (tmp_path / "stats_2524.json").write_text(json.dumps(recorded))
+    client = TestClient(create_app(FixtureDataset.from_directory(tmp_path)))
+    body = client.get("/games/statistics/players", params={"id": 2524}, headers=KEY).json()
+    assert body["response"] == recorded["response"]
+
+
+def test_rate_limit_and_error_injection():
+    now = [0.0]
+    faults = FaultInjector(rate_limit_per_minute=3, clock=lambda: now[0])
+    client = TestClient(create_app(FixtureDataset.synthetic([2023], rounds=1), faults))
+
+    statuses = [client.get("/teams", headers=KEY).status_code for _ in range(5)]
+    assert statuses == [200, 200, 200, 429, 429]
+    throttled = client.get("/teams", headers=KEY)
+    assert throttled.headers["retry-after"] == "1"
+    assert throttled.headers["x-ratelimit-requests-remaining"] == "0"
+
+    now[0] = 61.0
+    assert client.get("/teams", headers=KEY).status_code == 200
+    assert client.get("/_stats").json() == {"requests": 7, "throttled": 3}
+
+    flaky = TestClient(create_app(FixtureDataset(), FaultInjector(error_rate=1.0)))
+    assert flaky.get("/teams", headers=KEY).status_code == 429
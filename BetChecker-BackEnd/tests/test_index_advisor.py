@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from scripts.index_advisor import IndexAdvisor, copy_to_memory, load_example_workload
+
+from conftest import SCHEMA_DIR
+
+WORKLOAD = [("by api id", "SELECT player_id FROM players WHERE api_player_id = ?", (1,))]
+
+
+def test_failed_statements_are_listed_and_skipped(schema_db):
+    report = IndexAdvisor(schema_db, WORKLOAD, repeat=1).analyze()
+    assert report["failed"] == []
+    assert "idx_games_date" in report["unused"]
+
+    broken = WORKLOAD + [("stale example", "SELECT round_name FROM games", ())]
+    report = IndexAdvisor(schema_db, broken, repeat=1).analyze()
+    assert report["failed"] == ["stale example"]
+    # Usage still comes from the statements that ran
+    assert "idx_games_date" in report["unused"]
+    assert "--   stale example" in IndexAdvisor.migration_sql(report)
+
+
+def test_example_queries_match_schema(schema_db):
+    conn = copy_to_memory(schema_db)
+    for name, sql, params in load_example_workload(Path(SCHEMA_DIR) / "example_queries.sql"):
+        conn.execute(sql, params).fetchall()
+    conn.close()
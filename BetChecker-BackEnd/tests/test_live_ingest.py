@@ -0,0 +1,148 @@
+import copy
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.stat_store import get_stat_store
+from database.api_sports_etl import extract_season, load_season, transform_season
+from database.connection import connect_reader
+from database.db_manager_api import DatabaseManager
+from database.live_ingest import LivePoller, RateLimited
+from scripts.api_sports_fixture_server import FixtureDataset, create_app
+
+KEY = {"x-apisports-key": "test"}
+
+
+def _fetcher(dataset):
+    client = TestClient(create_app(dataset))
+
+    def fetch(endpoint: str, params: dict) -> dict:
+        response = client.get(f"/{endpoint}", params=params, headers=KEY)
+        response.raise_for_status()
+        return response.json()
+    return fetch
+
+
+def _set_progress(dataset, full, api_game_id, status, fraction):
+    """Put a fixture game at `status` with `fraction` of its final stats"""
+    game = next(g for g in dataset.games if g["game"]["id"] == api_game_id)
+    game["status"] = {"long": status, "short": status}
+    item = copy.deepcopy(full[api_game_id])
+    for team in item["teams"]:
+        for line in team["players"]:
+            line["disposals"] = int(line["disposals"] * fraction)
+            line["goals"]["total"] = int(line["goals"]["total"] * fraction)
+    dataset.statistics[api_game_id] = item
+
+
+def test_live_totals_are_upserted_then_promoted(schema_db, monkeypatch):
+    dataset = FixtureDataset.synthetic([2023], rounds=2)
+    full = copy.deepcopy(dataset.statistics)
+    fetch = _fetcher(dataset)
+
+    db = DatabaseManager(schema_db)
+    # Round 1 is history; round 2 is being played
+    transformed = transform_season(extract_season(fetch, 2023))
+    played = {g["api_game_id"] for g in transformed["games"] if g["round_number"] == 1}
+    load_season(db, {
+        **transformed,
+        "games": [g for g in transformed["games"] if g["api_game_id"] in played],
+        "stats": [r for r in transformed["stats"] if r["api_game_id"] in played],
+    })
+    db.update_days_since_last_game()
+    get_stat_store(schema_db)
+
+    live_games = [g for g in dataset.games if g["week"] == 2]
+    first, second = live_games[0]["game"]["id"], live_games[1]["game"]["id"]
+    for api_game in live_games:
+        _set_progress(dataset, full, api_game["game"]["id"], "Q2", 0.5)
+    live_games[-1]["status"] = {"long": "Not Started", "short": "NS"}
+
+    poller = LivePoller(db, fetch, "2023-03-21", requests_per_minute=10, min_interval=0)
+    result = poller.poll_once()
+    assert result["in_play"] == 8 and result["changed"] == 8 * 44
+    # One status call plus one statistics call covering 8 ids
+    assert result["requests"] == 2
+    assert poller.interval() == 12.0
+
+    game_id = poller._games[first]["game_id"]
+    home_api = live_games[0]["teams"]["home"]["id"]
+    home = poller._games[first]["team_ids"][home_api]
+    expected = sum(int(line["disposals"] * 0.5) for line in full[first]["teams"][0]["players"])
+    assert poller.aggregates.team_totals(game_id)[home]["disposals"] == expected
+
+    # Nothing moved: nothing rewritten
+    assert poller.poll_once()["changed"] == 0
+
+    # One player's line moves; the team total is patched by the delta
+    line = dataset.statistics[first]["teams"][0]["players"][0]
+    line["disposals"] += 3
+    assert poller.poll_once()["changed"] == 1
+    assert poller.aggregates.team_totals(game_id)[home]["disposals"] == expected + 3
+
+    monkeypatch.setattr(main, "DB_PATH", schema_db)
+    client = TestClient(main.app)
+    live = client.get(f"/live/{game_id}").json()
+    assert {t["team_id"]: t["disposals"] for t in live["teams"]}[home] == expected + 3
+    assert len(live["players"]) == 44
+
+    # Full time for the second game: its final totals are promoted
+    before = get_stat_store(schema_db)
+    _set_progress(dataset, full, second, "FT", 1.0)
+    promoted_id = poller._games[second]["game_id"]
+    result = poller.poll_once()
+    assert result["promoted"] == {promoted_id: 44}
+    assert result["in_play"] == 7
+
+    conn = connect_reader(schema_db)
+    try:
+        store, changed = before.refreshed(conn)
+    finally:
+        conn.close()
+    # Patched per player from the change log, not reloaded
+    assert changed is not None and len(changed) == 44
+    finals = db.conn.execute(
+        "SELECT SUM(disposals) FROM player_game_stats WHERE game_id = ?", (promoted_id,)
+    ).fetchone()[0]
+    assert finals == sum(line["disposals"] for team in full[second]["teams"] for line in team["players"])
+    assert len(store) == 396 + 44
+    days = db.conn.execute(
+        "SELECT DISTINCT days_since_last_game FROM player_game_stats WHERE game_id = ?", (promoted_id,)
+    ).fetchall()
+    assert [row[0] for row in days] == [7]
+    assert client.get(f"/live/{promoted_id}").status_code == 404
+    assert client.get(f"/live/{game_id}").status_code == 200
+
+    # A restarted poller resumes from the provisional table
+    restarted = LivePoller(db, fetch, "2023-03-21", min_interval=0)
+    assert restarted.aggregates.team_totals(game_id)[home]["disposals"] == expected + 3
+    db.close()
+
+
+def test_poll_interval_respects_budget_and_backs_off_on_429(schema_db):
+    db = DatabaseManager(schema_db)
+    now = [0.0]
+    calls = []
+
+    def fetch(endpoint, params):
+        calls.append(endpoint)
+        if len(calls) == 1:
+            raise RateLimited(5)
+        return {"get": endpoint, "errors": [], "response": []}
+
+    poller = LivePoller(
+        db, fetch, "2023-03-14", requests_per_minute=10, min_interval=30,
+        request_budget=11, session_minutes=60, clock=lambda: now[0],
+    )
+    poller.last_poll_requests = 2
+    # 11 requests is 5 two-request polls over the hour
+    assert poller.interval() == 720.0
+    poller.requests = 10
+    assert poller.interval() == float("inf")
+
+    poller.requests = 0
+    sleeps = []
+    # No games that day: one 429 back-off, then a poll that finds nothing to do
+    assert poller.run(sleep=sleeps.append, log=lambda message: None) == 1
+    assert sleeps == [5]
+    db.close()
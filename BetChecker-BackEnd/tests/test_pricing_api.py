@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import load_synthetic_round
+import app.main as main
+from app.pricing import implied_probabilities, wilson_interval, z_score
+from app.stat_store import get_stat_store
+from database.db_manager_api import DatabaseManager
+
+client = TestClient(main.app)
+
+
+def test_wilson_and_implied_probabilities():
+    low, high = wilson_interval(np.array([8, 0]), np.array([10, 0]), z_score(0.95))
+    assert low[0] == pytest.approx(0.4902, abs=1e-4)
+    assert high[0] == pytest.approx(0.9433, abs=1e-4)
+    assert np.isnan(low[1])
+
+    implied = implied_probabilities(np.array([1.8]), np.array([2.0]))
+    assert implied["overround"][0] == pytest.approx(1 / 1.8 + 0.5 - 1)
+    assert implied["fair_over"][0] == pytest.approx((1 / 1.8) / (1 / 1.8 + 0.5))
+
+
+def test_price_markets_endpoint():
+    body = {
+        "markets": [
+            {"player_name": "Scott Pendlebury", "stat": "disposals", "line": 29.5, "over_odds": 1.9, "under_odds": 1.9},
+            {"player_id": 4, "stat": "goals", "line": 1.5, "over_odds": 1.5, "under_odds": 2.5},
+            {"player_id": 999999, "stat": "goals", "line": 0.5, "over_odds": 1.2, "under_odds": 4.0},
+        ]
+    }
+    resp = client.post("/markets/price", json=body)
+    assert resp.status_code == 200
+    pendles, martin, unknown = resp.json()["markets"]
+
+    assert (pendles["player_id"], pendles["over"], pendles["under"]) == (1, 1, 1)
+    assert pendles["empirical_over"] == 0.5
+    assert pendles["fair_over"] == pytest.approx(0.5)
+    assert pendles["ev_over"] == pytest.approx(0.5 * 1.9 - 1)
+    assert pendles["posterior_over"] == pytest.approx(0.5)
+
+    assert (martin["over"], martin["games"]) == (1, 1)
+    assert martin["ev_over"] == pytest.approx(0.5)
+    assert martin["ci_low"] < 1 and martin["ci_high"] == pytest.approx(1.0)
+
+    assert unknown["games"] == 0
+    assert unknown["empirical_over"] is None and unknown["ev_over"] is None
+
+    bad = {"markets": [{**body["markets"][1], "over_odds": 0.9}]}
+    assert client.post("/markets/price", json=bad).status_code == 400
+
+
+def test_over_under_pairs_match_sql(schema_db, monkeypatch):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        for round_number in (1, 2, 3, 4):
+            load_synthetic_round(db, 2023, round_number)
+    db.close()
+    monkeypatch.setattr(main, "DB_PATH", schema_db)
+
+    rng = np.random.default_rng(3)
+    store = get_stat_store(schema_db)
+    player_ids = rng.choice(np.unique(store.player_id), size=60)
+    lines = rng.choice([0.5, 4.5, 12.5, 20, 29.5, 40.5], size=60)
+    over, under = store.over_under_pairs(player_ids, "disposals", lines, False)
+
+    conn = main.get_connection()
+    try:
+        sql = main.over_under_sql("disposals", False)
+        for pid, line, o, u in zip(player_ids, lines, over, under):
+            row = conn.execute(sql, {"player_id": int(pid), "threshold": float(line)}).fetchone()
+            assert (o, u) == (row["over"], row["under"])
+    finally:
+        conn.close()
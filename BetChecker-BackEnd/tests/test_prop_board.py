@@ -0,0 +1,84 @@
+import gzip
+import json
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from conftest import TEAMS_PER_SEASON, load_synthetic_round
+import app.main as main
+from app.prop_board import BOARD_LINES, build_board, upcoming_round, write_board
+from app.stat_store import StatStore
+from database.db_manager_api import DatabaseManager
+
+client = TestClient(main.app)
+
+
+def _schedule_round(db, season: int, round_number: int):
+    """Fixtures for a round that hasn't been played: games only, no stats"""
+    team_ids = [db.get_or_create_team(f"Team {t}", api_team_id=t) for t in range(1, TEAMS_PER_SEASON + 1)]
+    venue_id = db.get_or_create_venue("Venue 0")
+    game_date = date(season, 3, 14) + timedelta(days=7 * (round_number - 1))
+    for g in range(TEAMS_PER_SEASON // 2):
+        db.get_or_create_game(
+            api_game_id=season * 1000 + round_number * 10 + g,
+            season_year=season,
+            round_number=round_number,
+            game_type="Regular Season",
+            game_date=game_date.isoformat(),
+            game_time="Night",
+            venue_id=venue_id,
+            home_team_id=team_ids[(g + round_number) % TEAMS_PER_SEASON],
+            away_team_id=team_ids[(TEAMS_PER_SEASON - 1 - g + round_number) % TEAMS_PER_SEASON],
+        )
+
+
+def test_board_is_built_and_served(schema_db, tmp_path, monkeypatch):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        for round_number in range(1, 7):
+            load_synthetic_round(db, 2023, round_number)
+        _schedule_round(db, 2023, 7)
+    db.close()
+    monkeypatch.setattr(main, "DB_PATH", schema_db)
+    monkeypatch.setattr(main, "BOARD_DIR", str(tmp_path))
+
+    conn = main.get_connection()
+    try:
+        assert upcoming_round(conn, date(2023, 4, 20)) == (2023, 7)
+        store = StatStore.from_connection(conn)
+        board = build_board(conn, store, 2023, 7)
+        write_board(board, str(tmp_path))
+
+        assert len(board["games"]) == 9
+        assert len(board["players"]) == 9 * 2 * 22
+        player = board["players"][0]
+        line = BOARD_LINES["disposals"].index(20.5)
+        overall = player["splits"]["all"]
+        row = conn.execute(
+            main.over_under_sql("disposals", False), {"player_id": player["player_id"], "threshold": 20.5}
+        ).fetchone()
+        assert (overall["disposals"]["over"][line], overall["disposals"]["under"][line]) == (row["over"], row["under"])
+        assert overall["games"] == 6
+        assert player["splits"]["last_5"]["games"] == 5
+        assert player["splits"]["season"]["games"] == 6
+        rate = overall["disposals"]["hit_rate"][line]
+        assert rate == round(row["over"] / 6, 3)
+    finally:
+        conn.close()
+
+    resp = client.get("/board/7", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    served = resp.json()
+    assert served["round"] == 7 and served["season"] == 2023
+    assert served["players"] == board["players"]
+
+    plain = client.get("/board/7", params={"season": 2023}, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert json.loads(plain.content) == json.loads(gzip.decompress((tmp_path / "board-2023-r7.json.gz").read_bytes()))
+    # A refused or unknown coding is not gzip
+    for header in ("gzip;q=0", "x-gzip", "gzip;q=0, *"):
+        resp = client.get("/board/7", headers={"Accept-Encoding": header})
+        assert "content-encoding" not in resp.headers
+
+    assert client.get("/board/8").status_code == 404
@@ -0,0 +1,136 @@
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.rate_limit import ClientRateLimiter, LoadShedder
+
+client = TestClient(main.app)
+
+PARAMS = {"player_id": 1, "stat": "disposals", "threshold": 20.5}
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_and_sliding_window():
+    clock = FakeClock(6000.0)
+    limiter = ClientRateLimiter(rate=2, burst=4, window_limit=10, window_seconds=60, clock=clock)
+
+    # A burst of 4, then one request per half second
+    assert [limiter.check("a").allowed for _ in range(5)] == [True] * 4 + [False]
+    assert limiter.check("a").retry_after == 0.5
+    assert limiter.check("b").allowed
+    clock.now += 0.5
+    assert limiter.check("a").allowed
+
+    # The window caps sustained use even with tokens to spare
+    for _ in range(5):
+        clock.now += 1
+        assert limiter.check("a").allowed
+    clock.now += 5
+    verdict = limiter.check("a")
+    assert not verdict.allowed and verdict.remaining == 0 and verdict.usage == 1
+    # Nothing from the previous window to slide out: wait for the next one
+    assert verdict.retry_after == 6060 - clock.now
+
+    # 30s into the next window half of the previous 10 still count
+    clock.now = 6090.0
+    verdict = limiter.check("a")
+    assert verdict.allowed and verdict.remaining == 4
+    for _ in range(4):
+        clock.now += 0.5
+        assert limiter.check("a").allowed
+    verdict = limiter.check("a")
+    assert not verdict.allowed and 0 < verdict.retry_after <= 6
+    assert limiter.stats()["clients"] == 2
+
+
+def test_clients_past_max_clients_are_evicted_oldest_first():
+    limiter = ClientRateLimiter(rate=1, burst=1, window_limit=100, max_clients=2, clock=FakeClock())
+    assert limiter.check("a").allowed and limiter.check("b").allowed
+    assert not limiter.check("a").allowed
+    limiter.check("c")
+    assert limiter.stats()["clients"] == 2
+    # b was least recently seen, so it starts again with a full bucket
+    assert limiter.check("b").allowed
+    assert not limiter.check("c").allowed
+
+
+def test_shedder_backs_off_bulk_and_recovers():
+    clock = FakeClock()
+    shedder = LoadShedder(latency_target=0.1, max_in_flight=100, step=0.25, clock=clock, rng=lambda: 0.4)
+    for _ in range(3):
+        assert shedder.admit(bulk=False)
+        shedder.finished(0.5, bulk=False)
+    # The average crosses the target on the second slow request
+    assert shedder.overloaded() and shedder.shed_fraction == 0.5
+    assert not shedder.admit(bulk=True)
+    assert shedder.admit(bulk=False)
+    shedder.finished(0.5, bulk=False)
+
+    # Fast interactive requests bring the average back under target and the shed share down
+    for _ in range(40):
+        shedder.admit(bulk=False)
+        shedder.finished(0.001, bulk=False)
+    assert not shedder.overloaded() and shedder.shed_fraction == 0
+    assert shedder.admit(bulk=True)
+    shedder.finished(5.0, bulk=True)
+    assert shedder.latency < 0.1
+
+    # A queue over max_in_flight counts as overload too
+    busy = LoadShedder(latency_target=1.0, max_in_flight=1, clock=clock)
+    assert all(busy.admit(bulk=True) for _ in range(3))
+    busy.finished(0.01, bulk=True)
+    assert busy.shed_fraction > 0
+    assert busy.stats()["shed_fraction"] == busy.shed_fraction
+
+
+def test_api_answers_429_per_client(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(main, "rate_limiter", ClientRateLimiter(rate=1, burst=3, window_limit=100, clock=clock))
+    monkeypatch.setattr(main, "API_KEYS", frozenset({"partner"}))
+
+    statuses = [client.get("/search/over-under", params=PARAMS).status_code for _ in range(4)]
+    assert statuses == [200, 200, 200, 429]
+    limited = client.get("/search/over-under", params=PARAMS, headers={"Origin": "https://example.com"})
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "1"
+    assert limited.headers["access-control-allow-origin"]
+    assert "Rate limit exceeded" in limited.json()["detail"]
+
+    # Known keys have their own quota; probes are never limited
+    keyed = client.get("/search/over-under", params=PARAMS, headers={"X-API-Key": "partner"})
+    assert keyed.status_code == 200
+    assert keyed.headers["X-RateLimit-Limit"] == "100"
+    assert client.get("/ready").status_code != 429
+
+    # Unknown keys fall back to the IP's quota, so rotating them gains nothing
+    rotated = [
+        client.get("/search/over-under", params=PARAMS, headers={"X-API-Key": f"random-{i}"}).status_code
+        for i in range(4)
+    ]
+    assert rotated == [429] * 4
+    assert main.rate_limiter.stats()["clients"] == 2
+
+    clock.now += 2
+    assert client.get("/search/over-under", params=PARAMS).status_code == 200
+    assert client.get("/admin/metrics", headers={"X-API-Key": "partner"}).json()["rate_limit"]["limited"] == 6
+
+
+def test_api_sheds_bulk_requests_under_load(monkeypatch):
+    shedder = LoadShedder(latency_target=0.1, max_in_flight=32, rng=lambda: 0.0)
+    shedder.shed_fraction = 0.5
+    monkeypatch.setattr(main, "load_shedder", shedder)
+
+    shed = client.get("/export/games")
+    assert shed.status_code == 429
+    assert "bulk request shed" in shed.json()["detail"]
+    # One player's game log is interactive
+    assert client.get("/players/1/games", params={"limit": 5}).status_code == 200
+    assert client.get("/search/over-under", params=PARAMS, headers={"X-Priority": "bulk"}).status_code == 429
+    assert client.get("/search/over-under", params=PARAMS).status_code == 200
+    assert shedder.shed == 2 and shedder.in_flight == 0
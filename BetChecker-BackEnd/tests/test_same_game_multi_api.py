@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+
+from app.main import app  # noqa: E402
+
+client = TestClient(app)
+
+
+def test_teammates_same_game_multi_counts_shared_games_only():
+    body = {
+        "legs": [
+            {"player_name": "Scott Pendlebury", "stat": "disposals", "threshold": 30},
+            {"player_name": "Steele Sidebottom", "stat": "disposals", "threshold": 25},
+        ],
+        "relationship": "teammates",
+    }
+    resp = client.post("/search/same-game-multi", json=body)
+    assert resp.status_code == 200
+    data = resp.json()
+    # Pendlebury played two games, but only one alongside Sidebottom
+    assert data["games_together"] == 1
+    assert data["all_hit"] == 1
+    assert [leg["hits"] for leg in data["legs"]] == [1, 1]
+
+
+def test_opponents_relationship_and_partial_hits():
+    legs = [
+        {"player_name": "Dustin Martin", "stat": "goals", "threshold": 2.5},
+        {"player_name": "Patrick Dangerfield", "stat": "goals", "threshold": 2.5},
+    ]
+    resp = client.post("/search/same-game-multi", json={"legs": legs, "relationship": "opponents"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["games_together"] == 1
+    assert data["all_hit"] == 0
+    assert [leg["hits"] for leg in data["legs"]] == [0, 1]
+
+    resp = client.post("/search/same-game-multi", json={"legs": legs, "relationship": "teammates"})
+    assert resp.json()["games_together"] == 0
+
+
+def test_same_game_multi_requires_two_legs():
+    body = {"legs": [{"player_id": 1, "stat": "goals", "threshold": 1}]}
+    assert client.post("/search/same-game-multi", json=body).status_code == 400
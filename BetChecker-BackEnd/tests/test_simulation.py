@@ -0,0 +1,76 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from conftest import load_synthetic_round
+import app.main as main
+from app.simulation import joint_outcomes, shared_games, simulate
+from app.stat_store import get_stat_store
+from database.db_manager_api import DatabaseManager
+
+client = TestClient(main.app)
+
+
+def _load(schema_db, rounds=12):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        for round_number in range(1, rounds + 1):
+            load_synthetic_round(db, 2023, round_number)
+    ids = {api_id: db.get_player_id(api_id) for api_id in (101, 102)}
+    db.close()
+    return ids
+
+
+def test_simulated_legs_match_history_and_keep_correlation(schema_db, monkeypatch):
+    ids = _load(schema_db)
+    monkeypatch.setattr(main, "DB_PATH", schema_db)
+
+    leg = {"player_id": ids[101], "stat": "disposals", "line": 15.5}
+    body = {"legs": [leg, {**leg, "line": 10.5}], "trials": 120_000, "seed": 7}
+    resp = client.post("/simulate", json=body)
+    assert resp.status_code == 200
+    result = resp.json()
+    assert result["games"] == 12 and result["trials"] == 120_000 and result["replicates"] == 10_000
+
+    with main.get_connection() as conn:
+        row = conn.execute(main.over_under_sql("disposals", False), {"player_id": ids[101], "threshold": 15.5}).fetchone()
+    empirical = row["over"] / 12
+    first = result["legs"][0]
+    assert abs(first["probability"] - empirical) < 0.01
+    assert first["ci_low"] <= empirical <= first["ci_high"]
+
+    # Over 15.5 implies over 10.5: the pair lands exactly as often as the
+    # stricter leg, which multiplying the legs would understate
+    assert abs(result["combined"]["probability"] - first["probability"]) < 1e-12
+    assert result["lift"] > 1
+    assert result["fair_odds"] == 1 / result["combined"]["probability"]
+
+    # Same seed, same numbers; without one the seed used comes back
+    assert client.post("/simulate", json=body).json() == result
+    unseeded = client.post("/simulate", json={**body, "seed": None}).json()
+    assert client.post("/simulate", json={**body, "seed": unseeded["seed"]}).json() == unseeded
+
+    teammates = client.post("/simulate", json={
+        "legs": [leg, {"player_id": ids[102], "stat": "goals", "line": 1.5, "side": "under"}],
+        "half_life_days": 30,
+    }).json()
+    assert teammates["games"] == 12 and len(teammates["legs"]) == 2
+
+    assert client.post("/simulate", json={"legs": [{**leg, "side": "sideways"}]}).status_code == 400
+    assert client.post("/simulate", json={"legs": [leg], "trials": 0}).status_code == 400
+    assert client.post("/simulate", json={"legs": [leg], "seed": -1}).status_code == 400
+
+
+def test_process_pool_gives_the_same_result(schema_db):
+    ids = _load(schema_db, rounds=6)
+    store = get_stat_store(schema_db)
+    players = [ids[101], ids[102]]
+    games = shared_games(store, players)
+    outcomes = joint_outcomes(store, games, [(ids[101], "disposals", 12.5, "over"), (ids[102], "goals", 0.5, "over")], False)
+
+    serial = simulate(outcomes, 600_000, seed=42)
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pooled = simulate(outcomes, 600_000, seed=42, executor=pool)
+    assert pooled == serial
+    assert serial["games"] == 6
@@ -0,0 +1,100 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        futures = [pool.submit(flights.do, "key", slow) for _ in range(20)]
+        # Let every follower attach before the leader finishes
+        deadline = time.time() + 5
+        while flights.coalesced < 19 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert results == ["result"] * 20
+    assert len(calls) == 1
+    stats = flights.stats()
+    assert (stats["executed"], stats["coalesced"], stats["in_flight"]) == (1, 19, 0)
+
+    # Nothing is cached once the flight lands
+    assert flights.do("key", lambda: "fresh") == "fresh"
+    assert flights.executed == 2
+
+
+def test_followers_receive_the_leaders_exception():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights.do, "k", failing)
+        started.wait(5)
+        follower = pool.submit(flights.do, "k", lambda: "never runs")
+        while flights.coalesced < 1:
+            time.sleep(0.01)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+    assert flights.errors == 1
+
+
+def test_identical_over_under_requests_are_coalesced(monkeypatch):
+    client = TestClient(main.app)
+    monkeypatch.setattr(main, "search_flights", SingleFlight())
+    original = main._over_under_counts
+
+    def slow_counts(*args):
+        time.sleep(0.2)
+        return original(*args)
+
+    monkeypatch.setattr(main, "_over_under_counts", slow_counts)
+    params = {"player_id": 1, "stat": "disposals", "threshold": 30}
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(lambda _: client.get("/search/over-under", params=params), range(8)))
+
+    assert all(r.json() == {"over": 1, "under": 1} for r in responses)
+    monkeypatch.setattr(main, "API_KEYS", frozenset({"ops"}))
+    flights = client.get("/admin/metrics", headers={"X-API-Key": "ops"}).json()["single_flight"]
+    assert flights["executed"] + flights["coalesced"] == 8
+    assert flights["coalesced"] >= 1
+
+
+def test_names_resolving_differently_never_share_a_flight(monkeypatch):
+    client = TestClient(main.app)
+    monkeypatch.setattr(main, "search_flights", SingleFlight())
+    original = main._over_under_counts
+
+    def slow_counts(*args):
+        time.sleep(0.2)
+        return original(*args)
+
+    monkeypatch.setattr(main, "_over_under_counts", slow_counts)
+    names = ["Scott Pendlebury", "Scott Pendlebury "] * 3
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        responses = list(pool.map(
+            lambda name: client.get("/search/over-under", params={"player_name": name, "stat": "goals", "threshold": 1}),
+            names,
+        ))
+    assert [r.status_code for r in responses] == [200, 404] * 3
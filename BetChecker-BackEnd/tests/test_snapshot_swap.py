@@ -0,0 +1,71 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from conftest import create_schema_db, load_synthetic_round
+from database.db_manager_api import DatabaseManager
+from database.snapshots import SnapshotManager, SnapshotPointer, SnapshotValidationError
+
+client = TestClient(main.app)
+
+PARAMS = {"player_name": "Player 101", "stat": "goals", "threshold": 0.5}
+
+
+def _load_rounds(path, rounds):
+    db = DatabaseManager(path)
+    with db.bulk_load():
+        for round_number in rounds:
+            load_synthetic_round(db, 2023, round_number)
+    db.close()
+
+
+def _games_played():
+    data = client.get("/search/over-under", params=PARAMS).json()
+    return data["over"] + data["under"]
+
+
+def test_publish_swaps_api_to_new_snapshot_without_restart(tmp_path, monkeypatch):
+    manager = SnapshotManager(str(tmp_path))
+    monkeypatch.setattr(main, "_db_pointer", SnapshotPointer(manager.pointer_path))
+
+    base = create_schema_db(str(tmp_path / "seed.db"))
+    v1 = manager.begin(base_path=base)
+    _load_rounds(v1, [1])
+    assert manager.publish(v1) == 1
+    assert main.current_db_path() == v1
+    assert _games_played() == 1
+
+    # Next week's load goes into a copy while v1 keeps serving
+    v2 = manager.begin()
+    assert v2 != v1
+    _load_rounds(v2, [2, 3])
+    assert _games_played() == 1
+
+    assert manager.publish(v2) == 2
+    assert main.current_db_path() == v2
+    assert _games_played() == 3
+
+    # Older snapshots are pruned, the published one never is
+    assert manager.prune(keep=1) == [v1]
+    assert not os.path.exists(v1)
+    assert _games_played() == 3
+
+
+def test_publish_rejects_snapshot_that_fails_validation(tmp_path):
+    manager = SnapshotManager(str(tmp_path))
+    v1 = manager.begin(base_path=create_schema_db(str(tmp_path / "seed.db")))
+    _load_rounds(v1, [1])
+    manager.publish(v1)
+
+    v2 = manager.begin()
+    db = DatabaseManager(v2)
+    db.conn.execute("UPDATE player_game_stats SET opponent_team_id = team_id WHERE stat_id = 1")
+    db.conn.commit()
+    db.close()
+
+    with pytest.raises(SnapshotValidationError) as excinfo:
+        manager.publish(v2)
+    assert [f["test"] for f in excinfo.value.failures] == ["Invalid Opponent Teams"]
+    assert manager.current()["path"] == v1
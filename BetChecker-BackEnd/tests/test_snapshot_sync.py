@@ -0,0 +1,111 @@
+import functools
+import json
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from conftest import create_schema_db, load_synthetic_round
+from database.db_manager_api import DatabaseManager
+from database.snapshot_sync import (
+    BLOCKS_DIR,
+    DirectoryTransport,
+    HttpTransport,
+    SnapshotPuller,
+    SnapshotSyncError,
+    manifest_name,
+)
+from database.snapshots import SnapshotManager, SnapshotPointer
+
+client = TestClient(main.app)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def _publish_rounds(manager, rounds, base_path=None):
+    path = manager.begin(base_path=base_path)
+    db = DatabaseManager(path)
+    with db.bulk_load():
+        for round_number in rounds:
+            load_synthetic_round(db, 2023, round_number)
+    db.close()
+    return manager.publish(path)
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_nodes_fetch_only_changed_blocks_and_hot_swap(tmp_path, monkeypatch):
+    publisher = SnapshotManager(str(tmp_path / "publisher"), distribute=True)
+    os.makedirs(publisher.db_dir)
+    node_dir = str(tmp_path / "node")
+    os.makedirs(node_dir)
+    puller = SnapshotPuller(DirectoryTransport(publisher.db_dir), node_dir)
+    assert puller.pull() is None
+
+    _publish_rounds(publisher, [1], base_path=create_schema_db(str(tmp_path / "seed.db")))
+    first = puller.pull()
+    assert first["version"] == 1 and first["fetched"] == first["blocks"]
+    assert _read(puller.manager.snapshot_path(1)) == _read(publisher.snapshot_path(1))
+
+    monkeypatch.setattr(main, "_db_pointer", SnapshotPointer(puller.manager.pointer_path))
+    params = {"player_name": "Player 101", "stat": "goals", "threshold": 0.5}
+    assert sum(client.get("/search/over-under", params=params).json().values()) == 1
+
+    # The next week's load: the node fetches only what changed
+    _publish_rounds(publisher, [2])
+    second = puller.pull()
+    assert second["version"] == 2
+    assert 0 < second["fetched"] < second["blocks"]
+    assert _read(puller.manager.snapshot_path(2)) == _read(publisher.snapshot_path(2))
+    assert sum(client.get("/search/over-under", params=params).json().values()) == 2
+    assert puller.pull() is None
+
+    # Blocks only pruned snapshots used are removed with them
+    _publish_rounds(publisher, [3])
+    publisher.prune(keep=1)
+    assert not os.path.exists(os.path.join(publisher.db_dir, manifest_name(2)))
+    with open(os.path.join(publisher.db_dir, manifest_name(3))) as f:
+        assert set(os.listdir(os.path.join(publisher.db_dir, BLOCKS_DIR))) == set(json.load(f)["blocks"])
+    puller.pull()
+    assert _read(puller.manager.snapshot_path(3)) == _read(publisher.snapshot_path(3))
+    assert puller.manager.versions() == [2, 3]
+
+
+def test_pull_over_http_and_reject_corrupt_blocks(tmp_path):
+    publisher = SnapshotManager(str(tmp_path / "publisher"), distribute=True, block_size=16384)
+    os.makedirs(publisher.db_dir)
+    _publish_rounds(publisher, [1], base_path=create_schema_db(str(tmp_path / "seed.db")))
+
+    handler = functools.partial(_QuietHandler, directory=publisher.db_dir)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        transport = HttpTransport(f"http://127.0.0.1:{server.server_address[1]}/")
+        node = SnapshotPuller(transport, str(tmp_path / "node"))
+        os.makedirs(node.manager.db_dir)
+        assert node.pull()["version"] == 1
+
+        # A block that doesn't match its hash never reaches the node
+        _publish_rounds(publisher, [2])
+        blocks_dir = os.path.join(publisher.db_dir, BLOCKS_DIR)
+        for name in os.listdir(blocks_dir):
+            with open(os.path.join(blocks_dir, name), "wb") as f:
+                f.write(b"corrupt")
+        with pytest.raises(SnapshotSyncError):
+            node.pull()
+        assert node.manager.current()["version"] == 1
+        assert node.manager.versions() == [1]
+        assert not any(name.endswith(".partial") for name in os.listdir(node.manager.db_dir))
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+from app.main import app  # noqa: E402
+
+client = TestClient(app)
+
+
+def test_splits_counts_match_bundled_pendlebury_games():
+    params = {"player_name": "Scott Pendlebury", "stat": "disposals", "threshold": 30}
+    resp = client.get("/search/splits", params=params)
+    assert resp.status_code == 200
+    data = resp.json()
+
+    assert data["overall"] == {"over": 1, "under": 1}
+    assert set(data["splits"].keys()) == {
+        "location", "venue_name", "opponent_name", "game_type", "game_time", "days_since_last_game"
+    }
+    assert data["splits"]["location"] == {"Home": {"over": 1, "under": 1}}
+    assert data["splits"]["opponent_name"] == {
+        "Carlton": {"over": 1, "under": 0},
+        "Melbourne": {"over": 0, "under": 1},
+    }
+    assert data["splits"]["days_since_last_game"] == {
+        "First Game": {"over": 1, "under": 0},
+        "Extended Rest (>7 days)": {"over": 0, "under": 1},
+    }
+    # Every split dimension partitions the same games as the overall count
+    for buckets in data["splits"].values():
+        assert sum(b["over"] + b["under"] for b in buckets.values()) == 2
+
+
+def test_splits_subset_of_dimensions_and_invalid_dimension():
+    params = {"player_id": 1, "stat": "goals", "threshold": 0.5, "dimensions": ["game_time"]}
+    resp = client.get("/search/splits", params=params)
+    assert resp.status_code == 200
+    assert resp.json()["splits"] == {"game_time": {"Night": {"over": 1, "under": 1}}}
+
+    params["dimensions"] = ["weather"]
+    assert client.get("/search/splits", params=params).status_code == 400
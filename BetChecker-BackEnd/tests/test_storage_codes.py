@@ -0,0 +1,138 @@
+import json
+import shutil
+import sqlite3
+from datetime import date
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from conftest import DB_PATH, load_synthetic_round
+import app.main as main
+from app.stat_store import STORE_LOAD_CODED_SQL, STORE_LOAD_SQL, StatStore, _columns_from_rows
+from database.db_manager_api import DatabaseManager
+from database.storage_codes import CATEGORY_CODES, ensure_storage_codes, has_storage_codes
+
+client = TestClient(main.app)
+
+VIEW_COLUMNS = "stat_id, game_date, game_type, location, game_time, disposals, goals"
+
+
+def _stores_match(conn):
+    conn.row_factory = sqlite3.Row
+    text = _columns_from_rows(conn.execute(STORE_LOAD_SQL).fetchall())
+    coded = _columns_from_rows(conn.execute(STORE_LOAD_CODED_SQL).fetchall(), coded=True)
+    for name, column in text.items():
+        assert np.array_equal(column, coded[name]), name
+        assert column.dtype == coded[name].dtype, name
+
+
+def test_codes_follow_the_text(schema_db):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        for round_number in (1, 2, 3):
+            load_synthetic_round(db, 2023, round_number)
+    # Updates to the text show up in the codes: they are generated columns
+    db.conn.execute("UPDATE player_game_stats SET game_time = 'Day' WHERE stat_id % 3 = 0")
+    db.conn.execute("UPDATE player_game_stats SET game_time = NULL WHERE stat_id % 7 = 0")
+    db.conn.execute("UPDATE games SET game_type = 'Finals' WHERE round_number = 3")
+    db.conn.commit()
+
+    for row in db.conn.execute(
+        "SELECT location, location_code, game_time, game_time_code FROM player_game_stats"
+    ):
+        assert row["location_code"] == CATEGORY_CODES["location"].index(row["location"])
+        expected = None if row["game_time"] is None else CATEGORY_CODES["game_time"].index(row["game_time"])
+        assert row["game_time_code"] == expected
+    for row in db.conn.execute("SELECT game_date, game_day, game_type, game_type_code FROM games"):
+        assert row["game_day"] == (date.fromisoformat(row["game_date"]) - date(1970, 1, 1)).days
+        assert row["game_type_code"] == CATEGORY_CODES["game_type"].index(row["game_type"])
+
+    # The view decodes back to exactly the stored text
+    decoded = db.conn.execute(f"SELECT {VIEW_COLUMNS} FROM vw_complete_game_stats ORDER BY stat_id").fetchall()
+    stored = db.conn.execute("""
+        SELECT pgs.stat_id, g.game_date, g.game_type, pgs.location, pgs.game_time, pgs.disposals, pgs.goals
+        FROM player_game_stats pgs JOIN games g ON pgs.game_id = g.game_id ORDER BY pgs.stat_id
+    """).fetchall()
+    assert [tuple(r) for r in decoded] == [tuple(r) for r in stored]
+
+    db.update_days_since_last_game()
+    days = {r[0] for r in db.conn.execute("SELECT days_since_last_game FROM player_game_stats")}
+    assert days == {None, 7}
+
+    _stores_match(db.conn)
+    db.close()
+
+
+def test_migrating_the_bundled_database(tmp_path):
+    path = str(tmp_path / "afl_stats.db")
+    shutil.copy(DB_PATH, path)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    assert not has_storage_codes(conn)
+    before = conn.execute(f"SELECT {VIEW_COLUMNS} FROM vw_complete_game_stats ORDER BY stat_id").fetchall()
+
+    ensure_storage_codes(conn)
+    ensure_storage_codes(conn)
+    assert has_storage_codes(conn)
+    after = conn.execute(f"SELECT {VIEW_COLUMNS} FROM vw_complete_game_stats ORDER BY stat_id").fetchall()
+    assert [tuple(r) for r in after] == [tuple(r) for r in before]
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_games_day", "idx_pgs_location_code"} <= indexes
+    assert "idx_pgs_location" not in indexes
+
+    _stores_match(conn)
+    assert len(StatStore.from_connection(conn)) == len(before)
+    conn.close()
+
+
+def test_coded_filters_match_text_filters(schema_db, monkeypatch):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        for round_number in range(1, 5):
+            load_synthetic_round(db, 2023, round_number)
+    db.conn.execute("UPDATE player_game_stats SET game_time = 'Twilight' WHERE stat_id % 2 = 0")
+    db.conn.commit()
+    db.close()
+    monkeypatch.setattr(main, "DB_PATH", schema_db)
+
+    filters = main.GameFilters(
+        location="Away", game_type="Regular Season", time_of_day="Twilight",
+        start_date=date(2023, 3, 21), end_date=date(2023, 3, 28),
+    )
+    with main.get_connection() as conn:
+        results = []
+        for coded in (False, True):
+            where, params = main.game_filters_sql(filters, coded)
+            sql = f"SELECT stat_id FROM vw_complete_game_stats WHERE {' AND '.join(where)} ORDER BY stat_id"
+            results.append([r[0] for r in conn.execute(sql, params)])
+    assert results[0] == results[1]
+    assert 0 < len(results[0]) < 396
+
+    rows = [json.loads(line) for line in client.get("/export/games", params={
+        "location": "Away", "time_of_day": "Twilight", "start_date": "2023-03-21", "end_date": "2023-03-28",
+    }).text.splitlines()]
+    assert [r["stat_id"] for r in rows] == results[0]
+    assert {(r["location"], r["game_time"]) for r in rows} == {("Away", "Twilight")}
+
+
+def test_storage_coded_rechecks_when_the_file_changes(tmp_path, monkeypatch):
+    path = str(tmp_path / "afl_stats.db")
+    shutil.copy(DB_PATH, path)
+    monkeypatch.setattr(main, "DB_PATH", path)
+    monkeypatch.setattr(main, "_coded_dbs", {})
+    opened = []
+    get_connection = main.get_connection
+    monkeypatch.setattr(main, "get_connection", lambda: opened.append(1) or get_connection())
+
+    # Not coded yet, and the answer is cached until the file changes
+    assert not main.storage_coded()
+    assert not main.storage_coded()
+    assert len(opened) == 1
+
+    conn = sqlite3.connect(path)
+    ensure_storage_codes(conn)
+    conn.commit()
+    conn.close()
+    assert main.storage_coded()
+    assert main.storage_coded()
+    assert len(opened) == 2
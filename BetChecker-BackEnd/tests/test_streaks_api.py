@@ -0,0 +1,98 @@
+from itertools import groupby
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import load_synthetic_round
+import app.main as main
+from database.db_manager_api import DatabaseManager
+
+client = TestClient(main.app)
+
+
+def test_pendlebury_streaks_from_bundled_db():
+    # 32 then 29 disposals
+    resp = client.get("/search/streaks", params={"player_name": "Scott Pendlebury", "stat": "disposals", "threshold": 30})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["games"] == 2
+    assert data["current"]["side"] == "under" and data["current"]["length"] == 1
+    assert data["longest_over"]["length"] == 1
+    assert data["longest_over"]["end_date"] < data["longest_under"]["start_date"]
+
+    empty = client.get("/search/streaks", params={"player_id": 1, "stat": "disposals", "threshold": 30, "venue_name": "Nowhere"})
+    assert empty.json() == {"player_id": 1, "games": 0, "current": None, "longest_over": None, "longest_under": None}
+
+    assert client.get("/search/streaks", params={"player_id": 1, "stat": "marks", "threshold": 3}).status_code == 400
+
+
+def _walk(rows, threshold):
+    """Reference: (side, length, start, end) of every run, walking date-ordered rows"""
+    runs = []
+    for over, group in groupby(rows, key=lambda r: r["disposals"] >= threshold):
+        group = list(group)
+        runs.append(("over" if over else "under", len(group), group[0]["game_date"], group[-1]["game_date"]))
+    return runs
+
+
+@pytest.fixture
+def synthetic_db(schema_db, monkeypatch):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        for round_number in range(1, 9):
+            load_synthetic_round(db, 2023, round_number)
+    db.close()
+    monkeypatch.setattr(main, "DB_PATH", schema_db)
+    return schema_db
+
+
+def test_streaks_match_a_row_by_row_walk(synthetic_db):
+    conn = main.get_connection()
+    try:
+        for player_id in (1, 50, 123, 396):
+            for threshold, location in ((12.5, None), (20, "Home"), (30, None)):
+                where = "AND location = :location" if location else ""
+                rows = conn.execute(
+                    f"""SELECT game_date, disposals FROM vw_complete_game_stats
+                        WHERE player_id = :player_id {where} ORDER BY game_date, game_id""",
+                    {"player_id": player_id, "location": location},
+                ).fetchall()
+                runs = _walk(rows, threshold)
+                params = {"player_id": player_id, "stat": "disposals", "threshold": threshold}
+                if location:
+                    params["location"] = location
+                data = client.get("/search/streaks", params=params).json()
+
+                assert data["games"] == len(rows)
+                assert (data["current"]["side"], data["current"]["length"]) == runs[-1][:2]
+                for side in ("over", "under"):
+                    lengths = [length for s, length, _, _ in runs if s == side]
+                    longest = data[f"longest_{side}"]
+                    assert (longest["length"] if longest else 0) == max(lengths, default=0)
+    finally:
+        conn.close()
+
+
+def test_active_streak_ranking(synthetic_db):
+    conn = main.get_connection()
+    try:
+        rows = conn.execute(
+            "SELECT player_id, game_date, disposals FROM vw_complete_game_stats ORDER BY player_id, game_date, game_id"
+        ).fetchall()
+    finally:
+        conn.close()
+    expected = {}
+    for player_id, history in groupby(rows, key=lambda r: r["player_id"]):
+        side, length, _, _ = _walk(list(history), 20)[-1]
+        if side == "over":
+            expected[player_id] = length
+
+    resp = client.get("/search/streaks/active", params={"stat": "disposals", "threshold": 20, "limit": 500})
+    leaders = resp.json()["leaders"]
+    assert {leader["player_id"]: leader["length"] for leader in leaders} == expected
+    assert [leader["length"] for leader in leaders] == sorted(expected.values(), reverse=True)
+    assert leaders[0]["player_name"].startswith("Player ")
+
+    top = client.get("/search/streaks/active", params={"stat": "disposals", "threshold": 20, "min_length": 3, "limit": 5}).json()
+    assert len(top["leaders"]) <= 5 and all(leader["length"] >= 3 for leader in top["leaders"])
+    assert client.get("/search/streaks/active", params={"stat": "disposals", "threshold": 20, "side": "both"}).status_code == 400
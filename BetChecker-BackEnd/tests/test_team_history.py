@@ -0,0 +1,45 @@
+from database.db_manager_api import DatabaseManager
+
+
+def _history(db, player_id):
+    rows = db.conn.execute(
+        """SELECT team_id, start_date, end_date, is_current FROM player_team_history
+           WHERE player_id = ? ORDER BY start_date""",
+        (player_id,),
+    ).fetchall()
+    return [tuple(r) for r in rows]
+
+
+def test_team_history_is_exact_when_games_arrive_out_of_order(schema_db):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        teams = [db.get_or_create_team(f"Team {t}", api_team_id=t) for t in range(1, 5)]
+        venue = db.get_or_create_venue("MCG")
+        player = db.get_or_create_player("Traded Player", 1)
+        # (date, team, opponent): two stints at team 1 around a stint at team 2
+        schedule = [
+            ("2015-04-01", teams[0], teams[2]),
+            ("2015-09-01", teams[0], teams[3]),
+            ("2016-04-01", teams[1], teams[2]),
+            ("2016-08-01", teams[1], teams[3]),
+            ("2017-04-01", teams[0], teams[2]),
+        ]
+        # Back-filled seasons: newest game loaded first
+        for i, (game_date, team, opponent) in reversed(list(enumerate(schedule))):
+            game = db.get_or_create_game(
+                api_game_id=i + 1, season_year=int(game_date[:4]), round_number=1,
+                game_type="Regular Season", game_date=game_date, game_time="Day",
+                venue_id=venue, home_team_id=team, away_team_id=opponent,
+            )
+            db.insert_player_stats(player, game, team, opponent, venue, "Home", "Day", 20, 1)
+
+    assert _history(db, player) == [
+        (teams[0], "2015-04-01", "2015-09-01", 0),
+        (teams[1], "2016-04-01", "2016-08-01", 0),
+        (teams[0], "2017-04-01", None, 1),
+    ]
+
+    # Rebuilding everything is idempotent
+    db.rebuild_player_team_history()
+    assert len(_history(db, player)) == 3
+    db.close()
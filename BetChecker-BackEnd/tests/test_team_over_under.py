@@ -0,0 +1,152 @@
+import os
+import sqlite3
+
+from fastapi.testclient import TestClient
+
+from conftest import SCHEMA_DIR, load_synthetic_round
+import app.main as main
+from database.db_manager_api import DatabaseManager
+from database.team_stats import (
+    TEAM_GAME_STATS_DDL,
+    TEAM_GAME_STATS_INDEX,
+    ensure_team_game_stats,
+    rebuild_team_game_stats,
+)
+
+client = TestClient(main.app)
+
+TOTALS_SQL = """
+    SELECT game_id, team_id, SUM(disposals), SUM(goals)
+    FROM player_game_stats GROUP BY game_id, team_id ORDER BY game_id, team_id
+"""
+
+
+TABLE_SQL = "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = 'team_game_stats' ORDER BY name"
+
+
+def test_schema_and_migration_match_team_stats_ddl(schema_db):
+    ddl = sqlite3.connect(":memory:")
+    ddl.execute(TEAM_GAME_STATS_DDL)
+    ddl.execute(TEAM_GAME_STATS_INDEX)
+    expected = ddl.execute(TABLE_SQL).fetchall()
+
+    # schema_db is built from schema.sql
+    conn = sqlite3.connect(schema_db)
+    assert conn.execute(TABLE_SQL).fetchall() == expected
+    conn.execute("DROP TABLE team_game_stats")
+    with open(os.path.join(SCHEMA_DIR, "add_team_game_stats_migration.sql")) as f:
+        conn.executescript(f.read())
+    assert conn.execute(TABLE_SQL).fetchall() == expected
+
+
+def test_team_totals_follow_loads_and_corrections(schema_db):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        for round_number in range(1, 5):
+            load_synthetic_round(db, 2023, round_number)
+
+    rows = db.conn.execute(
+        "SELECT game_id, team_id, disposals, goals FROM team_game_stats ORDER BY game_id, team_id"
+    ).fetchall()
+    assert [tuple(r) for r in rows] == [tuple(r) for r in db.conn.execute(TOTALS_SQL)]
+    assert len(rows) == 4 * 18
+
+    # Concessions are the opponent's totals
+    home = db.conn.execute("SELECT * FROM team_game_stats ORDER BY game_id, location DESC LIMIT 2").fetchall()
+    assert (home[0]["conceded_disposals"], home[0]["conceded_goals"]) == (home[1]["disposals"], home[1]["goals"])
+
+    # A standalone correction rebuilds just that game
+    stat = db.conn.execute("SELECT * FROM player_game_stats ORDER BY stat_id LIMIT 1").fetchone()
+    db.upsert_player_stats(
+        stat["player_id"], stat["game_id"], stat["team_id"], stat["opponent_team_id"], stat["venue_id"],
+        stat["location"], stat["game_time"], disposals=stat["disposals"] + 10, goals=stat["goals"],
+    )
+    after = db.conn.execute(
+        "SELECT disposals FROM team_game_stats WHERE game_id = ? AND team_id = ?", (stat["game_id"], stat["team_id"])
+    ).fetchone()[0]
+    conceded = db.conn.execute(
+        "SELECT conceded_disposals FROM team_game_stats WHERE game_id = ? AND opponent_team_id = ?",
+        (stat["game_id"], stat["team_id"]),
+    ).fetchone()[0]
+    assert after == conceded == dict(((g, t), d) for g, t, d, _ in db.conn.execute(TOTALS_SQL))[(stat["game_id"], stat["team_id"])]
+    db.close()
+
+
+def test_team_game_without_recorded_stat(schema_db):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        load_synthetic_round(db, 2023, 1)
+    game_id, team_id = db.conn.execute("SELECT game_id, team_id FROM team_game_stats LIMIT 1").fetchone()
+    db.conn.execute("UPDATE player_game_stats SET goals = NULL WHERE game_id = ? AND team_id = ?", (game_id, team_id))
+    rebuild_team_game_stats(db.conn, [game_id])
+
+    row = db.conn.execute(
+        "SELECT goals, disposals FROM team_game_stats WHERE game_id = ? AND team_id = ?", (game_id, team_id)
+    ).fetchone()
+    assert row["goals"] is None and row["disposals"] is not None
+    conceded = db.conn.execute(
+        "SELECT conceded_goals FROM team_game_stats WHERE game_id = ? AND opponent_team_id = ?", (game_id, team_id)
+    ).fetchone()[0]
+    assert conceded is None
+
+    # A table created while totals were NOT NULL is rebuilt with the new DDL
+    db.conn.execute("DROP TABLE team_game_stats")
+    db.conn.execute(TEAM_GAME_STATS_DDL.replace("goals INTEGER,", "goals INTEGER NOT NULL,", 1))
+    ensure_team_game_stats(db.conn)
+    assert db.conn.execute(
+        "SELECT goals FROM team_game_stats WHERE game_id = ? AND team_id = ?", (game_id, team_id)
+    ).fetchone()[0] is None
+    db.close()
+
+
+def test_team_over_under_search(schema_db, monkeypatch):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        for round_number in range(1, 7):
+            load_synthetic_round(db, 2023, round_number)
+    totals = db.conn.execute(
+        """SELECT location, SUM(disposals) AS disposals FROM player_game_stats
+           WHERE team_id = 1 GROUP BY game_id"""
+    ).fetchall()
+    conceded = db.conn.execute(
+        "SELECT SUM(disposals) FROM player_game_stats WHERE opponent_team_id = 1 GROUP BY game_id"
+    ).fetchall()
+    db.close()
+    monkeypatch.setattr(main, "DB_PATH", schema_db)
+    line = sorted(r["disposals"] for r in totals)[3] - 0.5
+
+    resp = client.get("/search/team-over-under", params={"team_id": 1, "stat": "disposals", "threshold": line})
+    assert resp.status_code == 200
+    assert resp.json() == {"over": sum(r["disposals"] >= line for r in totals), "under": sum(r["disposals"] < line for r in totals)}
+    assert resp.json()["over"] + resp.json()["under"] == 6
+
+    home = client.get(
+        "/search/team-over-under",
+        params={"team_name": "Team 1", "stat": "disposals", "threshold": line, "location": "Home"},
+    ).json()
+    assert home["over"] == sum(r["disposals"] >= line and r["location"] == "Home" for r in totals)
+
+    against = client.get(
+        "/search/team-over-under", params={"team_id": 1, "stat": "disposals", "threshold": line, "side": "against"}
+    ).json()
+    assert against["over"] == sum(r[0] >= line for r in conceded)
+
+    assert client.get("/search/team-over-under", params={"stat": "disposals", "threshold": 1}).status_code == 400
+    assert client.get(
+        "/search/team-over-under", params={"team_id": 1, "stat": "disposals", "threshold": 1, "side": "both"}
+    ).status_code == 400
+    assert client.get(
+        "/search/team-over-under", params={"team_name": "Nobody", "stat": "goals", "threshold": 1}
+    ).status_code == 404
+
+
+def test_team_over_under_without_the_table():
+    # The bundled database predates team_game_stats: totals are summed per query
+    with main.get_connection() as conn:
+        assert not main.has_team_game_stats(conn)
+        team = conn.execute("SELECT team_id FROM player_game_stats GROUP BY team_id ORDER BY COUNT(*) DESC").fetchone()[0]
+        totals = [r[0] for r in conn.execute(
+            "SELECT SUM(goals) FROM player_game_stats WHERE team_id = ? GROUP BY game_id", (team,)
+        )]
+    body = client.get("/search/team-over-under", params={"team_id": team, "stat": "goals", "threshold": 1.5}).json()
+    assert body == {"over": sum(t >= 1.5 for t in totals), "under": sum(t < 1.5 for t in totals)}
@@ -0,0 +1,71 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from conftest import load_synthetic_round
+import app.main as main
+from app.stat_store import get_stat_store
+from app.warmup import WarmupState, run_warmup, top_queried
+from database.db_manager_api import DatabaseManager
+
+client = TestClient(main.app)
+
+
+def test_warmup_pins_top_players_and_matches_sql(schema_db, tmp_path, monkeypatch):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        load_synthetic_round(db, 2023, 1)
+        load_synthetic_round(db, 2023, 2)
+    hot_id = db.get_or_create_player("Player 101", 101)
+    warm_id = db.get_or_create_player("Player 202", 202)
+    cold_id = db.get_or_create_player("Player 303", 303)
+    db.close()
+
+    access_log = tmp_path / "access.ndjson"
+    entries = (
+        [{"player_id": hot_id, "stat": "disposals"}] * 3
+        + [{"player_id": warm_id, "stat": "goals"}] * 2
+        + [{"player_id": cold_id, "stat": "goals"}, {"player_name": "Nobody", "stat": "goals"}]
+    )
+    access_log.write_text("\n".join(json.dumps(e) for e in entries) + "\nnot json\n")
+    assert top_queried(str(access_log), 2) == [(hot_id, "disposals"), (warm_id, "goals")]
+
+    monkeypatch.setattr(main, "DB_PATH", schema_db)
+    monkeypatch.setattr(main, "warmup_state", WarmupState())
+    assert client.get("/ready").status_code == 503
+
+    run_warmup(
+        schema_db, main.warmup_state, main.warmup_statements(), access_log_path=str(access_log), top_n=2
+    )
+    resp = client.get("/ready")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["error"] is None
+    assert body["pinned_histograms"] == 2
+    assert set(body["steps_ms"]) == {"preload_pages", "prime_statements", "stat_store", "histograms"}
+    assert get_stat_store(schema_db).pinned == {(hot_id, "disposals"), (warm_id, "goals")}
+
+    # Pinned answers agree with the SQL path at and between integer thresholds
+    store = get_stat_store(schema_db)
+    conn = main.get_connection()
+    try:
+        for pid, stat in [(hot_id, "disposals"), (warm_id, "goals")]:
+            for threshold in (-1, 0, 1, 1.5, 2, 3, 17.5, 34, 100):
+                for strict_over in (False, True):
+                    row = conn.execute(
+                        main.over_under_sql(stat, strict_over), {"player_id": pid, "threshold": threshold}
+                    ).fetchone()
+                    expected = (row["over"], row["under"])
+                    assert store.pinned_over_under(pid, stat, threshold, strict_over) == expected
+                    resp = client.get(
+                        "/search/over-under",
+                        params={"player_id": pid, "stat": stat, "threshold": threshold, "strict_over": strict_over},
+                    )
+                    assert (resp.json()["over"], resp.json()["under"]) == expected
+    finally:
+        conn.close()
+
+    # Players outside the top-N still go through SQL
+    assert store.pinned_over_under(cold_id, "goals", 1, False) is None
+    resp = client.get("/search/over-under", params={"player_id": cold_id, "stat": "goals", "threshold": 1})
+    assert resp.json()["over"] + resp.json()["under"] == 2
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import load_synthetic_round
+import app.main as main
+from app.context_effects import PRIOR_GAMES, ContextEffects
+from app.stat_store import STAT_COLUMNS, get_stat_store
+from app.weighting import weighted_hit_rate
+from database.db_manager_api import DatabaseManager
+
+client = TestClient(main.app)
+
+
+def test_recency_weighting_favours_latest_game():
+    params = {"player_name": "Scott Pendlebury", "stat": "disposals", "threshold": 30, "half_life_days": 1}
+    data = client.get("/search/over-under/weighted", params=params).json()
+    # 32 in the older game, 29 in the latest one, 8 days apart
+    older = 0.5 ** 8
+    assert (data["over"], data["under"]) == (1, 1)
+    assert data["over_probability"] == pytest.approx(older / (1 + older))
+    assert data["effective_games"] == pytest.approx((1 + older) ** 2 / (1 + older ** 2))
+
+    flat = client.get("/search/over-under/weighted", params={**params, "half_life_days": 1e9}).json()
+    assert flat["over_probability"] == pytest.approx(0.5)
+
+
+def test_context_effects_are_patched_incrementally(schema_db):
+    db = DatabaseManager(schema_db)
+    with db.bulk_load():
+        for round_number in (1, 2, 3):
+            load_synthetic_round(db, 2023, round_number)
+        # Synthetic stats don't depend on the opponent; make team 3 leaky
+        db.conn.execute("UPDATE player_game_stats SET disposals = disposals + 10 WHERE opponent_team_id = 3")
+        # Unrecorded stats count toward neither the sums nor the games
+        db.conn.execute("UPDATE player_game_stats SET disposals = NULL WHERE opponent_team_id = 3 AND player_id % 3 = 0")
+    store = get_stat_store(schema_db)
+
+    # Opponent effect matches a direct SQL aggregate with the same shrinkage
+    league = db.conn.execute("SELECT AVG(disposals) FROM player_game_stats").fetchone()[0]
+    n, mean = db.conn.execute(
+        "SELECT COUNT(disposals), AVG(disposals) FROM player_game_stats WHERE opponent_team_id = 3"
+    ).fetchone()
+    expected = (n * mean + PRIOR_GAMES * league) / (n + PRIOR_GAMES) / league
+    assert store.effects.factors("opponent_team_id", "disposals", np.array([2023]), np.array([3]))[0] == pytest.approx(expected)
+
+    # A late correction from an earlier season grows the tables and is applied as a delta
+    player_id = db.get_or_create_player("Player 101", 101)
+    game_id = db.get_or_create_game(
+        api_game_id=888888, season_year=2022, round_number=1, game_type="Regular Season",
+        game_date="2022-03-20", game_time="Night", venue_id=1, home_team_id=1, away_team_id=3,
+    )
+    db.insert_player_stats(player_id, game_id, 1, 3, 1, "Home", "Night", disposals=44, goals=4)
+    refreshed = get_stat_store(schema_db)
+    rebuilt = ContextEffects.from_columns(refreshed.columns, STAT_COLUMNS)
+    assert refreshed.effects.first_season == rebuilt.first_season == 2022
+    for key, sums in rebuilt.sums.items():
+        assert np.array_equal(refreshed.effects.sums[key], sums)
+    for key, counts in rebuilt.counts.items():
+        assert np.array_equal(refreshed.effects.counts[key], counts)
+    db.close()
+
+    # Facing the leaky team lifts the adjusted hit rate; games against it count for less
+    assert refreshed.effects.latest_factor("opponent_team_id", "disposals", 3) > 1
+    neutral = weighted_hit_rate(refreshed, player_id, "disposals", 15, False, adjust_opponent=True)
+    facing = weighted_hit_rate(refreshed, player_id, "disposals", 15, False, adjust_opponent=True, opponent_team_id=3)
+    assert facing.over_probability >= neutral.over_probability